@@ -1,9 +1,23 @@
 import os
 import json
+import asyncio
+import threading
 import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from functools import partial
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+import llm_cache
+import retry_policy
+import token_budget
+from llm_cache import LLMCache
+from rate_limiter import RateLimiter
+from name_index import normalize_name
+from transcript_model import Transcript
+
 # Load environment variables
 load_dotenv()
 
@@ -13,17 +27,158 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logging.getLogger().setLevel(logging.DEBUG) # Temporarily set root logger to DEBUG
 
 # --- Google AI Setup ---
+MODEL_NAME = 'gemini-1.5-flash-latest'
+
+# Bump a pass's version whenever its prompt template changes, so cached responses
+# produced by the old template are no longer used.
+PROMPT_VERSIONS = {"classify": "2", "clean": "1", "extract": "1", "clean_and_extract": "1"}
+
 try:
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not found in environment variables.")
     genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-1.5-flash-latest')
-    logging.info("AI PROCESSOR: Google AI model ('gemini-1.5-flash-latest') initialized successfully.")
+    model = genai.GenerativeModel(MODEL_NAME)
+    logging.info(f"AI PROCESSOR: Google AI model ('{MODEL_NAME}') initialized successfully.")
 except Exception as e:
     logging.error(f"AI PROCESSOR ERROR: Failed to configure Google AI - {e}")
     model = None
 
+# --- Gemini Rate Limiting ---
+# Every Gemini call, from any meeting, thread or event loop, takes a permit from one shared
+# limiter that meters requests and estimated tokens per minute and caps calls in flight.
+# Limits are set to GEMINI_QUOTA_TARGET (default 90%) of the quotas, so throughput sits just
+# under them instead of oscillating through bursts of 429s.
+_quota_target = float(os.environ.get("GEMINI_QUOTA_TARGET", 0.9))
+gemini_limiter = RateLimiter(
+    "gemini",
+    requests_per_minute=float(os.environ.get("GEMINI_REQUESTS_PER_MINUTE", 1000)) * _quota_target,
+    tokens_per_minute=float(os.environ.get("GEMINI_TOKENS_PER_MINUTE", 1000000)) * _quota_target,
+    max_concurrent=int(os.environ.get("GEMINI_MAX_CONCURRENT", 16)),
+)
+
+def _total_tokens(response) -> int | None:
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None) or None
+
+def _limited_generate(prompt: str, generation_config: dict | None):
+    # The estimate is corrected with the actual usage once the call returns.
+    estimated_tokens = token_budget.estimate_tokens(prompt)
+    grant = gemini_limiter.acquire(estimated_tokens)
+    actual_tokens = None
+    try:
+        response = model.generate_content(prompt, generation_config=generation_config)
+        actual_tokens = _total_tokens(response)
+        return response
+    finally:
+        gemini_limiter.release(grant, actual_tokens)
+
+async def _limited_generate_async(prompt: str, generation_config: dict | None):
+    estimated_tokens = token_budget.estimate_tokens(prompt)
+    grant = await gemini_limiter.acquire_async(estimated_tokens)
+    actual_tokens = None
+    try:
+        response = await model.generate_content_async(prompt, generation_config=generation_config)
+        actual_tokens = _total_tokens(response)
+        return response
+    finally:
+        gemini_limiter.release(grant, actual_tokens)
+
+# --- LLM Response Cache ---
+# Retries, replays and duplicate webhooks re-run the same passes on the same input;
+# their responses are served from a content-addressed cache instead of calling Gemini again.
+# The cache (and its LLM_CACHE_PATH file) is opened on the first pass, not on import.
+_response_cache = None
+_response_cache_opened = False
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> LLMCache | None:
+    """
+    Returns the shared LLM response cache, opening it on first use, or None if it is
+    disabled (LLM_CACHE_ENABLED) or could not be opened.
+    """
+    global _response_cache, _response_cache_opened
+    if _response_cache_opened:
+        return _response_cache
+    with _response_cache_lock:
+        if not _response_cache_opened:
+            try:
+                if os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+                    logging.info("AI PROCESSOR: LLM response cache disabled.")
+                else:
+                    _response_cache = LLMCache()
+            except Exception as e:
+                logging.error(f"AI PROCESSOR ERROR: Failed to open LLM response cache - {e}")
+            _response_cache_opened = True
+    return _response_cache
+
+def _cache_lookup(pass_name: str, input_text: str, generation_config: dict | None) -> tuple[str | None, str | None]:
+    """
+    Returns (cache_key, cached_text) for a pass; both are None when the cache is disabled.
+    """
+    response_cache = get_response_cache()
+    if not response_cache:
+        return None, None
+    cache_key = llm_cache.make_key(MODEL_NAME, f"{pass_name}:{PROMPT_VERSIONS[pass_name]}", generation_config, input_text)
+    cached_text = response_cache.get(cache_key)
+    if cached_text is not None:
+        logging.info(f"AI PROCESSOR: Cache hit for '{pass_name}' pass.")
+    return cache_key, cached_text
+
+def _cache_store(cache_key: str | None, response_text: str, generation_config: dict | None):
+    if not cache_key:
+        return
+    # Never cache malformed JSON, or a bad response would be replayed on every retry.
+    if (generation_config or {}).get("response_mime_type") == "application/json":
+        try:
+            json.loads(response_text)
+        except json.JSONDecodeError:
+            return
+    get_response_cache().set(cache_key, response_text)
+
+def _generate(prompt: str, pass_name: str, input_text: str, generation_config: dict | None = None) -> str:
+    """
+    Returns the Gemini response text for a pass, from the response cache when this model,
+    prompt version, generation config and input have been seen before. Otherwise calls the
+    model through the shared retry policy, so 429s and transient 5xx errors are retried
+    with backoff instead of failing the pass immediately.
+
+    Raises:
+        PromptTooLargeError: If the prompt would not fit the model's context window (it is not sent).
+        ResponseTruncatedError: If the response was cut off at the output limit (it is not cached).
+    """
+    cache_key, cached_text = _cache_lookup(pass_name, input_text, generation_config)
+    if cached_text is not None:
+        return cached_text
+    token_budget.check_prompt_fits(prompt)
+    # Each attempt, retries included, takes its own permit from the rate limiter.
+    response = retry_policy.for_endpoint("gemini generate_content").call(
+        lambda: _limited_generate(prompt, generation_config)
+    )
+    token_budget.check_not_truncated(response)
+    _cache_store(cache_key, response.text, generation_config)
+    return response.text
+
+async def _generate_async(prompt: str, pass_name: str, input_text: str, generation_config: dict | None = None) -> str:
+    """
+    The asyncio counterpart of _generate, using the model's async generate API.
+    """
+    cache_key, cached_text = _cache_lookup(pass_name, input_text, generation_config)
+    if cached_text is not None:
+        return cached_text
+    token_budget.check_prompt_fits(prompt)
+    response = await retry_policy.for_endpoint("gemini generate_content").call_async(
+        lambda: _limited_generate_async(prompt, generation_config)
+    )
+    token_budget.check_not_truncated(response)
+    _cache_store(cache_key, response.text, generation_config)
+    return response.text
+
+JSON_RESPONSE = {"response_mime_type": "application/json"}
+
+# Pass 0 only needs the opening of the meeting; this many tokens of it are sent.
+CLASSIFY_INPUT_TOKENS = int(os.environ.get("AI_CLASSIFY_INPUT_TOKENS", 400))
+
 def classify_meeting(transcript: str) -> dict:
     """
     Pass 0: The "Meeting Classifier"
@@ -32,8 +187,16 @@ def classify_meeting(transcript: str) -> dict:
     logging.info("AI PROCESSOR: Starting Pass 0 - Classifying meeting...")
     logging.debug(f"DEBUG_P0: Input transcript (first 500 chars): {transcript[:500]}")
     if not model: return {}
+    try:
+        opening = token_budget.truncate_to_tokens(transcript, CLASSIFY_INPUT_TOKENS)
+        response_text = _generate(_classification_prompt(opening), "classify", opening, generation_config=JSON_RESPONSE)
+        return _parse_classification(response_text)
+    except Exception as e:
+        logging.error(f"AI PROCESSOR ERROR: An error occurred during meeting classification: {e}")
+        return {}
 
-    prompt = f"""
+def _classification_prompt(opening: str) -> str:
+    return f"""
     You are a Meeting Classifier. Your task is to analyze the start of a meeting transcript to determine two things: the meeting_type and the client_name.
 
     - `meeting_type`: Must be either "internal" or "external".
@@ -44,21 +207,16 @@ def classify_meeting(transcript: str) -> dict:
 
     Here is the transcript:
     ---
-    {transcript[:1500]}
+    {opening}
     ---
     """
 
-    generation_config = genai.types.GenerationConfig(response_mime_type="application/json")
-    try:
-        response = model.generate_content(prompt, generation_config=generation_config)
-        logging.debug(f"DEBUG_P0: Raw AI response text: {response.text}")
-        classification = json.loads(response.text)
-        logging.debug(f"DEBUG_P0: Parsed classification: {json.dumps(classification, indent=2)}")
-        logging.info(f"AI PROCESSOR: Pass 0 Complete. Classification: {classification}")
-        return classification
-    except Exception as e:
-        logging.error(f"AI PROCESSOR ERROR: An error occurred during meeting classification: {e}")
-        return {}
+def _parse_classification(response_text: str) -> dict:
+    logging.debug(f"DEBUG_P0: Raw AI response text: {response_text}")
+    classification = json.loads(response_text)
+    logging.debug(f"DEBUG_P0: Parsed classification: {json.dumps(classification, indent=2)}")
+    logging.info(f"AI PROCESSOR: Pass 0 Complete. Classification: {classification}")
+    return classification
 
 def clean_transcript(raw_text: str) -> str:
     """
@@ -68,7 +226,14 @@ def clean_transcript(raw_text: str) -> str:
     logging.info("AI PROCESSOR: Starting Pass 1 - Cleaning transcript...")
     logging.debug(f"DEBUG_P1: Input raw text (first 500 chars): {raw_text[:500]}")
     if not model: return raw_text
-    prompt = f"""
+    try:
+        return _finish_cleaning(_generate(_cleaning_prompt(raw_text), "clean", raw_text))
+    except Exception as e:
+        logging.error(f"AI PROCESSOR ERROR: An error occurred during transcript cleaning: {e}")
+        return raw_text
+
+def _cleaning_prompt(raw_text: str) -> str:
+    return f"""
     You are a Meticulous Editor. Your only task is to process a raw, noisy meeting transcript and clean it for clarity.
     Follow these instructions precisely:
     1.  Correct Obvious Typos.
@@ -81,24 +246,43 @@ def clean_transcript(raw_text: str) -> str:
     {raw_text}
     ---
     """
-    try:
-        response = model.generate_content(prompt)
-        logging.debug(f"DEBUG_P1: Output cleaned text (first 500 chars): {response.text[:500]}")
-        logging.info("AI PROCESSOR: Pass 1 Complete.")
-        return response.text
-    except Exception as e:
-        logging.error(f"AI PROCESSOR ERROR: An error occurred during transcript cleaning: {e}")
-        return raw_text
 
-def extract_structured_data(cleaned_transcript: str) -> dict:
+def _finish_cleaning(response_text: str) -> str:
+    logging.debug(f"DEBUG_P1: Output cleaned text (first 500 chars): {response_text[:500]}")
+    logging.info("AI PROCESSOR: Pass 1 Complete.")
+    return response_text
+
+def extract_structured_data(cleaned_transcript: str, fused: bool = False) -> dict:
     """
     Pass 2: The "Business Analyst"
     Extracts key decisions, action items, and unanswered questions into a structured JSON format.
     Includes an 'empty_data' flag if no meaningful data is found.
+    With fused=True the input is the raw transcript and the model also does Pass 1's
+    cleaning, writing the extracted text in corrected form, so no cleaned copy is needed.
     """
-    logging.info("AI PROCESSOR: Starting Pass 2 - Extracting structured data...")
-    logging.debug(f"DEBUG_P2: Input cleaned transcript (first 500 chars): {cleaned_transcript[:500]}")
+    pass_name, prompt = _extraction_prompt(cleaned_transcript, fused)
     if not model: return {}
+    try:
+        return _parse_extraction(_generate(prompt, pass_name, cleaned_transcript, generation_config=JSON_RESPONSE))
+    except Exception as e:
+        logging.error(f"AI PROCESSOR ERROR: An error occurred during data extraction: {e}")
+        return {"empty_data": True, "error": str(e)} # Return empty flag on error
+
+def _extraction_prompt(cleaned_transcript: str, fused: bool) -> tuple[str, str]:
+    """
+    Returns (pass_name, prompt) for Pass 2 or the fused Pass 1+2.
+    """
+    if fused:
+        logging.info("AI PROCESSOR: Starting fused Pass 1+2 - Cleaning and extracting structured data...")
+        transcript_label = "raw transcript"
+        cleaning_instruction = """
+    7. The transcript is raw and unedited. Ignore filler words, stutters and repeated words, silently correct obvious transcription typos, and write every extracted item in clean, corrected language. Do not return the transcript itself.
+    """
+    else:
+        logging.info("AI PROCESSOR: Starting Pass 2 - Extracting structured data...")
+        transcript_label = "cleaned transcript"
+        cleaning_instruction = ""
+    logging.debug(f"DEBUG_P2: Input {transcript_label} (first 500 chars): {cleaned_transcript[:500]}")
 
     prompt = f"""
     You are a data extraction robot. Your only job is to read a transcript and extract specific pieces of information into a valid JSON object. Do not add any conversational text or explanations.
@@ -113,7 +297,7 @@ def extract_structured_data(cleaned_transcript: str) -> dict:
     3. If a piece of information is not present, use an empty list `[]` or an appropriate default (like "N/A" for strings).
     4. IMPORTANT: If `key_decisions`, `action_items`, AND `unanswered_questions` are all empty lists, AND `client_name` is "Unknown" or "N/A", ALSO include a key `"empty_data": true` in the top-level JSON object. Otherwise, omit this key.
     5. Your final output must only be the JSON object.
-    6. IMPORTANT: Only use content from the provided transcript. Do not use any outside knowledge or make up any information. If the answer is not in the text, provide an empty list or "N/A".
+    6. IMPORTANT: Only use content from the provided transcript. Do not use any outside knowledge or make up any information. If the answer is not in the text, provide an empty list or "N/A".{cleaning_instruction}
 
     **Example Output Format (with data):**
     ```json
@@ -146,35 +330,485 @@ def extract_structured_data(cleaned_transcript: str) -> dict:
     }}
     ```
 
-    Here is the cleaned transcript:
+    Here is the {transcript_label}:
     ---
     {cleaned_transcript}
     ---
     """
+    return ("clean_and_extract" if fused else "extract"), prompt
 
-    generation_config = genai.types.GenerationConfig(response_mime_type="application/json")
+def _parse_extraction(response_text: str) -> dict:
+    logging.debug(f"DEBUG_P2: Raw AI response text from generate_content: {response_text}") # CRITICAL DEBUG PRINT
     try:
-        response = model.generate_content(prompt, generation_config=generation_config)
-        logging.debug(f"DEBUG_P2: Raw AI response text from generate_content: {response.text}") # CRITICAL DEBUG PRINT
-        data = json.loads(response.text)
-        logging.debug(f"DEBUG_P2: Parsed structured data: {json.dumps(data, indent=2)}")
-
-        # Safety check: Ensure empty_data flag is correctly set even if AI misses it
-        if not data.get('client_name') or data['client_name'].upper() in ["UNKNOWN", "N/A"]:
-            if not data.get('key_decisions') and not data.get('action_items') and not data.get('unanswered_questions'):
-                data['empty_data'] = True
-        else:
-            data['empty_data'] = data.get('empty_data', False) # Default to false if not explicitly true
-
-        logging.info("AI PROCESSOR: Pass 2 Complete.")
-        return data
+        data = json.loads(response_text)
     except json.JSONDecodeError as e:
-        logging.error(f"AI PROCESSOR ERROR: JSON decoding failed for Pass 2 output: {e}. Raw response: {response.text}")
+        logging.error(f"AI PROCESSOR ERROR: JSON decoding failed for Pass 2 output: {e}. Raw response: {response_text}")
         return {"empty_data": True, "error": str(e)} # Return empty flag on error
+    logging.debug(f"DEBUG_P2: Parsed structured data: {json.dumps(data, indent=2)}")
+
+    # Safety check: Ensure empty_data flag is correctly set even if AI misses it
+    _apply_empty_data_flag(data)
+
+    logging.info("AI PROCESSOR: Pass 2 Complete.")
+    return data
+
+def clean_and_extract(raw_transcript: str) -> dict:
+    """
+    Fused Passes 1 and 2: cleans and extracts in a single structured call, so the transcript
+    is sent to Gemini once and no rewritten copy of it is generated.
+    """
+    return extract_structured_data(raw_transcript, fused=True)
+
+def _apply_empty_data_flag(data: dict):
+    """
+    Ensures the 'empty_data' flag is set when nothing meaningful was extracted.
+    """
+    if not data.get('client_name') or data['client_name'].upper() in ["UNKNOWN", "N/A"]:
+        if not data.get('key_decisions') and not data.get('action_items') and not data.get('unanswered_questions'):
+            data['empty_data'] = True
+    else:
+        data['empty_data'] = data.get('empty_data', False) # Default to false if not explicitly true
+
+# --- Map-Reduce Processing for Long Transcripts ---
+# Transcripts longer than the chunk size chosen by token_budget.plan_passes (at most
+# CHUNK_MAX_CHARS) are split on speaker turns and the cleaning and extraction passes run
+# on the chunks in parallel, so latency scales with chunk count / parallelism rather
+# than with transcript length.
+CHUNK_MAX_CHARS = int(os.environ.get("AI_CHUNK_MAX_CHARS", 24000))
+CHUNK_OVERLAP_TURNS = int(os.environ.get("AI_CHUNK_OVERLAP_TURNS", 3))
+CHUNK_PARALLELISM = int(os.environ.get("AI_CHUNK_PARALLELISM", 4))
+
+def split_transcript(transcript: str | Transcript, max_chars: int = CHUNK_MAX_CHARS, overlap_turns: int = 0) -> list[str]:
+    """
+    Splits a "Speaker: text" transcript into chunks of at most `max_chars` (a single longer
+    turn becomes its own chunk), breaking only between speaker turns. Each chunk after the
+    first starts with up to `overlap_turns` turns from the end of the previous chunk for context.
+    A transcript_model.Transcript is split on sentences and only the chunks are rendered.
+    """
+    if isinstance(transcript, Transcript):
+        return [transcript.render(start, stop) for start, stop in transcript.chunk_ranges(max_chars, overlap_turns)]
+    return list(_chunk_turns(transcript.split("\n"), max_chars, overlap_turns))
+
+def _chunk_turns(turns, max_chars: int, overlap_turns: int):
+    """
+    Yields the chunks of split_transcript from an iterable of turns, each as soon as the
+    turn that starts the next chunk has arrived.
+    """
+    chunker = _TurnChunker(max_chars, overlap_turns)
+    for turn in turns:
+        chunk = chunker.add(turn)
+        if chunk is not None:
+            yield chunk
+    chunk = chunker.finish()
+    if chunk is not None:
+        yield chunk
+
+class _TurnChunker:
+    """
+    The incremental state of split_transcript: add() takes one turn and returns the chunk
+    it closed, if any; finish() returns the last chunk.
+    """
+    __slots__ = ("max_chars", "overlap_turns", "current", "current_len")
+
+    def __init__(self, max_chars: int, overlap_turns: int):
+        self.max_chars = max_chars
+        self.overlap_turns = overlap_turns
+        self.current, self.current_len = [], 0
+
+    def add(self, turn: str) -> str | None:
+        closed = None
+        if self.current and self.current_len + len(turn) + 1 > self.max_chars:
+            closed = "\n".join(self.current)
+            self.current = self.current[-self.overlap_turns:] if self.overlap_turns else []
+            self.current_len = sum(len(t) + 1 for t in self.current)
+            # Overlap is context only; keep it to a quarter of the chunk so chunks still advance.
+            while self.current and self.current_len > self.max_chars // 4:
+                self.current_len -= len(self.current.pop(0)) + 1
+        self.current.append(turn)
+        self.current_len += len(turn) + 1
+        return closed
+
+    def finish(self) -> str | None:
+        return "\n".join(self.current) if self.current else None
+
+def clean_transcript_chunked(raw_text: str | Transcript, max_chars: int = CHUNK_MAX_CHARS) -> str:
+    """
+    Pass 1 (map-reduce): Cleans each speaker-turn chunk in parallel and joins the results
+    in order. Chunks do not overlap, so no cleaned turn is duplicated.
+    """
+    chunks = split_transcript(raw_text, max_chars)
+    logging.info(f"AI PROCESSOR: Cleaning transcript in {len(chunks)} chunk(s), {CHUNK_PARALLELISM} at a time...")
+    with ThreadPoolExecutor(max_workers=CHUNK_PARALLELISM, thread_name_prefix="ai-clean") as executor:
+        cleaned_chunks = list(executor.map(clean_transcript, chunks))
+    return "\n".join(chunk.strip() for chunk in cleaned_chunks)
+
+def extract_structured_data_chunked(cleaned_transcript: str | Transcript, fused: bool = False, max_chars: int = CHUNK_MAX_CHARS) -> dict:
+    """
+    Pass 2 (map-reduce): Extracts structured data from overlapping chunks in parallel
+    and merges the partial results, de-duplicating decisions, action items and questions.
+    With fused=True each chunk is a raw transcript chunk (see clean_and_extract).
+    """
+    chunks = split_transcript(cleaned_transcript, max_chars, overlap_turns=CHUNK_OVERLAP_TURNS)
+    logging.info(f"AI PROCESSOR: Extracting structured data from {len(chunks)} chunk(s), {CHUNK_PARALLELISM} at a time...")
+    with ThreadPoolExecutor(max_workers=CHUNK_PARALLELISM, thread_name_prefix="ai-extract") as executor:
+        partials = list(executor.map(partial(extract_structured_data, fused=fused), chunks))
+    return merge_structured_data(partials)
+
+# --- Streaming Pass 1 ---
+# A single-call cleaning pass spends most of its time generating the rewritten transcript.
+# Streaming it lets Pass 2 start on each completed segment of cleaned turns while later
+# segments are still being generated, overlapping the two passes.
+STREAM_SEGMENT_CHARS = int(os.environ.get("AI_STREAM_SEGMENT_CHARS", 8000))
+
+def _open_stream(prompt: str):
+    """
+    Takes a rate limiter permit and starts a streaming call. Returns (grant, response);
+    the caller releases the grant once the stream is consumed.
+    """
+    grant = gemini_limiter.acquire(token_budget.estimate_tokens(prompt))
+    try:
+        return grant, model.generate_content(prompt, stream=True)
+    except BaseException:
+        gemini_limiter.release(grant)
+        raise
+
+def clean_transcript_stream(raw_text: str):
+    """
+    Pass 1, streamed: yields the cleaned transcript in pieces as Gemini generates it. The
+    pieces join to the same text clean_transcript would return, and the full response is
+    cached the same way. Opening the stream is retried like any other call; an error after
+    the first piece is raised to the consumer, which has already seen part of the text.
+    """
+    logging.info("AI PROCESSOR: Starting Pass 1 - Cleaning transcript (streaming)...")
+    if not model:
+        yield raw_text
+        return
+    cache_key, cached_text = _cache_lookup("clean", raw_text, None)
+    if cached_text is not None:
+        yield cached_text
+        return
+    prompt = _cleaning_prompt(raw_text)
+    token_budget.check_prompt_fits(prompt)
+    grant, response = retry_policy.for_endpoint("gemini generate_content").call(lambda: _open_stream(prompt))
+    pieces, actual_tokens = [], None
+    try:
+        for chunk in response:
+            pieces.append(chunk.text)
+            yield chunk.text
+        actual_tokens = _total_tokens(response)
+    finally:
+        gemini_limiter.release(grant, actual_tokens)
+    token_budget.check_not_truncated(response)
+    _cache_store(cache_key, _finish_cleaning("".join(pieces)), None)
+
+def _complete_lines(pieces):
+    """
+    Re-cuts streamed text pieces into whole lines.
+    """
+    pending = ""
+    for piece in pieces:
+        pending += piece
+        *lines, pending = pending.split("\n")
+        yield from lines
+    if pending:
+        yield pending
+
+class _StreamSegments:
+    """
+    Cuts the cleaned turns of a streaming Pass 1 into Pass 2 segments, as _TurnChunker does,
+    and tracks how many turns the segments handed out so far cover, so a stream that fails
+    part way can be resumed on the raw transcript from where those segments end.
+    """
+    __slots__ = ("chunker", "turns", "covered")
+
+    def __init__(self, max_chars: int):
+        self.chunker = _TurnChunker(max_chars, CHUNK_OVERLAP_TURNS)
+        self.turns, self.covered = [], 0
+
+    def add(self, turn: str) -> str | None:
+        self.turns.append(turn)
+        segment = self.chunker.add(turn)
+        if segment is not None:
+            self.covered = len(self.turns) - 1  # The new turn starts the next segment.
+        return segment
+
+    def finish(self) -> str | None:
+        self.covered = len(self.turns)
+        return self.chunker.finish()
+
+    def remaining_raw(self, raw_text: str) -> str | None:
+        return _raw_remainder(raw_text, self.turns[:self.covered])
+
+def _turn_speaker(line: str) -> str | None:
+    speaker, separator, _ = line.partition(":")
+    return normalize_name(speaker) if separator else None
+
+def _raw_remainder(raw_text: str, cleaned_turns: list[str]) -> str | None:
+    """
+    Returns the raw transcript after the part that `cleaned_turns` is the cleaned form of.
+    Cleaning keeps speakers in order and merges consecutive lines by one speaker, so each
+    cleaned turn lines up with one run of raw lines by the same speaker. Returns None if
+    the speakers do not line up.
+    """
+    raw_lines = raw_text.split("\n")
+    position, previous = 0, None
+    for turn in cleaned_turns:
+        if not turn.strip():
+            continue
+        speaker = _turn_speaker(turn)
+        if speaker is None:
+            return None
+        if speaker == previous:
+            continue  # A run the cleaner left split; its raw lines are already consumed.
+        while position < len(raw_lines) and not raw_lines[position].strip():
+            position += 1
+        if position == len(raw_lines) or _turn_speaker(raw_lines[position]) != speaker:
+            return None
+        while position < len(raw_lines) and (not raw_lines[position].strip() or _turn_speaker(raw_lines[position]) == speaker):
+            position += 1
+        previous = speaker
+    return "\n".join(raw_lines[position:])
+
+def clean_and_extract_streaming(raw_text: str, max_chars: int = STREAM_SEGMENT_CHARS) -> tuple[str, dict]:
+    """
+    Passes 1 and 2 overlapped: streams the cleaning pass and submits each segment of cleaned
+    turns (at most `max_chars`, with CHUNK_OVERLAP_TURNS turns of context from the previous
+    segment) to Pass 2 as soon as it is complete, up to CHUNK_PARALLELISM at a time, then
+    merges the partial results as extract_structured_data_chunked does.
+
+    Returns:
+        (cleaned_transcript, structured_data). If the stream fails, the raw transcript is
+        returned, as clean_transcript falls back to the raw text on error; the segments
+        already submitted are kept and only the rest of the raw transcript is extracted.
+    """
+    cleaned_pieces = []
+    segments = _StreamSegments(max_chars)
+
+    def record(pieces):
+        for piece in pieces:
+            cleaned_pieces.append(piece)
+            yield piece
+
+    with ThreadPoolExecutor(max_workers=CHUNK_PARALLELISM, thread_name_prefix="ai-extract") as executor:
+        futures = []
+
+        def submit(segment):
+            if segment is not None and segment.strip():
+                futures.append(executor.submit(extract_structured_data, segment))
+
+        try:
+            for line in _complete_lines(record(clean_transcript_stream(raw_text))):
+                submit(segments.add(line))
+            submit(segments.finish())
+        except Exception as e:
+            remainder = segments.remaining_raw(raw_text)
+            if remainder is None:
+                logging.error(f"AI PROCESSOR ERROR: Streaming transcript cleaning failed: {e}. Extracting from the raw transcript.")
+                for future in futures:
+                    future.cancel()
+                return raw_text, extract_structured_data_chunked(raw_text, max_chars=max_chars)
+            logging.error(f"AI PROCESSOR ERROR: Streaming transcript cleaning failed: {e}. Keeping {len(futures)} "
+                          f"extracted segment(s) and extracting the rest from the raw transcript.")
+            for chunk in split_transcript(remainder, max_chars, overlap_turns=CHUNK_OVERLAP_TURNS):
+                submit(chunk)
+            return raw_text, merge_structured_data([future.result() for future in futures])
+        logging.info(f"AI PROCESSOR: Cleaning stream complete; extracting from {len(futures)} segment(s).")
+        partials = [future.result() for future in futures]
+    return "".join(cleaned_pieces).strip(), merge_structured_data(partials)
+
+# --- Async Variants ---
+# The asyncio counterparts of the passes above, used by the async pipeline runner.
+# They share prompts, response parsing and the response cache with the synchronous passes.
+
+async def classify_meeting_async(transcript: str) -> dict:
+    logging.info("AI PROCESSOR: Starting Pass 0 - Classifying meeting...")
+    if not model: return {}
+    try:
+        opening = token_budget.truncate_to_tokens(transcript, CLASSIFY_INPUT_TOKENS)
+        response_text = await _generate_async(_classification_prompt(opening), "classify", opening, generation_config=JSON_RESPONSE)
+        return _parse_classification(response_text)
+    except Exception as e:
+        logging.error(f"AI PROCESSOR ERROR: An error occurred during meeting classification: {e}")
+        return {}
+
+async def clean_transcript_async(raw_text: str) -> str:
+    logging.info("AI PROCESSOR: Starting Pass 1 - Cleaning transcript...")
+    if not model: return raw_text
+    try:
+        return _finish_cleaning(await _generate_async(_cleaning_prompt(raw_text), "clean", raw_text))
+    except Exception as e:
+        logging.error(f"AI PROCESSOR ERROR: An error occurred during transcript cleaning: {e}")
+        return raw_text
+
+async def extract_structured_data_async(cleaned_transcript: str, fused: bool = False) -> dict:
+    pass_name, prompt = _extraction_prompt(cleaned_transcript, fused)
+    if not model: return {}
+    try:
+        return _parse_extraction(await _generate_async(prompt, pass_name, cleaned_transcript, generation_config=JSON_RESPONSE))
     except Exception as e:
         logging.error(f"AI PROCESSOR ERROR: An error occurred during data extraction: {e}")
         return {"empty_data": True, "error": str(e)} # Return empty flag on error
 
+async def clean_and_extract_async(raw_transcript: str) -> dict:
+    return await extract_structured_data_async(raw_transcript, fused=True)
+
+async def clean_transcript_chunked_async(raw_text: str | Transcript, max_chars: int = CHUNK_MAX_CHARS) -> str:
+    chunks = split_transcript(raw_text, max_chars)
+    logging.info(f"AI PROCESSOR: Cleaning transcript in {len(chunks)} chunk(s), {CHUNK_PARALLELISM} at a time...")
+    cleaned_chunks = await _gather_chunks(clean_transcript_async, chunks)
+    return "\n".join(chunk.strip() for chunk in cleaned_chunks)
+
+async def extract_structured_data_chunked_async(cleaned_transcript: str | Transcript, fused: bool = False,
+                                                max_chars: int = CHUNK_MAX_CHARS) -> dict:
+    chunks = split_transcript(cleaned_transcript, max_chars, overlap_turns=CHUNK_OVERLAP_TURNS)
+    logging.info(f"AI PROCESSOR: Extracting structured data from {len(chunks)} chunk(s), {CHUNK_PARALLELISM} at a time...")
+    return merge_structured_data(await _gather_chunks(partial(extract_structured_data_async, fused=fused), chunks))
+
+async def _gather_chunks(pass_fn, chunks: list[str]) -> list:
+    """
+    Runs an async pass on every chunk, at most CHUNK_PARALLELISM at a time, keeping chunk order.
+    """
+    semaphore = asyncio.Semaphore(CHUNK_PARALLELISM)
+
+    async def run(chunk):
+        async with semaphore:
+            return await pass_fn(chunk)
+
+    return await asyncio.gather(*(run(chunk) for chunk in chunks))
+
+async def _open_stream_async(prompt: str):
+    grant = await gemini_limiter.acquire_async(token_budget.estimate_tokens(prompt))
+    try:
+        return grant, await model.generate_content_async(prompt, stream=True)
+    except BaseException:
+        gemini_limiter.release(grant)
+        raise
+
+async def clean_transcript_stream_async(raw_text: str):
+    logging.info("AI PROCESSOR: Starting Pass 1 - Cleaning transcript (streaming)...")
+    if not model:
+        yield raw_text
+        return
+    cache_key, cached_text = _cache_lookup("clean", raw_text, None)
+    if cached_text is not None:
+        yield cached_text
+        return
+    prompt = _cleaning_prompt(raw_text)
+    token_budget.check_prompt_fits(prompt)
+    grant, response = await retry_policy.for_endpoint("gemini generate_content").call_async(lambda: _open_stream_async(prompt))
+    pieces, actual_tokens = [], None
+    try:
+        async for chunk in response:
+            pieces.append(chunk.text)
+            yield chunk.text
+        actual_tokens = _total_tokens(response)
+    finally:
+        gemini_limiter.release(grant, actual_tokens)
+    token_budget.check_not_truncated(response)
+    _cache_store(cache_key, _finish_cleaning("".join(pieces)), None)
+
+async def clean_and_extract_streaming_async(raw_text: str, max_chars: int = STREAM_SEGMENT_CHARS) -> tuple[str, dict]:
+    cleaned_pieces, tasks, pending = [], [], ""
+    segments = _StreamSegments(max_chars)
+    semaphore = asyncio.Semaphore(CHUNK_PARALLELISM)
+
+    async def extract(segment):
+        async with semaphore:
+            return await extract_structured_data_async(segment)
+
+    def submit(segment):
+        if segment is not None and segment.strip():
+            tasks.append(asyncio.ensure_future(extract(segment)))
+
+    try:
+        async for piece in clean_transcript_stream_async(raw_text):
+            cleaned_pieces.append(piece)
+            pending += piece
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                submit(segments.add(line))
+        if pending:
+            submit(segments.add(pending))
+        submit(segments.finish())
+    except Exception as e:
+        remainder = segments.remaining_raw(raw_text)
+        if remainder is None:
+            logging.error(f"AI PROCESSOR ERROR: Streaming transcript cleaning failed: {e}. Extracting from the raw transcript.")
+            for task in tasks:
+                task.cancel()
+            return raw_text, await extract_structured_data_chunked_async(raw_text, max_chars=max_chars)
+        logging.error(f"AI PROCESSOR ERROR: Streaming transcript cleaning failed: {e}. Keeping {len(tasks)} "
+                      f"extracted segment(s) and extracting the rest from the raw transcript.")
+        for chunk in split_transcript(remainder, max_chars, overlap_turns=CHUNK_OVERLAP_TURNS):
+            submit(chunk)
+        return raw_text, merge_structured_data(list(await asyncio.gather(*tasks)))
+    logging.info(f"AI PROCESSOR: Cleaning stream complete; extracting from {len(tasks)} segment(s).")
+    return "".join(cleaned_pieces).strip(), merge_structured_data(list(await asyncio.gather(*tasks)))
+
+def merge_structured_data(partials: list[dict]) -> dict:
+    """
+    Reduces per-chunk Pass 2 results into one result with the same schema.
+    If any chunk failed, the merged result carries its 'error' (a partial extraction
+    would silently drop action items).
+    """
+    errors = [partial.get('error') for partial in partials if partial.get('error')]
+    if errors:
+        return {"empty_data": True, "error": f"{len(errors)} of {len(partials)} chunk(s) failed: {errors[0]}"}
+
+    client_names = Counter(
+        partial.get('client_name') for partial in partials
+        if partial.get('client_name') and partial['client_name'].upper() not in ["UNKNOWN", "N/A"]
+    )
+    merged = {
+        "client_name": client_names.most_common(1)[0][0] if client_names else "Unknown",
+        "key_decisions": _dedupe_texts(item for partial in partials for item in partial.get('key_decisions') or []),
+        "action_items": _dedupe_action_items(item for partial in partials for item in partial.get('action_items') or []),
+        "unanswered_questions": _dedupe_texts(item for partial in partials for item in partial.get('unanswered_questions') or []),
+    }
+    _apply_empty_data_flag(merged)
+    logging.info(f"AI PROCESSOR: Merged {len(partials)} chunk result(s): {len(merged['key_decisions'])} decision(s), "
+                 f"{len(merged['action_items'])} action item(s), {len(merged['unanswered_questions'])} question(s).")
+    return merged
+
+def _is_near_duplicate(key: str, seen_keys: list[str], threshold: float = 0.85) -> bool:
+    return any(key == seen or SequenceMatcher(None, key, seen).ratio() >= threshold for seen in seen_keys)
+
+def _dedupe_texts(items) -> list:
+    """
+    Keeps the first of any near-identical strings (chunk overlap makes the model repeat itself).
+    """
+    kept, seen_keys = [], []
+    for item in items:
+        key = normalize_name(str(item))
+        if not key or _is_near_duplicate(key, seen_keys):
+            continue
+        seen_keys.append(key)
+        kept.append(item)
+    return kept
+
+def _dedupe_action_items(items) -> list:
+    """
+    Keeps the first of any action items with near-identical task text, filling in a missing
+    owner or due date from its duplicates.
+    """
+    kept, seen_keys = [], []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        key = normalize_name(str(item.get('task', '')))
+        if not key:
+            continue
+        for existing_key, existing in zip(seen_keys, kept):
+            if _is_near_duplicate(key, [existing_key]):
+                for field in ('owner', 'due_date'):
+                    if existing.get(field) in (None, "", "N/A") and item.get(field) not in (None, "", "N/A"):
+                        existing[field] = item[field]
+                break
+        else:
+            seen_keys.append(key)
+            kept.append(dict(item))
+    return kept
+
 def write_project_brief(structured_data: dict) -> str:
     """
     Pass 3: The "Project Brief Writer"
@@ -2,10 +2,16 @@ import os
 import logging
 from flask import Flask, request, jsonify, abort
 from dotenv import load_dotenv
+from werkzeug.serving import is_running_from_reloader
 
 # Import V4 custom modules
-from fireflies_client import FirefliesClient
-from asana_client import AsanaClient
+from fireflies_client import FirefliesClient, AsyncFirefliesClient, fireflies_limiter
+from asana_client import AsanaClient, AsyncAsanaClient
+from job_queue import JobQueue, AsyncJobQueue
+from job_store import JobStore
+from pipeline import run_meeting_pipeline, run_meeting_pipeline_async
+import project_router
+import fireflies_batcher
 import ai_processor
 
 # Load environment variables from .env file
@@ -17,26 +23,89 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # For production, consider setting this back to logging.INFO or logging.WARNING.
 logging.getLogger().setLevel(logging.DEBUG)
 
-def create_app():
+def create_pipeline_handler(use_async_runtime: bool, warm_router: bool = True,
+                            batch_window_seconds: float = fireflies_batcher.BATCH_WINDOW_SECONDS,
+                            worker_count: int | None = None):
+    """
+    Builds the Fireflies and Asana clients and the project router, and returns the job
+    handler that runs the meeting pipeline with them. Shared by the webhook's job queue
+    and the historical backfill (backfill.py).
+
+    Args:
+        use_async_runtime: Return a coroutine handler for AsyncJobQueue instead of a
+            plain one for JobQueue.
+        warm_router: Start loading the project index for routing in the background.
+        batch_window_seconds: Coalesce transcript fetches made within this window into bulk
+            queries; 0 fetches each meeting separately. Defaults to FIREFLIES_BATCH_WINDOW_MS.
+        worker_count: Meetings run at the same time, used to size the connection pools.
+            Defaults to JOB_WORKER_COUNT.
+    """
+    # Note: FirefliesClient and AsanaClient should be initialized here
+    # and passed configurations/API keys if not using global singletons.
+    # For this example, assuming they handle their own config via env vars.
+    fireflies_client = AsyncFirefliesClient(worker_count) if use_async_runtime else FirefliesClient(worker_count)
+    asana_client = AsyncAsanaClient(worker_count) if use_async_runtime else AsanaClient(worker_count)
+    # Transcript fetches from jobs running at the same time share one aliased GraphQL query.
+    if batch_window_seconds > 0:
+        fireflies_client = fireflies_batcher.CoalescingFirefliesClient(fireflies_client, batch_window_seconds)
+
+    ASANA_DEFAULT_PROJECT_GID = os.environ.get("ASANA_PROJECT_GID")
+
+    # ASANA_ROUTING_ENABLED sends external meetings to their client's project.
+    router = None
+    if project_router.ROUTING_ENABLED and ASANA_DEFAULT_PROJECT_GID:
+        router = project_router.ProjectRouter(asana_client, ASANA_DEFAULT_PROJECT_GID)
+        if warm_router:
+            router.warm()
+
+    # Each job resumes from the artifacts checkpointed by any previous attempt.
+    def process_meeting_job(job: dict, save_stage) -> dict:
+        return run_meeting_pipeline(
+            job["meeting_id"], fireflies_client, asana_client, ASANA_DEFAULT_PROJECT_GID,
+            artifacts=job["artifacts"], save_stage=save_stage, router=router
+        )
+
+    async def process_meeting_job_async(job: dict, save_stage) -> dict:
+        return await run_meeting_pipeline_async(
+            job["meeting_id"], fireflies_client, asana_client, ASANA_DEFAULT_PROJECT_GID,
+            artifacts=job["artifacts"], save_stage=save_stage, router=router
+        )
+
+    return process_meeting_job_async if use_async_runtime else process_meeting_job
+
+def create_app(start_workers: bool = True):
     """
     V4: Factory function to create and configure the Flask application.
+
+    Args:
+        start_workers: Whether to start the background job workers. The Werkzeug
+            reloader's watcher process passes False so only the serving process runs jobs.
     """
     app = Flask(__name__)
 
     # Initialize clients
-    # Note: FirefliesClient and AsanaClient should be initialized here
-    # and passed configurations/API keys if not using global singletons.
-    # For this example, assuming they handle their own config via env vars.
-    fireflies_client = FirefliesClient()
-    asana_client = AsanaClient()
+    # PIPELINE_RUNTIME=async runs every meeting as a coroutine on one event loop
+    # instead of one worker thread per in-flight meeting.
+    use_async_runtime = os.environ.get("PIPELINE_RUNTIME", "threads").lower() == "async"
+    process_meeting_job = create_pipeline_handler(use_async_runtime, warm_router=start_workers)
 
     ASANA_DEFAULT_PROJECT_GID = os.environ.get("ASANA_PROJECT_GID")
     FIREFLIES_WEBHOOK_SECRET = os.environ.get("FIREFLIES_WEBHOOK_SECRET")
 
+    # The webhook only validates and enqueues; the pipeline runs on the worker pool.
+    job_store = JobStore()
+    if use_async_runtime:
+        job_queue = AsyncJobQueue(process_meeting_job, job_store)
+    else:
+        job_queue = JobQueue(process_meeting_job, job_store)
+    if start_workers:
+        job_queue.start()
+
     @app.route('/webhook/fireflies', methods=['POST'])
     def fireflies_webhook():
         """
         V4: This is the main entry point, triggered by Fireflies.ai when a transcript is ready.
+        Validates the request, queues the meeting and acknowledges with 202 and a job ID.
         """
         logging.info("V4 WEBHOOK: Received POST notification from Fireflies.")
 
@@ -55,7 +124,10 @@ def create_app():
             logging.error("Server is not configured. Missing ASANA_PROJECT_GID in .env file.")
             abort(500, "Server configuration error.")
 
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            logging.warning("Received Fireflies webhook with a missing or non-JSON body.")
+            return jsonify({"status": "error", "message": "Request body must be a JSON object"}), 400
         # Fireflies webhook payload structure varies.
         # Assuming 'id' is the meeting ID from a 'meeting.completed' event.
         # Adjust 'data.get('id')' based on actual Fireflies webhook docs if needed for other event types.
@@ -71,110 +143,50 @@ def create_app():
             return jsonify({"status": "skipped", "message": f"Event type '{event_type}' not processed"}), 200
 
 
-        logging.info(f"Processing Fireflies meeting ID: {meeting_id}")
-
-        # --- Step 1: Fetch meeting data from Fireflies (transcript and title) ---
-        meeting_data = fireflies_client.get_transcript_and_title(meeting_id)
-        if not meeting_data or not meeting_data.get('transcript'):
-            logging.error(f"Failed to fetch transcript for meeting ID: {meeting_id}")
-            abort(500, f"Could not retrieve transcript data for meeting ID: {meeting_id}")
-
-        transcript = meeting_data.get('transcript')
-        meeting_title = meeting_data.get('title', 'Untitled Meeting')
-
-        # --- DEMO SAFE REVERSION: Bypassing AI Classification & Routing ---
-        # The following 'classify_meeting' and 'find_project_by_name' logic is temporarily disabled
-        # for a predictable demo that always posts to the default project.
-        # To re-enable, simply uncomment the following block and ensure AsanaClient has find_project_by_name.
-        #
-        # classification = ai_processor.classify_meeting(transcript)
-        # meeting_type = classification.get('meeting_type', 'internal')
-        # client_name = classification.get('client_name', 'N/A')
-        #
-        # target_project_gid_from_ai = ASANA_DEFAULT_PROJECT_GID
-        # if meeting_type == 'external' and client_name != 'N/A':
-        #    logging.info(f"External meeting identified. Searching for project for client: {client_name}")
-        #    # Assuming asana_client.find_project_by_name exists and works
-        #    found_project_gid = asana_client.find_project_by_name(client_name)
-        #    if found_project_gid:
-        #        target_project_gid_from_ai = found_project_gid
-        #    else:
-        #        logging.warning(f"Client project for '{client_name}' not found. Using default project.")
-        # target_project_gid = target_project_gid_from_ai # Use the dynamically determined GID
-
-        target_project_gid = ASANA_DEFAULT_PROJECT_GID # For predictable demo
-        logging.info(f"DEMO MODE: Bypassing AI routing. Using default project GID: {target_project_gid}")
-        # --- END DEMO SAFE REVERSION ---
-
-        # --- Step 2: Create a placeholder task in Asana for the brief ---
-        task_name = f"Meeting Summary: {meeting_title}"
-        new_task_gid = asana_client.create_task_with_attachment(
-            project_gid=target_project_gid,
-            task_name=task_name,
-            transcript_content=transcript # Attach the raw transcript
-        )
-        if not new_task_gid:
-            logging.error("Failed to create the initial task in Asana or attach transcript.")
-            abort(500, "Failed to create the initial Asana task.")
-
-        logging.info(f"ASANA CLIENT: Successfully created task with GID: {new_task_gid} and attached transcript.")
-
-        # --- Step 3: AI Processing Pipeline ---
-        # Pass 1: Clean Transcript
-        cleaned_transcript = ai_processor.clean_transcript(transcript)
-
-        # Pass 2: Extract Structured Data
-        structured_data = ai_processor.extract_structured_data(cleaned_transcript)
-
-        # --- MODIFICATION: Graceful handling for empty or malformed structured data ---
-        project_brief_content = ""
-        action_items_to_create = []
-
-        if not structured_data or not isinstance(structured_data, dict) or structured_data.get("empty_data", False):
-            logging.info("AI PROCESSOR: Detected empty or invalid structured data from Pass 2. Generating concise 'no data' brief.")
-            # Call write_project_brief with the "empty_data" flag to get the generic message
-            project_brief_content = ai_processor.write_project_brief({"empty_data": True})
-            # No action items to create if data is empty
-        else:
-            # Pass 3: Write Project Brief (only if data is meaningful)
-            project_brief_content = ai_processor.write_project_brief(structured_data)
-
-            # Prepare action items for sub-task creation
-            action_items_to_create = structured_data.get('action_items', [])
-            if not isinstance(action_items_to_create, list):
-                logging.warning("AI PROCESSOR: 'action_items' was not a list, skipping sub-task creation.")
-                action_items_to_create = [] # Ensure it's an empty list if malformed
-
-        # --- Step 4: Post the AI-generated brief as a comment to the Asana task ---
-        # project_brief_content will now be Markdown from ai_processor
-        asana_client.post_comment_to_task(new_task_gid, project_brief_content)
-        logging.info("ASANA CLIENT: Successfully posted comment.")
-
-        # --- Step 5: Create sub-tasks (if action items exist) ---
-        if action_items_to_create:
-            logging.info(f"Creating {len(action_items_to_create)} sub-tasks...")
-            for item in action_items_to_create:
-                if isinstance(item, dict):
-                    subtask_name = item.get('task')
-                    owner_name = item.get('owner') # Assuming AsanaClient can map name to GID
-                    due_date = item.get('due_date')
-
-                    if subtask_name: # Only create if subtask name exists
-                        asana_client.create_subtask(new_task_gid, subtask_name, owner_name=owner_name, due_on=due_date)
-                        logging.info(f"ASANA CLIENT: Created sub-task: {subtask_name}")
-                    else:
-                        logging.warning(f"Skipping sub-task creation due to missing 'task' name in item: {item}")
-                else:
-                    logging.warning(f"Skipping sub-task creation for non-dict item: {item}")
-
-
-        logging.info(f"Successfully completed V4 workflow for meeting ID: {meeting_id}. New Asana Task GID: {new_task_gid}")
-        return jsonify({"status": "success", "message": "Workflow completed", "asana_task_gid": new_task_gid}), 200
+        # Fireflies redelivers webhooks; a repeat of a known meeting returns the existing job.
+        job, is_duplicate = job_queue.submit_once(meeting_id, event_type or 'meeting.completed')
+        job_id = job["job_id"]
+        if is_duplicate:
+            asana_task_gid = (job.get("result") or {}).get("asana_task_gid") or job["artifacts"].get("asana_task_gid")
+            logging.info(f"Duplicate webhook for meeting ID: {meeting_id}. Returning existing job {job_id}.")
+            return jsonify({
+                "status": "duplicate",
+                "message": f"Meeting already received (job is {job['status']})",
+                "job_id": job_id,
+                "asana_task_gid": asana_task_gid,
+            }), 200
+
+        logging.info(f"Queued Fireflies meeting ID: {meeting_id} as job {job_id}")
+        return jsonify({"status": "accepted", "message": "Meeting queued for processing", "job_id": job_id}), 202
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def job_status(job_id):
+        """
+        Reports the state of a queued meeting job and, once finished, its result.
+        """
+        job = job_queue.get_job(job_id)
+        if not job:
+            return jsonify({"status": "error", "message": f"Unknown job ID: {job_id}"}), 404
+        # Artifacts hold full transcripts; only report which stages are done.
+        artifacts = job.pop("artifacts")
+        job["completed_stages"] = artifacts.get("completed_stages", [])
+        return jsonify(job), 200
+
+    @app.route('/stats', methods=['GET'])
+    def service_stats():
+        """
+        Reports Gemini and Fireflies rate limiter utilisation and LLM response cache hit rates.
+        """
+        return jsonify({
+            "gemini_rate_limiter": ai_processor.gemini_limiter.stats(),
+            "fireflies_rate_limiter": fireflies_limiter.stats(),
+            "llm_cache": ai_processor.get_response_cache().stats() if ai_processor.get_response_cache() else None,
+        }), 200
 
     return app
 
 if __name__ == '__main__':
-    app = create_app()
+    app = create_app(start_workers=is_running_from_reloader())
     # Port is read from environment variable FLASK_RUN_PORT, default to 5019 if not set
     port = int(os.environ.get("FLASK_RUN_PORT", 5019))
     app.run(host='0.0.0.0', port=port, debug=True)
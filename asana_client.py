@@ -1,14 +1,44 @@
 import os
-import requests
+import re
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+import retry_policy
+from http_session import build_session
+from project_index import ProjectIndex
+from user_directory import UserDirectory
+
+# Optional: httpx is only needed by AsyncAsanaClient.
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # Load environment variables
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Asana's /batch endpoint accepts at most this many actions per request.
+MAX_BATCH_ACTIONS = 10
+
+# Numeric GIDs in request paths, collapsed so each endpoint shares one retry policy.
+_GID_IN_PATH = re.compile(r"/\d+")
+
+
+def _default_pool_size(worker_count: int | None = None) -> int:
+    """
+    ASANA_HTTP_POOL_SIZE, or enough connections for every job worker (`worker_count`,
+    defaulting to JOB_WORKER_COUNT) to have ASANA_SUBTASK_CONCURRENCY requests in flight at once.
+    """
+    if os.environ.get("ASANA_HTTP_POOL_SIZE"):
+        return int(os.environ["ASANA_HTTP_POOL_SIZE"])
+    return (worker_count or int(os.environ.get("JOB_WORKER_COUNT", 4))) * int(os.environ.get("ASANA_SUBTASK_CONCURRENCY", 4))
+
+
 class AsanaClient:
     """
     V4: An adapter class to handle all communications with the Asana API.
@@ -16,22 +46,35 @@ class AsanaClient:
     """
     API_BASE_URL = "https://app.asana.com/api/1.0"
 
-    def __init__(self):
+    def __init__(self, worker_count: int | None = None):
         """
         Initializes the Asana client and the requests session.
+
+        Args:
+            worker_count: Jobs that call Asana at the same time, which sizes the connection
+                pool unless ASANA_HTTP_POOL_SIZE is set. Defaults to JOB_WORKER_COUNT or 4.
         """
         self.session = None
+        self.worker_count = worker_count
         self.workspace_gid = os.environ.get("ASANA_WORKSPACE_GID")
+        # Built lazily on the first project lookup or owner resolution.
+        self.project_index = ProjectIndex(self)
+        self.user_directory = UserDirectory(self)
         try:
             token = os.environ.get('ASANA_PERSONAL_ACCESS_TOKEN')
             if not token or not self.workspace_gid:
                 raise ValueError("Asana token or workspace GID not set in .env file.")
 
-            self.session = requests.Session()
-            self.session.headers.update({"Authorization": f"Bearer {token}", "Accept": "application/json"})
+            # The session is shared by every worker thread, so only fixed headers live on it.
+            # Content-Type is set per request by requests itself (json= or files=).
+            self.session = build_session(
+                pool_size=_default_pool_size(self.worker_count),
+                timeout=(float(os.environ.get("ASANA_CONNECT_TIMEOUT", 5)), float(os.environ.get("ASANA_READ_TIMEOUT", 60))),
+                headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+            )
 
             # Verify credentials
-            response = self.session.get(f"{self.API_BASE_URL}/users/me")
+            response = self._request("GET", "/users/me")
             response.raise_for_status()
             logging.info("ASANA CLIENT: Initialized and token verified successfully.")
 
@@ -39,62 +82,86 @@ class AsanaClient:
             logging.error(f"ASANA CLIENT ERROR: Failed to initialize - {e}")
             self.session = None
 
+    def _request(self, method: str, path: str, **kwargs):
+        """
+        Sends one API request through the shared retry policy for its endpoint.
+        Reads are retried on any transient failure; POSTs create things, so they are only
+        retried when Asana certainly did not process them (429, 503, connect errors).
+        """
+        endpoint = _GID_IN_PATH.sub("/{gid}", path)
+        policy = retry_policy.for_endpoint(f"asana {method} {endpoint}")
+        return policy.call(
+            lambda: self.session.request(method, f"{self.API_BASE_URL}{path}", **kwargs),
+            idempotent=method in ("GET", "PUT", "DELETE"),
+        )
+
+    def iter_pages(self, path: str, params: dict | None = None, page_size: int = 100):
+        """
+        Yields every record from a paginated Asana collection endpoint, following next_page offsets.
+        Raises on HTTP errors so callers can keep their previous data.
+        """
+        if not self.session:
+            raise RuntimeError("Asana client not initialized.")
+        params = dict(params or {}, limit=page_size)
+        while True:
+            response = self._request("GET", path, params=params)
+            response.raise_for_status()
+            body = response.json()
+            yield from body.get('data', [])
+            next_page = body.get('next_page')
+            if not next_page or not next_page.get('offset'):
+                return
+            params['offset'] = next_page['offset']
+
     def find_project_by_name(self, project_name: str) -> str | None:
         """
         Finds a project's GID within the configured workspace by its name.
+        Served from the cached ProjectIndex: exact match first, then a unique prefix, then fuzzy.
         """
         if not self.session: return None
         logging.info(f"ASANA CLIENT: Searching for project named '{project_name}'...")
 
-        url = f"{self.API_BASE_URL}/projects"
-        params = {"workspace": self.workspace_gid, "opt_fields": "name"}
-
-        try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            projects = response.json().get('data', [])
-
-            for project in projects:
-                if project.get('name', '').lower() == project_name.lower():
-                    logging.info(f"ASANA CLIENT: Found project '{project_name}' with GID: {project['gid']}")
-                    return project['gid']
-
+        project_gid = self.project_index.find(project_name)
+        if project_gid:
+            logging.info(f"ASANA CLIENT: Found project '{project_name}' with GID: {project_gid}")
+        else:
             logging.warning(f"ASANA CLIENT: Project '{project_name}' not found.")
-            return None
-        except Exception as e:
-            logging.error(f"ASANA CLIENT ERROR: Failed to find project '{project_name}': {e}")
-            return None
+        return project_gid
 
-    def create_task_with_attachment(self, project_gid: str, task_name: str, transcript_content: str) -> str | None:
+    def create_task(self, project_gid: str, task_name: str) -> str | None:
         """
-        Creates a new task in a specified project and attaches the transcript.
+        Creates a new task in a specified project. Returns its GID, or None if it could not be created.
         """
         if not self.session: return None
         logging.info(f"ASANA CLIENT: Creating task '{task_name}' in project {project_gid}...")
 
         try:
-            # Step 1: Create the task
-            task_url = f"{self.API_BASE_URL}/tasks"
             task_payload = {"data": {"name": task_name, "workspace": self.workspace_gid, "projects": [project_gid]}}
-            self.session.headers.update({"Content-Type": "application/json"})
-            response = self.session.post(task_url, json=task_payload)
+            response = self._request("POST", "/tasks", json=task_payload)
             response.raise_for_status()
             new_task_gid = response.json().get('data', {}).get('gid')
             if not new_task_gid: raise Exception("Failed to get GID from new task response.")
             logging.info(f"ASANA CLIENT: Successfully created task with GID: {new_task_gid}")
+            return new_task_gid
+        except Exception as e:
+            logging.error(f"ASANA CLIENT ERROR: Failed to create task: {e}")
+            return None
 
-            # Step 2: Attach the transcript
-            attach_url = f"{self.API_BASE_URL}/tasks/{new_task_gid}/attachments"
-            if "Content-Type" in self.session.headers: del self.session.headers["Content-Type"]
+    def attach_transcript(self, task_gid: str, transcript_content: str) -> bool:
+        """
+        Attaches the transcript to an existing task as transcript.txt. Returns True on success.
+        Kept separate from create_task so a failed upload can be retried without a new task.
+        """
+        if not self.session: return False
+        try:
             files = {'file': ('transcript.txt', transcript_content, 'text/plain')}
-            response = self.session.post(attach_url, files=files)
+            response = self._request("POST", f"/tasks/{task_gid}/attachments", files=files)
             response.raise_for_status()
             logging.info(f"ASANA CLIENT: Successfully attached transcript.")
-
-            return new_task_gid
+            return True
         except Exception as e:
-            logging.error(f"ASANA CLIENT ERROR: Failed to create task with attachment: {e}")
-            return None
+            logging.error(f"ASANA CLIENT ERROR: Failed to attach transcript to task {task_gid}: {e}")
+            return False
 
     def post_comment_to_task(self, task_gid: str, comment_html: str):
         """
@@ -104,27 +171,280 @@ class AsanaClient:
         if not self.session: return
         logging.info(f"ASANA CLIENT: Posting comment to task {task_gid}...")
         try:
-            url = f"{self.API_BASE_URL}/tasks/{task_gid}/stories"
-            self.session.headers.update({"Content-Type": "application/json"})
-            payload = {"data": {"html_text": f"<body>{comment_html}</body>"}}
-            self.session.post(url, json=payload).raise_for_status()
+            payload = {"data": _comment_data(comment_html)}
+            self._request("POST", f"/tasks/{task_gid}/stories", json=payload).raise_for_status()
             logging.info(f"ASANA CLIENT: Successfully posted comment.")
         except Exception as e:
             logging.error(f"ASANA CLIENT ERROR: Failed to post comment: {e}")
 
-    def create_subtask(self, parent_task_gid: str, subtask_name: str, due_on: str | None = None):
+    def create_subtask(self, parent_task_gid: str, subtask_name: str, due_on: str | None = None,
+                       owner_name: str | None = None) -> str | None:
         """
-        Creates a new sub-task with an optional due date.
+        Creates a new sub-task with an optional due date, assigned to the workspace user
+        matching `owner_name` if one is found in the cached UserDirectory.
+        Returns the new sub-task's GID, or None if it could not be created.
         """
-        # (Implementation is the same as V3)
-        if not self.session: return
+        if not self.session: return None
         logging.info(f"ASANA CLIENT: Creating sub-task '{subtask_name}'...")
         try:
-            url = f"{self.API_BASE_URL}/tasks"
-            self.session.headers.update({"Content-Type": "application/json"})
-            payload_data = {"name": subtask_name, "parent": parent_task_gid}
-            if due_on: payload_data['due_on'] = due_on
-            self.session.post(url, json={"data": payload_data}).raise_for_status()
+            assignee_gid = self.user_directory.resolve(owner_name)
+            response = self._request("POST", "/tasks", json={"data": _subtask_data(parent_task_gid, subtask_name, due_on, assignee_gid)})
+            response.raise_for_status()
             logging.info(f"ASANA CLIENT: Successfully created sub-task.")
+            return response.json().get('data', {}).get('gid')
         except Exception as e:
             logging.error(f"ASANA CLIENT ERROR: Failed to create sub-task: {e}")
+            return None
+
+    def batch(self) -> "AsanaBatch":
+        """
+        Starts a new batch of actions to send through Asana's /batch endpoint.
+        """
+        return AsanaBatch(self)
+
+    def execute_batch(self, actions: list[dict]) -> list[dict]:
+        """
+        Sends up to MAX_BATCH_ACTIONS actions in a single /batch request.
+
+        Args:
+            actions: Asana batch actions, e.g. {'relative_path': '/tasks', 'method': 'post', 'data': {...}}.
+
+        Returns:
+            One {'status_code': ..., 'body': ...} per action, in order. If the request
+            itself fails, every entry has status_code None and an 'error' message.
+        """
+        if len(actions) > MAX_BATCH_ACTIONS:
+            raise ValueError(f"Asana batch requests accept at most {MAX_BATCH_ACTIONS} actions, got {len(actions)}.")
+        if not self.session:
+            return [{"status_code": None, "body": None, "error": "Asana client not initialized."} for _ in actions]
+
+        logging.info(f"ASANA CLIENT: Sending batch of {len(actions)} action(s)...")
+        try:
+            response = self._request("POST", "/batch", json={"data": {"actions": actions}})
+            response.raise_for_status()
+            results = response.json().get('data', [])
+            if len(results) != len(actions):
+                raise Exception(f"Batch returned {len(results)} result(s) for {len(actions)} action(s).")
+            logging.info(f"ASANA CLIENT: Batch completed.")
+            return results
+        except Exception as e:
+            logging.error(f"ASANA CLIENT ERROR: Batch request failed: {e}")
+            return [{"status_code": None, "body": None, "error": str(e)} for _ in actions]
+
+
+class AsyncAsanaClient(AsanaClient):
+    """
+    The asyncio variant of AsanaClient. Task creation and /batch requests go over an
+    httpx.AsyncClient so one event loop can publish many meetings at once; the cached
+    project index and user directory still crawl on the inherited pooled session,
+    in their own background threads. Requires httpx.
+    """
+
+    def __init__(self, worker_count: int | None = None):
+        super().__init__(worker_count)
+        self.async_session = None
+
+    def _get_async_session(self):
+        # Created on first use so it is bound to the event loop that runs the pipeline.
+        if self.async_session is None:
+            pool_size = _default_pool_size(self.worker_count)
+            self.async_session = httpx.AsyncClient(
+                headers={"Authorization": self.session.headers["Authorization"], "Accept": "application/json"},
+                timeout=httpx.Timeout(float(os.environ.get("ASANA_READ_TIMEOUT", 60)),
+                                      connect=float(os.environ.get("ASANA_CONNECT_TIMEOUT", 5))),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        return self.async_session
+
+    async def _request_async(self, method: str, path: str, **kwargs):
+        """
+        The asyncio counterpart of _request, sharing its per-endpoint retry policies.
+        """
+        endpoint = _GID_IN_PATH.sub("/{gid}", path)
+        policy = retry_policy.for_endpoint(f"asana {method} {endpoint}")
+        session = self._get_async_session()
+        return await policy.call_async(
+            lambda: session.request(method, f"{self.API_BASE_URL}{path}", **kwargs),
+            idempotent=method in ("GET", "PUT", "DELETE"),
+        )
+
+    async def create_task_async(self, project_gid: str, task_name: str) -> str | None:
+        """
+        The asyncio counterpart of create_task.
+        """
+        if not self.session or not httpx: return None
+        logging.info(f"ASANA CLIENT: Creating task '{task_name}' in project {project_gid} (async)...")
+
+        try:
+            task_payload = {"data": {"name": task_name, "workspace": self.workspace_gid, "projects": [project_gid]}}
+            response = await self._request_async("POST", "/tasks", json=task_payload)
+            response.raise_for_status()
+            new_task_gid = response.json().get('data', {}).get('gid')
+            if not new_task_gid: raise Exception("Failed to get GID from new task response.")
+            logging.info(f"ASANA CLIENT: Successfully created task with GID: {new_task_gid}")
+            return new_task_gid
+        except Exception as e:
+            logging.error(f"ASANA CLIENT ERROR: Failed to create task: {e}")
+            return None
+
+    async def attach_transcript_async(self, task_gid: str, transcript_content: str) -> bool:
+        """
+        The asyncio counterpart of attach_transcript.
+        """
+        if not self.session or not httpx: return False
+        try:
+            files = {'file': ('transcript.txt', transcript_content, 'text/plain')}
+            response = await self._request_async("POST", f"/tasks/{task_gid}/attachments", files=files)
+            response.raise_for_status()
+            logging.info(f"ASANA CLIENT: Successfully attached transcript.")
+            return True
+        except Exception as e:
+            logging.error(f"ASANA CLIENT ERROR: Failed to attach transcript to task {task_gid}: {e}")
+            return False
+
+    async def execute_batch_async(self, actions: list[dict]) -> list[dict]:
+        """
+        The asyncio counterpart of execute_batch, with the same return value.
+        """
+        if len(actions) > MAX_BATCH_ACTIONS:
+            raise ValueError(f"Asana batch requests accept at most {MAX_BATCH_ACTIONS} actions, got {len(actions)}.")
+        if not self.session or not httpx:
+            return [{"status_code": None, "body": None, "error": "Asana client not initialized."} for _ in actions]
+
+        logging.info(f"ASANA CLIENT: Sending batch of {len(actions)} action(s) (async)...")
+        try:
+            response = await self._request_async("POST", "/batch", json={"data": {"actions": actions}})
+            response.raise_for_status()
+            results = response.json().get('data', [])
+            if len(results) != len(actions):
+                raise Exception(f"Batch returned {len(results)} result(s) for {len(actions)} action(s).")
+            logging.info(f"ASANA CLIENT: Batch completed.")
+            return results
+        except Exception as e:
+            logging.error(f"ASANA CLIENT ERROR: Batch request failed: {e}")
+            return [{"status_code": None, "body": None, "error": str(e)} for _ in actions]
+
+    async def aclose(self):
+        if self.async_session is not None:
+            await self.async_session.aclose()
+            self.async_session = None
+
+
+class BatchResult:
+    """
+    The outcome of one action in an AsanaBatch, filled in when the batch is executed.
+    """
+    __slots__ = ("status_code", "data", "error")
+
+    def __init__(self):
+        self.status_code = None
+        self.data = None
+        self.error = "Batch not executed."
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsanaBatch:
+    """
+    Collects Asana actions from several callers and sends them through /batch in as few
+    requests as possible. Each add_* call returns a BatchResult that is filled in with
+    that action's own outcome once execute() runs.
+    """
+
+    def __init__(self, client: AsanaClient):
+        self.client = client
+        self._actions = []
+        self._results = []
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def add(self, method: str, relative_path: str, data: dict | None = None) -> BatchResult:
+        """
+        Queues a raw action, e.g. add('put', f'/tasks/{gid}', {'completed': True}).
+        """
+        action = {"method": method, "relative_path": relative_path}
+        if data is not None:
+            action["data"] = data
+        result = BatchResult()
+        self._actions.append(action)
+        self._results.append(result)
+        return result
+
+    def add_comment(self, task_gid: str, comment_html: str) -> BatchResult:
+        """
+        Queues the same rich text comment that post_comment_to_task would post.
+        """
+        return self.add("post", f"/tasks/{task_gid}/stories", _comment_data(comment_html))
+
+    def add_subtask(self, parent_task_gid: str, subtask_name: str, due_on: str | None = None,
+                    owner_name: str | None = None) -> BatchResult:
+        """
+        Queues the same sub-task that create_subtask would create.
+        """
+        assignee_gid = self.client.user_directory.resolve(owner_name)
+        return self.add("post", "/tasks", _subtask_data(parent_task_gid, subtask_name, due_on, assignee_gid))
+
+    def execute(self, max_workers: int = 1) -> list[BatchResult]:
+        """
+        Sends all queued actions in chunks of MAX_BATCH_ACTIONS, up to `max_workers`
+        chunks at a time, and fills in every BatchResult.
+        """
+        chunks = [
+            (self._actions[i:i + MAX_BATCH_ACTIONS], self._results[i:i + MAX_BATCH_ACTIONS])
+            for i in range(0, len(self._actions), MAX_BATCH_ACTIONS)
+        ]
+
+        def run_chunk(chunk):
+            actions, results = chunk
+            for result, response in zip(results, self.client.execute_batch(actions)):
+                _fill_result(result, response)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="asana-batch") as executor:
+            list(executor.map(run_chunk, chunks))
+
+        return list(self._results)
+
+    async def execute_async(self, max_workers: int = 1) -> list[BatchResult]:
+        """
+        The asyncio counterpart of execute(), for a batch started from an AsyncAsanaClient.
+        At most `max_workers` chunks are in flight at a time.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def run_chunk(start):
+            actions, results = self._actions[start:start + MAX_BATCH_ACTIONS], self._results[start:start + MAX_BATCH_ACTIONS]
+            async with semaphore:
+                responses = await self.client.execute_batch_async(actions)
+            for result, response in zip(results, responses):
+                _fill_result(result, response)
+
+        await asyncio.gather(*(run_chunk(start) for start in range(0, len(self._actions), MAX_BATCH_ACTIONS)))
+        return list(self._results)
+
+
+def _fill_result(result: BatchResult, response: dict):
+    result.status_code = response.get("status_code")
+    body = response.get("body") or {}
+    if result.status_code and 200 <= result.status_code < 300:
+        result.data = body.get("data")
+        result.error = None
+    elif response.get("error"):
+        result.error = response["error"]
+    else:
+        errors = body.get("errors") or [{}]
+        result.error = f"HTTP {result.status_code}: {errors[0].get('message', 'Unknown error')}"
+
+
+def _comment_data(comment_html: str) -> dict:
+    return {"html_text": f"<body>{comment_html}</body>"}
+
+
+def _subtask_data(parent_task_gid: str, subtask_name: str, due_on: str | None = None,
+                  assignee_gid: str | None = None) -> dict:
+    payload_data = {"name": subtask_name, "parent": parent_task_gid}
+    if due_on: payload_data['due_on'] = due_on
+    if assignee_gid: payload_data['assignee'] = assignee_gid
+    return payload_data
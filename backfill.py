@@ -0,0 +1,262 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from datetime import date, datetime, time as dt_time, timezone
+from dotenv import load_dotenv
+
+from fireflies_client import FirefliesClient, fireflies_limiter
+from job_queue import JobQueue, AsyncJobQueue
+from job_store import JobStore
+from app import create_pipeline_handler
+import ai_processor
+import fireflies_batcher
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Backfilled meetings share the webhook's event type, so a meeting the webhook already
+# processed (or a previous backfill finished) is skipped rather than summarised twice.
+EVENT_TYPE = "meeting.completed"
+
+# How often the wait for the last meetings re-checks whether the job queue has drained.
+_DRAIN_POLL_SECONDS = 1.0
+
+
+class BackfillStats:
+    """
+    Counts meetings as they are listed, queued and finished, and reports throughput.
+    Updated from the job workers (threads or the event loop thread) and read by the main thread.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.listed = 0
+        self.skipped = 0
+        self.queued = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.pipeline_seconds = 0.0
+        self.listing_done = False
+        self._condition = threading.Condition()
+
+    def record_submitted(self, is_duplicate: bool):
+        with self._condition:
+            self.listed += 1
+            if is_duplicate:
+                self.skipped += 1
+            else:
+                self.queued += 1
+
+    def record_finished(self, succeeded: bool, seconds: float):
+        with self._condition:
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.pipeline_seconds += seconds
+            self._condition.notify_all()
+
+    def finish_listing(self):
+        with self._condition:
+            self.listing_done = True
+            self._condition.notify_all()
+
+    def wait(self, timeout: float, drained) -> bool:
+        """
+        Waits up to `timeout` seconds for every queued meeting to finish; returns True once
+        they have, or once the listing is done and `drained()` reports the job queue empty.
+        A job the queue drops without running it is never counted as finished, so without
+        the drained check the wait would never end.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not (self._all_done() or (self.listing_done and drained())):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(min(remaining, _DRAIN_POLL_SECONDS))
+            return True
+
+    @property
+    def not_run(self) -> int:
+        with self._condition:
+            return self.queued - self.succeeded - self.failed
+
+    def _all_done(self) -> bool:
+        return self.listing_done and self.succeeded + self.failed >= self.queued
+
+    def report(self) -> str:
+        with self._condition:
+            elapsed = time.monotonic() - self.started_at
+            finished = self.succeeded + self.failed
+            per_minute = finished / (elapsed / 60) if elapsed else 0.0
+            average = self.pipeline_seconds / finished if finished else 0.0
+            remaining = self.queued - finished
+            eta = f", ~{remaining / per_minute:.0f} min left" if per_minute and self.listing_done and remaining else ""
+            line = (f"BACKFILL: {finished}/{self.queued} queued meetings done ({self.succeeded} succeeded, "
+                    f"{self.failed} failed), {self.skipped} skipped, {self.listed} listed"
+                    f"{'' if self.listing_done else ' so far'} | {elapsed / 60:.1f} min elapsed, "
+                    f"{per_minute:.1f} meetings/min, {average:.1f} s/meeting{eta}")
+        gemini = ai_processor.gemini_limiter.stats()
+        fireflies = fireflies_limiter.stats()
+        return (f"{line} | Gemini {gemini['request_utilisation']:.0%} RPM, {gemini['token_utilisation']:.0%} TPM, "
+                f"{gemini['waiting']} waiting | Fireflies {fireflies['request_utilisation']:.0%} RPM")
+
+
+def _tracked(handler, stats: BackfillStats, use_async_runtime: bool):
+    """
+    Wraps the pipeline handler so every finished meeting is counted in `stats`.
+    """
+    if use_async_runtime:
+        async def tracked_job_async(job: dict, save_stage) -> dict:
+            started_at = time.monotonic()
+            try:
+                result = await handler(job, save_stage)
+            except Exception:
+                stats.record_finished(False, time.monotonic() - started_at)
+                raise
+            stats.record_finished(True, time.monotonic() - started_at)
+            return result
+        return tracked_job_async
+
+    def tracked_job(job: dict, save_stage) -> dict:
+        started_at = time.monotonic()
+        try:
+            result = handler(job, save_stage)
+        except Exception:
+            stats.record_finished(False, time.monotonic() - started_at)
+            raise
+        stats.record_finished(True, time.monotonic() - started_at)
+        return result
+    return tracked_job
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a date in YYYY-MM-DD format")
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Process past Fireflies meetings through the webhook's pipeline. "
+                    "Meetings already processed are skipped, and an interrupted run resumes from its checkpoints when re-run."
+    )
+    parser.add_argument("--from", dest="from_date", type=_parse_date, required=True,
+                        help="First meeting date to process (YYYY-MM-DD, UTC).")
+    parser.add_argument("--to", dest="to_date", type=_parse_date, default=datetime.now(timezone.utc).date(),
+                        help="Last meeting date to process, inclusive (YYYY-MM-DD, UTC). Defaults to today.")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("BACKFILL_WORKERS", 4)),
+                        help="Meetings processed at the same time. Defaults to BACKFILL_WORKERS or 4.")
+    parser.add_argument("--runtime", choices=("threads", "async"),
+                        default=os.environ.get("PIPELINE_RUNTIME", "threads").lower(),
+                        help="Run meetings on worker threads or as coroutines on one event loop. Defaults to PIPELINE_RUNTIME.")
+    parser.add_argument("--stats-interval", type=float, default=30,
+                        help="Seconds between throughput reports. Defaults to 30.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="List the meetings in the range without processing them.")
+    args = parser.parse_args(argv)
+    if args.from_date > args.to_date:
+        parser.error("--from must not be after --to")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv=None) -> int:
+    """
+    Lists every Fireflies meeting in the date range and queues each one on a job queue
+    backed by the same JobStore and pipeline as the webhook, then reports throughput until
+    they have all finished. Returns the process exit code: 1 if any meeting failed.
+    """
+    args = _parse_args(argv)
+    # app.py turns on DEBUG logging for development; a long backfill logs at INFO.
+    logging.getLogger().setLevel(logging.INFO)
+
+    from_date = datetime.combine(args.from_date, dt_time.min, tzinfo=timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    to_date = datetime.combine(args.to_date, dt_time.max, tzinfo=timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    lister = FirefliesClient(worker_count=1)  # Pages are listed one at a time.
+
+    if args.dry_run:
+        count = 0
+        for meeting in lister.list_transcripts(from_date, to_date):
+            meeting_date = datetime.fromtimestamp(meeting['date'] / 1000, timezone.utc).date() if meeting.get('date') else "?"
+            print(f"{meeting['id']}  {meeting_date}  {meeting.get('title') or 'Untitled Meeting'}")
+            count += 1
+        print(f"BACKFILL: {count} meeting(s) from {args.from_date} to {args.to_date}.")
+        return 0
+
+    if not os.environ.get("ASANA_PROJECT_GID"):
+        logging.error("BACKFILL ERROR: Missing ASANA_PROJECT_GID in .env file.")
+        return 2
+
+    use_async_runtime = args.runtime == "async"
+    stats = BackfillStats()
+    # Many meetings are fetched at once, so their transcript requests share bulk queries.
+    handler = create_pipeline_handler(use_async_runtime, batch_window_seconds=fireflies_batcher.BACKFILL_BATCH_WINDOW_SECONDS,
+                                      worker_count=args.workers)
+    handler = _tracked(handler, stats, use_async_runtime)
+    job_store = JobStore()
+    if use_async_runtime:
+        job_queue = AsyncJobQueue(handler, job_store, max_concurrent=args.workers)
+    else:
+        job_queue = JobQueue(handler, job_store, num_workers=args.workers)
+    # Only this backfill's meetings are resumed, so a server sharing the job store keeps its own jobs.
+    job_queue.start(resume_unfinished=False)
+
+    logging.info(f"BACKFILL: Processing meetings from {args.from_date} to {args.to_date} with {args.workers} worker(s) ({args.runtime}).")
+    try:
+        listed_all = _submit_meetings(lister, from_date, to_date, job_queue, stats, args.stats_interval)
+        stats.finish_listing()
+        # Meetings already queued are finished even if the listing stopped early.
+        while not stats.wait(timeout=args.stats_interval, drained=job_queue.idle):
+            print(stats.report(), flush=True)
+    except KeyboardInterrupt:
+        print(stats.report(), flush=True)
+        print("BACKFILL: Interrupted. Run the same command again to resume from the checkpoints.")
+        return 130
+
+    print(stats.report(), flush=True)
+    if stats.not_run:
+        print(f"BACKFILL: {stats.not_run} queued meeting(s) were dropped without running; see the job queue errors above.")
+        return 1
+    if not listed_all:
+        print("BACKFILL: The meeting listing stopped early. Run the same command again to pick up the rest.")
+        return 1
+    return 1 if stats.failed else 0
+
+
+def _submit_meetings(lister: FirefliesClient, from_date: str, to_date: str, job_queue: JobQueue,
+                     stats: BackfillStats, stats_interval: float) -> bool:
+    """
+    Queues every listed meeting, reporting throughput while the listing is paged through.
+    Returns False if the listing failed part way.
+    """
+    next_report = time.monotonic() + stats_interval
+    seen = set()  # Pages can overlap if meetings are added while they are read.
+    try:
+        for meeting in lister.list_transcripts(from_date, to_date):
+            if meeting['id'] in seen:
+                continue
+            seen.add(meeting['id'])
+            # Earlier jobs are looked up over the whole history, not just the webhook's dedup window.
+            _, is_duplicate = job_queue.submit_once(meeting['id'], EVENT_TYPE, resume_unfinished=True, ttl_seconds=None)
+            stats.record_submitted(is_duplicate)
+            if time.monotonic() >= next_report:
+                print(stats.report(), flush=True)
+                next_report = time.monotonic() + stats_interval
+    except Exception as e:
+        logging.error(f"BACKFILL ERROR: Could not list meetings: {e}")
+        return False
+    return True
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from dotenv import load_dotenv
+
+import fireflies_client
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# How long a transcript request waits for others to share its GraphQL query. 0 disables coalescing.
+# Off by default for the webhook, where the window would delay every single-meeting fetch;
+# the backfill, which fetches many meetings at once, coalesces with its own window.
+BATCH_WINDOW_SECONDS = float(os.environ.get("FIREFLIES_BATCH_WINDOW_MS", 0)) / 1000
+BACKFILL_BATCH_WINDOW_SECONDS = float(os.environ.get("FIREFLIES_BACKFILL_BATCH_WINDOW_MS", 50)) / 1000
+
+
+class CoalescingFirefliesClient:
+    """
+    Wraps a FirefliesClient (or AsyncFirefliesClient) so that transcript requests made by
+    concurrent jobs within a short collection window are fetched together with one aliased
+    get_transcripts_bulk query, instead of one round trip each. A window closes early once
+    it holds a full batch. Every other attribute is delegated to the wrapped client, so the
+    pipeline uses it exactly like the client itself.
+    """
+
+    def __init__(self, client, window_seconds: float = BATCH_WINDOW_SECONDS, max_batch: int | None = None):
+        """
+        Args:
+            client: The FirefliesClient to fetch with.
+            window_seconds: The collection window. Defaults to FIREFLIES_BATCH_WINDOW_MS.
+            max_batch: Requests that close a window early. Defaults to FIREFLIES_BULK_MAX_BATCH.
+        """
+        self.client = client
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch or fireflies_client.BULK_MAX_BATCH
+        self._pending = {}  # meeting_id -> [Future], for the threaded runtime
+        self._timer = None
+        self._lock = threading.Lock()
+        self._pending_async = {}  # meeting_id -> [asyncio.Future], for the async runtime
+        self._flush_handle = None
+        self._fetch_tasks = set()  # Keeps running fetches referenced until they finish.
+
+    def __getattr__(self, name):
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def get_transcript_and_title(self, meeting_id: str) -> dict | None:
+        """
+        Same as FirefliesClient.get_transcript_and_title, served from a shared bulk fetch.
+        """
+        future = Future()
+        batch = None
+        with self._lock:
+            self._pending.setdefault(meeting_id, []).append(future)
+            if len(self._pending) >= self.max_batch:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._fetch(batch)
+        return future.result()
+
+    def _take_pending(self) -> dict:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        return batch
+
+    def _flush(self):
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._fetch(batch)
+
+    def _fetch(self, batch: dict):
+        logging.info(f"FIREFLIES BATCHER: Fetching {len(batch)} coalesced transcript request(s).")
+        try:
+            results = self.client.get_transcripts_bulk(list(batch))
+        except Exception as e:
+            logging.warning(f"FIREFLIES BATCHER: Bulk fetch failed ({e}). Fetching each meeting separately.")
+            results = {}
+        # A failed bulk request, or one bad meeting in it, must not fail the others: any meeting
+        # of a shared batch without a result is fetched again on its own.
+        outcomes = {meeting_id: (results.get(meeting_id), None) for meeting_id in batch}
+        for meeting_id in _refetch_ids(batch, results):
+            try:
+                outcomes[meeting_id] = (self.client.get_transcript_and_title(meeting_id), None)
+            except Exception as e:
+                outcomes[meeting_id] = (None, e)
+        for meeting_id, futures in batch.items():
+            result, error = outcomes[meeting_id]
+            for future in futures:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    async def get_transcript_and_title_async(self, meeting_id: str) -> dict | None:
+        """
+        Same as AsyncFirefliesClient.get_transcript_and_title_async, served from a shared bulk fetch.
+        All callers must share one event loop, as the async job queue's do.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_async.setdefault(meeting_id, []).append(future)
+        if len(self._pending_async) >= self.max_batch:
+            self._flush_async()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._flush_async)
+        return await future
+
+    def _flush_async(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending_async = self._pending_async, {}
+        if batch:
+            task = asyncio.ensure_future(self._fetch_async(batch))
+            self._fetch_tasks.add(task)
+            task.add_done_callback(self._fetch_tasks.discard)
+
+    async def _fetch_async(self, batch: dict):
+        logging.info(f"FIREFLIES BATCHER: Fetching {len(batch)} coalesced transcript request(s).")
+        try:
+            results = await self.client.get_transcripts_bulk_async(list(batch))
+        except Exception as e:
+            logging.warning(f"FIREFLIES BATCHER: Bulk fetch failed ({e}). Fetching each meeting separately.")
+            results = {}
+        outcomes = {meeting_id: results.get(meeting_id) for meeting_id in batch}
+        refetch_ids = _refetch_ids(batch, results)
+        refetched = await asyncio.gather(*(self.client.get_transcript_and_title_async(meeting_id) for meeting_id in refetch_ids),
+                                         return_exceptions=True)
+        outcomes.update(zip(refetch_ids, refetched))
+        for meeting_id, futures in batch.items():
+            outcome = outcomes[meeting_id]
+            for future in futures:
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+
+def _refetch_ids(batch: dict, results: dict) -> list[str]:
+    """
+    Returns the meetings of a shared batch that came back without a result and are worth
+    fetching alone. A batch of one meeting has already been fetched alone.
+    """
+    if len(batch) < 2:
+        return [meeting_id for meeting_id in batch if meeting_id not in results]
+    missing = [meeting_id for meeting_id in batch if results.get(meeting_id) is None]
+    if missing:
+        logging.info(f"FIREFLIES BATCHER: Fetching {len(missing)} meeting(s) without a bulk result separately.")
+    return missing
@@ -1,32 +1,115 @@
 import os
+import asyncio
 import requests
 import logging
 from dotenv import load_dotenv
 
+import retry_policy
+from rate_limiter import RateLimiter
+from transcript_model import Transcript, TranscriptBuilder
+from http_session import build_session
+
+# Optional: httpx (with the h2 extra) enables HTTP/2 when FIREFLIES_HTTP2 is set.
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Optional: ijson parses transcript responses incrementally, straight into the compact
+# Transcript, so a multi-hour meeting's JSON is never held as a tree of dicts.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# HTTP status errors raised by raise_for_status() for either session type.
+_HTTP_STATUS_ERRORS = (requests.exceptions.HTTPError,) + ((httpx.HTTPStatusError,) if httpx else ())
+
+# Stream transcript responses through ijson when it is installed, unless FIREFLIES_STREAM_JSON is off.
+STREAM_JSON = ijson is not None and os.environ.get("FIREFLIES_STREAM_JSON", "true").lower() not in ("0", "false", "no")
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+# The most transcripts requested in one aliased GraphQL query by get_transcripts_bulk.
+BULK_MAX_BATCH = int(os.environ.get("FIREFLIES_BULK_MAX_BATCH", 10))
+
+# The most meetings Fireflies returns per page of the `transcripts` listing query.
+LIST_PAGE_SIZE = 50
+
+# Every Fireflies GraphQL request, from any job or the backfill, takes a permit from this limiter.
+# Fireflies meters requests only, so permits are taken with zero tokens.
+_fireflies_requests_per_minute = float(os.environ.get("FIREFLIES_REQUESTS_PER_MINUTE", 60))
+fireflies_limiter = RateLimiter(
+    "fireflies",
+    requests_per_minute=_fireflies_requests_per_minute,
+    tokens_per_minute=_fireflies_requests_per_minute,
+    max_concurrent=int(os.environ.get("FIREFLIES_MAX_CONCURRENT", 8)),
+)
+
 class FirefliesClient:
     """
     V4.4: An adapter class to handle all communications with the Fireflies.ai GraphQL API
-    using the requests library directly.
+    over a pooled keep-alive session (requests, or httpx when HTTP/2 is enabled).
     """
     API_URL = "https://api.fireflies.ai/graphql"
 
-    def __init__(self):
+    def __init__(self, worker_count: int | None = None):
         """
-        Initializes the client by setting up the API key for the authorization header.
+        Initializes the client and its pooled keep-alive session, with the authorization
+        header set once. Pool size, timeouts and HTTP/2 are configured from the environment.
+
+        Args:
+            worker_count: Jobs that fetch at the same time, which sizes the connection pool
+                unless FIREFLIES_HTTP_POOL_SIZE is set. Defaults to JOB_WORKER_COUNT or 4.
         """
+        self.session = None
+        self.worker_count = worker_count
         self.api_key = os.environ.get('FIREFLIES_API_KEY')
         if not self.api_key or self.api_key == '<Your Fireflies API Key Here>':
             logging.error("FIREFLIES CLIENT ERROR: FIREFLIES_API_KEY not found or not set in .env file.")
             self.api_key = None
         else:
+            self.session = self._build_session()
             logging.info("FIREFLIES CLIENT: Initialized successfully.")
 
+    def _pool_size(self) -> int:
+        if os.environ.get("FIREFLIES_HTTP_POOL_SIZE"):
+            return int(os.environ["FIREFLIES_HTTP_POOL_SIZE"])
+        return self.worker_count or int(os.environ.get("JOB_WORKER_COUNT", 4))
+
+    def _build_session(self):
+        """
+        Returns an httpx HTTP/2 client if FIREFLIES_HTTP2 is enabled and httpx[http2] is
+        installed, otherwise a pooled requests session.
+        """
+        pool_size = self._pool_size()
+        connect_timeout = float(os.environ.get("FIREFLIES_CONNECT_TIMEOUT", 5))
+        read_timeout = float(os.environ.get("FIREFLIES_READ_TIMEOUT", 60))
+        headers = { "Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json" }
+
+        if os.environ.get("FIREFLIES_HTTP2", "").lower() in ("1", "true", "yes"):
+            if httpx:
+                try:
+                    client = httpx.Client(
+                        http2=True,
+                        headers=headers,
+                        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                        limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                    )
+                    logging.info("FIREFLIES CLIENT: Using HTTP/2 via httpx.")
+                    return client
+                except ImportError as e:
+                    logging.warning(f"FIREFLIES CLIENT: HTTP/2 unavailable ({e}). Falling back to HTTP/1.1.")
+            else:
+                logging.warning("FIREFLIES CLIENT: FIREFLIES_HTTP2 is set but httpx is not installed. Using HTTP/1.1.")
+
+        return build_session(pool_size=pool_size, timeout=(connect_timeout, read_timeout), headers=headers)
+
     def get_transcript_and_title(self, meeting_id: str) -> dict | None:
         """
         V4.4 UPDATE: Fetches both the transcript and the title from Fireflies.
@@ -35,58 +118,478 @@ class FirefliesClient:
             meeting_id: The unique ID of the meeting from Fireflies.
 
         Returns:
-            A dictionary containing the 'transcript' and 'title', or None if an error occurs.
-            e.g., {'transcript': '...', 'title': '...'}
+            A dictionary containing the 'transcript' (a transcript_model.Transcript), 'title'
+            and 'participants' (email addresses), or None if an error occurs.
+            e.g., {'transcript': Transcript(...), 'title': '...', 'participants': ['...']}
         """
-        if not self.api_key:
+        if not self.session:
             logging.error("FIREFLIES CLIENT ERROR: Client not initialized. Cannot get data.")
             return None
 
         logging.info(f"FIREFLIES CLIENT: Fetching transcript and title for meeting ID: {meeting_id} via GraphQL...")
+        payload = { "query": _TRANSCRIPT_QUERY, "variables": { "id": meeting_id } }
+        return self._fetch(payload, {"transcript": meeting_id})[meeting_id]
 
-        # V4.4 UPDATE: The GraphQL query now also asks for the meeting title.
-        graphql_query = """
-            query GetTranscript($id: String!) {
-                transcript(id: $id) {
-                    title
-                    sentences {
-                        speaker_name
-                        text
-                    }
-                }
-            }
+    def get_transcripts_bulk(self, meeting_ids: list[str]) -> dict[str, dict | None]:
         """
+        Fetches several meetings with one aliased GraphQL query per batch of up to
+        BULK_MAX_BATCH (FIREFLIES_BULK_MAX_BATCH) meetings, instead of one request each.
 
-        payload = { "query": graphql_query, "variables": { "id": meeting_id } }
-        headers = { "Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json" }
+        Returns:
+            {meeting_id: result}, where each result is as returned by get_transcript_and_title
+            (None for a meeting that could not be fetched).
+        """
+        if not self.session:
+            logging.error("FIREFLIES CLIENT ERROR: Client not initialized. Cannot get data.")
+            return {meeting_id: None for meeting_id in meeting_ids}
+
+        results = {}
+        for batch in _batches(meeting_ids):
+            logging.info(f"FIREFLIES CLIENT: Fetching {len(batch)} transcript(s) in one GraphQL query...")
+            results.update(self._fetch(*_bulk_request(batch)))
+        return results
+
+    def _fetch(self, payload: dict, aliases: dict[str, str]) -> dict[str, dict | None]:
+        """
+        Sends a transcript query and returns {meeting_id: result or None} for the meeting
+        requested under each alias.
+        """
+        response = None
+        try:
+            # The GraphQL query is read-only, so any transient failure is safe to retry.
+            result = retry_policy.for_endpoint("fireflies graphql").call(lambda: self._fetch_once(payload, aliases))
+            if isinstance(result, dict):
+                return result
+            response = result
+            return _parse_transcript_response(response, aliases)  # Raises its HTTP status error
+        except _HTTP_STATUS_ERRORS as http_err:
+            logging.error(f"FIREFLIES CLIENT HTTP ERROR: {http_err} - Response: {response.text}")
+        except Exception as e:
+            logging.error(f"FIREFLIES CLIENT ERROR: An unexpected error occurred: {e}")
+        finally:
+            if response is not None:
+                response.close()
+        return {meeting_id: None for meeting_id in aliases.values()}
+
+    def _fetch_once(self, payload: dict, aliases: dict[str, str]):
+        """
+        One attempt at a transcript query. Returns the parsed results, or the response itself
+        if it has an error status, for the retry policy to retry or _fetch to report. The body
+        is parsed within the attempt, so a connection dropped while a streamed body is still
+        arriving is retried like any other transient failure.
+        """
+        response = self._post(payload)
+        if response.status_code >= 400:
+            return response
+        try:
+            return _parse_transcript_response(response, aliases)
+        finally:
+            response.close()
+
+    def list_transcripts(self, from_date: str, to_date: str):
+        """
+        Yields {'id': ..., 'title': ..., 'date': ...} for every meeting between two ISO 8601
+        timestamps, paging through the GraphQL `transcripts` query LIST_PAGE_SIZE at a time.
+
+        Raises:
+            RuntimeError: If the client is not initialized or a page cannot be fetched, so an
+                incomplete listing is never mistaken for the end of the range.
+        """
+        if not self.session:
+            raise RuntimeError("Fireflies client not initialized. Check FIREFLIES_API_KEY.")
+
+        skip = 0
+        while True:
+            logging.info(f"FIREFLIES CLIENT: Listing meetings from {from_date} to {to_date} (offset {skip})...")
+            variables = { "fromDate": from_date, "toDate": to_date, "limit": LIST_PAGE_SIZE, "skip": skip }
+            page = self._list_page({ "query": _LIST_TRANSCRIPTS_QUERY, "variables": variables })
+            yield from page
+            if len(page) < LIST_PAGE_SIZE:
+                return
+            skip += len(page)
 
+    def _list_page(self, payload: dict) -> list[dict]:
+        response = retry_policy.for_endpoint("fireflies graphql").call(lambda: self._post(payload, stream=False))
         try:
-            response = requests.post(self.API_URL, headers=headers, json=payload)
             response.raise_for_status()
+            body = response.json()
+        except Exception as e:
+            raise RuntimeError(f"Fireflies meeting listing failed: {e}") from e
+        finally:
+            response.close()
+        if body.get('errors'):
+            raise RuntimeError(f"Fireflies meeting listing failed: {body['errors']}")
+        return (body.get('data') or {}).get('transcripts') or []
+
+    def _post(self, payload: dict, stream: bool = STREAM_JSON):
+        # A streamed body is left unread for _parse_transcript_response to parse as it arrives.
+        grant = fireflies_limiter.acquire(0)
+        try:
+            if not stream:
+                return self.session.post(self.API_URL, json=payload)
+            if httpx and isinstance(self.session, httpx.Client):
+                return self.session.send(self.session.build_request("POST", self.API_URL, json=payload), stream=True)
+            return self.session.post(self.API_URL, json=payload, stream=True)
+        finally:
+            fireflies_limiter.release(grant)
 
-            data = response.json()
-            transcript_data = data.get('data', {}).get('transcript')
 
-            if not transcript_data:
-                logging.warning(f"FIREFLIES CLIENT: No transcript data found for meeting ID: {meeting_id}")
-                return None
+class AsyncFirefliesClient(FirefliesClient):
+    """
+    The asyncio variant of FirefliesClient, fetching over an httpx.AsyncClient so one
+    event loop can have many transcript requests in flight. Requires httpx.
+    """
 
-            sentences = transcript_data.get('sentences')
-            title = transcript_data.get('title', 'Untitled Meeting')
+    def __init__(self, worker_count: int | None = None):
+        super().__init__(worker_count)
+        self.async_session = None
 
-            if not sentences:
-                logging.warning(f"FIREFLIES CLIENT: No sentences found in transcript for meeting ID: {meeting_id}")
-                return None
+    def _get_async_session(self):
+        # Created on first use so it is bound to the event loop that runs the pipeline.
+        if self.async_session is None:
+            pool_size = self._pool_size()
+            self.async_session = httpx.AsyncClient(
+                http2=os.environ.get("FIREFLIES_HTTP2", "").lower() in ("1", "true", "yes"),
+                headers={ "Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json" },
+                timeout=httpx.Timeout(float(os.environ.get("FIREFLIES_READ_TIMEOUT", 60)),
+                                      connect=float(os.environ.get("FIREFLIES_CONNECT_TIMEOUT", 5))),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        return self.async_session
 
-            full_transcript_parts = [f"{sentence.get('speaker_name', 'Unknown')}: {sentence.get('text', '')}" for sentence in sentences]
-            full_transcript = "\n".join(full_transcript_parts)
+    async def get_transcript_and_title_async(self, meeting_id: str) -> dict | None:
+        """
+        The asyncio counterpart of get_transcript_and_title, with the same return value.
+        """
+        if not self.api_key or not httpx:
+            logging.error("FIREFLIES CLIENT ERROR: Async client needs FIREFLIES_API_KEY and httpx. Cannot get data.")
+            return None
 
-            logging.info(f"FIREFLIES CLIENT: Successfully fetched data for meeting: '{title}'")
-            return {'transcript': full_transcript, 'title': title}
+        logging.info(f"FIREFLIES CLIENT: Fetching transcript and title for meeting ID: {meeting_id} via GraphQL (async)...")
+        payload = { "query": _TRANSCRIPT_QUERY, "variables": { "id": meeting_id } }
+        return (await self._fetch_async(payload, {"transcript": meeting_id}))[meeting_id]
 
-        except requests.exceptions.HTTPError as http_err:
+    async def get_transcripts_bulk_async(self, meeting_ids: list[str]) -> dict[str, dict | None]:
+        """
+        The asyncio counterpart of get_transcripts_bulk; the batches are fetched concurrently.
+        """
+        if not self.api_key or not httpx:
+            logging.error("FIREFLIES CLIENT ERROR: Async client needs FIREFLIES_API_KEY and httpx. Cannot get data.")
+            return {meeting_id: None for meeting_id in meeting_ids}
+
+        batches = _batches(meeting_ids)
+        logging.info(f"FIREFLIES CLIENT: Fetching {len(set(meeting_ids))} transcript(s) in {len(batches)} GraphQL query(ies) (async)...")
+        results = {}
+        for batch_results in await asyncio.gather(*(self._fetch_async(*_bulk_request(batch)) for batch in batches)):
+            results.update(batch_results)
+        return results
+
+    async def _fetch_async(self, payload: dict, aliases: dict[str, str]) -> dict[str, dict | None]:
+        response = None
+        try:
+            session = self._get_async_session()
+            result = await retry_policy.for_endpoint("fireflies graphql").call_async(
+                lambda: self._fetch_once_async(session, payload, aliases)
+            )
+            if isinstance(result, dict):
+                return result
+            response = result
+            return await _parse_transcript_response_async(response, aliases)  # Raises its HTTP status error
+        except _HTTP_STATUS_ERRORS as http_err:
             logging.error(f"FIREFLIES CLIENT HTTP ERROR: {http_err} - Response: {response.text}")
-            return None
         except Exception as e:
             logging.error(f"FIREFLIES CLIENT ERROR: An unexpected error occurred: {e}")
-            return None
+        finally:
+            if response is not None:
+                await response.aclose()
+        return {meeting_id: None for meeting_id in aliases.values()}
+
+    async def _fetch_once_async(self, session, payload: dict, aliases: dict[str, str]):
+        """
+        The asyncio counterpart of _fetch_once.
+        """
+        response = await self._post_async(session, payload)
+        if response.status_code >= 400:
+            return response
+        try:
+            return await _parse_transcript_response_async(response, aliases)
+        finally:
+            await response.aclose()
+
+    async def _post_async(self, session, payload: dict):
+        grant = await fireflies_limiter.acquire_async(0)
+        try:
+            return await session.send(session.build_request("POST", self.API_URL, json=payload), stream=STREAM_JSON)
+        finally:
+            fireflies_limiter.release(grant)
+
+    async def aclose(self):
+        if self.async_session is not None:
+            await self.async_session.aclose()
+            self.async_session = None
+
+
+# V4.4 UPDATE: The GraphQL query now also asks for the meeting title.
+# Participant emails feed the heuristic meeting classifier.
+_TRANSCRIPT_FIELDS = """
+            title
+            organizer_email
+            participants
+            sentences {
+                speaker_name
+                text
+            }
+"""
+
+_TRANSCRIPT_QUERY = f"""
+    query GetTranscript($id: String!) {{
+        transcript(id: $id) {{{_TRANSCRIPT_FIELDS}        }}
+    }}
+"""
+
+# Meetings in a date range, newest first. `date` is milliseconds since the epoch.
+_LIST_TRANSCRIPTS_QUERY = """
+    query ListTranscripts($fromDate: DateTime, $toDate: DateTime, $limit: Int, $skip: Int) {
+        transcripts(fromDate: $fromDate, toDate: $toDate, limit: $limit, skip: $skip) {
+            id
+            title
+            date
+        }
+    }
+"""
+
+
+def _batches(meeting_ids: list[str]) -> list[list[str]]:
+    unique_ids = list(dict.fromkeys(meeting_ids))
+    return [unique_ids[start:start + BULK_MAX_BATCH] for start in range(0, len(unique_ids), BULK_MAX_BATCH)]
+
+
+def _bulk_request(meeting_ids: list[str]) -> tuple[dict, dict[str, str]]:
+    """
+    Returns (payload, aliases) for one query fetching every meeting under its own alias:
+    query { t0: transcript(id: $id0) { ... } t1: transcript(id: $id1) { ... } }
+    """
+    aliases = {f"t{i}": meeting_id for i, meeting_id in enumerate(meeting_ids)}
+    variables = ", ".join(f"$id{i}: String!" for i in range(len(meeting_ids)))
+    fields = "".join(f"        t{i}: transcript(id: $id{i}) {{{_TRANSCRIPT_FIELDS}        }}\n" for i in range(len(meeting_ids)))
+    query = f"\n    query GetTranscripts({variables}) {{\n{fields}    }}\n"
+    return {"query": query, "variables": {f"id{i}": meeting_id for i, meeting_id in enumerate(meeting_ids)}}, aliases
+
+
+def _parse_transcript_response(response, aliases: dict[str, str]) -> dict[str, dict | None]:
+    """
+    Turns a GraphQL transcript response into {meeting_id: result} for the meeting requested
+    under each alias, where a result is {'transcript': ..., 'title': ..., 'participants': [...]},
+    or None if it is empty. With STREAM_JSON the body is parsed as it is read.
+    Raises the HTTP status error for a failed response.
+    """
+    if response.status_code >= 400 and hasattr(response, "read"):
+        response.read()  # A streamed httpx response must be read before its text can be logged.
+    response.raise_for_status()
+
+    if STREAM_JSON:
+        parser = _ResponseStreamParser(aliases)
+        chunks = response.iter_bytes(_STREAM_CHUNK_BYTES) if hasattr(response, "iter_bytes") else response.iter_content(_STREAM_CHUNK_BYTES)
+        for prefix, event, value in ijson.parse(_ChunkReader(chunks)):
+            parser.feed(prefix, event, value)
+        return parser.results()
+
+    body = response.json()
+    errors = body.get('errors')
+    _log_graphql_errors(errors)
+    data = body.get('data') or {}
+    results = {}
+    for alias, meeting_id in aliases.items():
+        transcript_data = data.get(alias)
+        if not transcript_data:
+            results[meeting_id] = _transcript_result(meeting_id, None, None, None, None, found=False,
+                                                     errors=_alias_errors(errors, alias))
+            continue
+        transcript = Transcript.from_sentences(transcript_data.get('sentences') or [])
+        results[meeting_id] = _transcript_result(meeting_id, transcript, transcript_data.get('title', 'Untitled Meeting'),
+                                                 transcript_data.get('participants'), transcript_data.get('organizer_email'), found=True)
+    return results
+
+
+async def _parse_transcript_response_async(response, aliases: dict[str, str]) -> dict[str, dict | None]:
+    """
+    The asyncio counterpart of _parse_transcript_response, for an httpx.AsyncClient response.
+    """
+    if response.status_code >= 400 or not STREAM_JSON:
+        await response.aread()
+    if not STREAM_JSON:
+        return _parse_transcript_response(response, aliases)
+    response.raise_for_status()
+
+    parser = _ResponseStreamParser(aliases)
+    async for prefix, event, value in ijson.parse_async(_AsyncChunkReader(response.aiter_bytes(_STREAM_CHUNK_BYTES))):
+        parser.feed(prefix, event, value)
+    return parser.results()
+
+
+def _log_graphql_errors(errors: list | None):
+    if errors:
+        logging.warning(f"FIREFLIES CLIENT: GraphQL errors: {errors}")
+
+
+def _alias_errors(errors: list | None, alias: str) -> list[str]:
+    """
+    Returns the messages of the GraphQL errors that apply to one alias: those whose path
+    starts with it, and those with no path (e.g. authentication or quota errors).
+    """
+    messages = []
+    for error in errors or []:
+        path = error.get('path') if isinstance(error, dict) else None
+        if not path or path[0] == alias:
+            messages.append(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+    return messages
+
+
+def _transcript_result(meeting_id: str, transcript: Transcript | None, title, participants, organizer_email, found: bool,
+                       errors: list[str] | None = None) -> dict | None:
+    if not found:
+        if errors:
+            logging.error(f"FIREFLIES CLIENT ERROR: Could not fetch meeting ID {meeting_id}: {'; '.join(errors)}")
+        else:
+            logging.warning(f"FIREFLIES CLIENT: No transcript data found for meeting ID: {meeting_id}")
+        return None
+    if not transcript.sentence_count:
+        logging.warning(f"FIREFLIES CLIENT: No sentences found in transcript for meeting ID: {meeting_id}")
+        return None
+
+    participants = [email for email in participants or [] if email]
+    if organizer_email and organizer_email not in participants:
+        participants.append(organizer_email)
+
+    logging.info(f"FIREFLIES CLIENT: Successfully fetched data for meeting: '{title}'")
+    return {'transcript': transcript, 'title': title, 'participants': participants}
+
+
+class _ResponseStreamParser:
+    """
+    Consumes ijson parse events of a whole GraphQL response: each "data.<alias>..." event
+    goes to that alias's _TranscriptStreamParser, and the top-level "errors" array is
+    collected so a meeting missing from the response is reported with its reason.
+    """
+
+    def __init__(self, aliases: dict[str, str]):
+        self.aliases = aliases
+        self.parsers = {alias: _TranscriptStreamParser(f"data.{alias}") for alias in aliases}
+        self._single = next(iter(self.parsers.values())) if len(self.parsers) == 1 else None
+        self._errors = None
+
+    def feed(self, prefix: str, event: str, value):
+        if prefix.startswith("errors"):
+            if self._errors is None:
+                self._errors = ijson.ObjectBuilder()
+            self._errors.event(event, value)
+        elif self._single is not None:
+            self._single.feed(prefix, event, value)
+        else:
+            end = prefix.find(".", 5)
+            parser = self.parsers.get(prefix[5:] if end == -1 else prefix[5:end])
+            if parser is not None:
+                parser.feed(prefix, event, value)
+
+    def results(self) -> dict[str, dict | None]:
+        errors = self._errors.value if self._errors is not None else None
+        _log_graphql_errors(errors)
+        return {meeting_id: self.parsers[alias].result(meeting_id, _alias_errors(errors, alias))
+                for alias, meeting_id in self.aliases.items()}
+
+
+class _TranscriptStreamParser:
+    """
+    Consumes ijson parse events of a GraphQL transcript response. Each sentence goes into a
+    TranscriptBuilder as soon as its object closes, so no sentence dicts accumulate.
+    """
+    __slots__ = ("builder", "found", "title", "organizer_email", "participants", "_speaker_name", "_text",
+                 "_root", "_sentence", "_sentence_text", "_sentence_speaker", "_title", "_organizer_email", "_participant")
+
+    def __init__(self, root: str = "data.transcript"):
+        """
+        Args:
+            root: The JSON path of the transcript object, e.g. "data.transcript" or "data.t3".
+        """
+        self.builder = TranscriptBuilder()
+        self.found = False
+        self.title = 'Untitled Meeting'
+        self.organizer_email = None
+        self.participants = []
+        self._speaker_name, self._text = 'Unknown', ''
+        self._root = root
+        self._sentence = f"{root}.sentences.item"
+        self._sentence_text = f"{root}.sentences.item.text"
+        self._sentence_speaker = f"{root}.sentences.item.speaker_name"
+        self._title = f"{root}.title"
+        self._organizer_email = f"{root}.organizer_email"
+        self._participant = f"{root}.participants.item"
+
+    def feed(self, prefix: str, event: str, value):
+        # Called for every token of the body, so the per-sentence cases come first.
+        if event == "map_key":
+            return
+        if prefix == self._sentence_text:
+            self._text = value
+        elif prefix == self._sentence_speaker:
+            self._speaker_name = value
+        elif prefix == self._sentence:
+            if event == "end_map":
+                self.builder.add(self._speaker_name, self._text)
+                self._speaker_name, self._text = 'Unknown', ''
+        elif prefix == self._root:
+            self.found = self.found or event == "start_map"
+        elif prefix == self._title:
+            self.title = value
+        elif prefix == self._organizer_email:
+            self.organizer_email = value
+        elif prefix == self._participant:
+            self.participants.append(value)
+
+    def result(self, meeting_id: str, errors: list[str] | None = None) -> dict | None:
+        return _transcript_result(meeting_id, self.builder.build(), self.title, self.participants,
+                                  self.organizer_email, self.found, errors)
+
+
+class _ChunkReader:
+    """
+    A minimal file-like view of an iterator of byte chunks, as ijson reads it.
+    """
+    __slots__ = ("_chunks", "_pending")
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def read(self, size: int = -1) -> bytes:
+        # Returns at most `size` bytes; an empty result means the body has ended.
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return b""
+        data, self._pending = _split(self._pending, size)
+        return data
+
+
+class _AsyncChunkReader:
+    __slots__ = ("_chunks", "_pending")
+
+    def __init__(self, chunks):
+        self._chunks = chunks.__aiter__()
+        self._pending = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        while not self._pending:
+            try:
+                self._pending = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        data, self._pending = _split(self._pending, size)
+        return data
+
+
+def _split(data: bytes, size: int) -> tuple[bytes, bytes]:
+    if size is None or size < 0 or len(data) <= size:
+        return data, b""
+    return data[:size], data[size:]
@@ -0,0 +1,43 @@
+import socket
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+# Enable TCP keep-alive probes so idle pooled connections are kept open and dead ones are noticed.
+_KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+for _option, _value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 15), ("TCP_KEEPCNT", 4)):
+    if hasattr(socket, _option):
+        _KEEPALIVE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, getattr(socket, _option), _value))
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter with TCP keep-alive enabled on pooled connections and a default
+    (connect, read) timeout applied to any request that does not pass its own.
+    """
+
+    def __init__(self, timeout: tuple[float, float] | None = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault("socket_options", _KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout if timeout is not None else self.timeout, **kwargs)
+
+
+def build_session(pool_size: int, timeout: tuple[float, float] | None = None, headers: dict | None = None) -> requests.Session:
+    """
+    Builds a requests.Session that can be shared across threads: a connection pool of
+    `pool_size` keep-alive connections per host, and fixed headers set once up front.
+    Per-request headers (such as Content-Type) must be passed to each call, never set on the session.
+    """
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(timeout=timeout, pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
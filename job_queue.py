@@ -0,0 +1,235 @@
+import os
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from job_store import JobStore
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# submit_once's default: the queue's own dedup TTL, as opposed to None (no expiry).
+_QUEUE_TTL = object()
+
+
+class JobQueue:
+    """
+    A job queue with a pool of worker threads, backed by a durable JobStore.
+    The webhook enqueues a meeting and returns immediately; the workers run the
+    pipeline handler in the background and checkpoint each completed stage.
+    Jobs left unfinished by a previous process are re-queued on start.
+    """
+
+    def __init__(self, handler, store: JobStore, num_workers: int | None = None):
+        """
+        Args:
+            handler: Callable taking (job, save_stage) and returning a result dict.
+                `job` is the stored job dict; `save_stage(stage, **artifacts)` checkpoints progress.
+            store: The JobStore that persists jobs and their artifacts.
+            num_workers: Size of the worker pool. Defaults to JOB_WORKER_COUNT or 4.
+        """
+        self.handler = handler
+        self.store = store
+        self.num_workers = num_workers or int(os.environ.get("JOB_WORKER_COUNT", 4))
+        self.dedup_ttl_seconds = int(os.environ.get("WEBHOOK_DEDUP_TTL_SECONDS", 24 * 60 * 60))
+        self._queue = queue.Queue()
+        self._workers = []
+
+    def start(self, resume_unfinished: bool = True):
+        """
+        Re-queues interrupted jobs and starts the worker threads.
+        Calling it more than once is a no-op.
+
+        Args:
+            resume_unfinished: Re-queue every unfinished job in the store. The backfill passes
+                False and resumes only the meetings it submits (see submit_once).
+        """
+        if self._workers: return
+        if resume_unfinished:
+            self._requeue_unfinished()
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logging.info(f"JOB QUEUE: Started {self.num_workers} worker(s).")
+
+    def _requeue_unfinished(self):
+        unfinished = self.store.list_unfinished_job_ids()
+        for job_id in unfinished:
+            self._queue.put(job_id)
+        if unfinished:
+            logging.info(f"JOB QUEUE: Resuming {len(unfinished)} unfinished job(s) from the job store.")
+
+    def submit_once(self, meeting_id: str, event_type: str, resume_unfinished: bool = False,
+                    ttl_seconds: int | None = _QUEUE_TTL) -> tuple[dict, bool]:
+        """
+        Enqueues a meeting unless the same meeting and event type was already received
+        within the dedup TTL (`ttl_seconds`, by default WEBHOOK_DEDUP_TTL_SECONDS or 24 hours;
+        None matches every earlier job).
+        A duplicate of a job that failed re-queues that job so it resumes from its checkpoints,
+        as does a duplicate left queued or running by a previous process if `resume_unfinished`.
+
+        Returns:
+            A tuple of (job, is_duplicate).
+        """
+        if ttl_seconds is _QUEUE_TTL:
+            ttl_seconds = self.dedup_ttl_seconds
+        job, created = self.store.find_or_create_job(meeting_id, event_type, ttl_seconds)
+        if created:
+            self._enqueue(job["job_id"])
+            return job, False
+
+        # Only the redelivery that moves the job out of 'failed' requeues it; one racing it is a duplicate.
+        if job["status"] == "failed" and self.store.requeue_failed(job["job_id"]):
+            logging.info(f"JOB QUEUE: Redelivery of failed job {job['job_id']} for meeting {meeting_id}. Retrying.")
+            self._enqueue(job["job_id"])
+            return self.store.get_job(job["job_id"]), False
+        if job["status"] == "failed":
+            job = self.store.get_job(job["job_id"])
+
+        if resume_unfinished and job["status"] in ("queued", "running"):
+            logging.info(f"JOB QUEUE: Resuming unfinished job {job['job_id']} for meeting {meeting_id}.")
+            self._enqueue(job["job_id"])
+            return job, False
+
+        logging.info(f"JOB QUEUE: Duplicate delivery for meeting {meeting_id} ({event_type}); "
+                     f"existing job {job['job_id']} is {job['status']}.")
+        return job, True
+
+    def _enqueue(self, job_id: str):
+        self._queue.put(job_id)
+        logging.info(f"JOB QUEUE: Enqueued job {job_id} (queue depth: {self._queue.qsize()}).")
+
+    def idle(self) -> bool:
+        """
+        Returns True when every enqueued job has been run, or dropped without running
+        (e.g. because it was missing from the job store).
+        """
+        return self._queue.unfinished_tasks == 0
+
+    def get_job(self, job_id: str) -> dict | None:
+        """
+        Returns the stored state of a job, or None if the ID is unknown.
+        """
+        return self.store.get_job(job_id)
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run_job(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job_id: str):
+        job = self._begin_job(job_id)
+        if not job:
+            return
+        try:
+            result = self.handler(job, self._stage_saver(job_id))
+            self._finish_job(job_id, result=result)
+        except Exception as e:
+            self._finish_job(job_id, error=e)
+
+    def _begin_job(self, job_id: str) -> dict | None:
+        job = self.store.get_job(job_id)
+        if not job:
+            logging.error(f"JOB QUEUE ERROR: Job {job_id} is missing from the job store.")
+            return None
+        self.store.set_status(job_id, "running")
+        logging.info(f"JOB QUEUE: Running job {job_id} (last completed stage: {job.get('stage') or 'none'})...")
+        return job
+
+    def _stage_saver(self, job_id: str):
+        def save_stage(stage: str | None, **artifacts):
+            self.store.save_stage(job_id, stage, artifacts)
+        return save_stage
+
+    def _finish_job(self, job_id: str, result: dict | None = None, error: Exception | None = None):
+        if error is None:
+            self.store.set_status(job_id, "succeeded", result=result)
+            logging.info(f"JOB QUEUE: Job {job_id} succeeded.")
+        else:
+            logging.error(f"JOB QUEUE ERROR: Job {job_id} failed: {error}")
+            self.store.set_status(job_id, "failed", error=str(error))
+
+
+class AsyncJobQueue(JobQueue):
+    """
+    A JobQueue whose jobs run as coroutines on a single asyncio event loop in a background
+    thread, instead of one worker thread per in-flight meeting. A single dispatcher thread
+    hands queued jobs to the loop, keeping up to `max_concurrent` (JOB_ASYNC_CONCURRENCY,
+    default 200) in flight at once. JobStore calls run on one store thread, in order, so a
+    SQLite transaction never stalls the other jobs on the loop.
+    """
+
+    def __init__(self, handler, store: JobStore, max_concurrent: int | None = None):
+        """
+        Args:
+            handler: Coroutine function taking (job, save_stage) and returning a result dict.
+            store: The JobStore that persists jobs and their artifacts.
+            max_concurrent: Maximum number of jobs running at the same time.
+        """
+        super().__init__(handler, store, num_workers=1)
+        self.max_concurrent = max_concurrent or int(os.environ.get("JOB_ASYNC_CONCURRENCY", 200))
+        self._loop = None
+        self._slots = None
+        self._store_thread = None
+
+    def start(self, resume_unfinished: bool = True):
+        """
+        Starts the event loop thread, then re-queues interrupted jobs (unless
+        `resume_unfinished` is False) and starts the dispatcher thread that hands queued
+        jobs to the loop. Calling it more than once is a no-op.
+        """
+        if self._workers: return
+        self._loop = asyncio.new_event_loop()
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._store_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        threading.Thread(target=self._loop.run_forever, name="job-event-loop", daemon=True).start()
+        super().start(resume_unfinished)
+        logging.info(f"JOB QUEUE: Running jobs on an asyncio event loop (up to {self.max_concurrent} at a time).")
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            self._slots.acquire()
+            future = asyncio.run_coroutine_threadsafe(self._run_job_async(job_id), self._loop)
+            future.add_done_callback(self._job_done)
+
+    def _job_done(self, future):
+        self._slots.release()
+        self._queue.task_done()
+
+    async def _run_job_async(self, job_id: str):
+        job = await self._in_store_thread(self._begin_job, job_id)
+        if not job:
+            return
+        try:
+            result = await self.handler(job, self._stage_saver(job_id))
+            await self._in_store_thread(self._finish_job, job_id, result=result)
+        except Exception as e:
+            await self._in_store_thread(self._finish_job, job_id, error=e)
+
+    async def _in_store_thread(self, fn, *args, **kwargs):
+        # Queued behind any checkpoints still being written, so a job never finishes before them.
+        return await asyncio.wrap_future(self._store_thread.submit(fn, *args, **kwargs))
+
+    def _stage_saver(self, job_id: str):
+        # Stages checkpoint from the event loop without awaiting, so the write is only queued.
+        def save_stage(stage: str | None, **artifacts):
+            self._store_thread.submit(self._save_stage, job_id, stage, artifacts)
+        return save_stage
+
+    def _save_stage(self, job_id: str, stage: str | None, artifacts: dict):
+        try:
+            self.store.save_stage(job_id, stage, artifacts)
+        except Exception as e:
+            # The job carries on; a resumed attempt repeats the stage instead of skipping it.
+            logging.error(f"JOB QUEUE ERROR: Could not checkpoint job {job_id} (stage {stage}): {e}")
@@ -0,0 +1,202 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Pipeline stages in the order they normally complete.
+STAGES = ("fetched", "task_created", "cleaned", "extracted", "commented", "subtasks_done")
+
+# Job statuses that mean the work was interrupted and should be picked up again.
+UNFINISHED_STATUSES = ("queued", "running")
+
+
+class JobStore:
+    """
+    A durable, SQLite-backed record of every meeting job.
+    Each row keeps the job's status and its last completed pipeline stage. The intermediate
+    artifacts needed to resume without repeating finished stages are stored one row per
+    artifact, and completed stages one row per stage, so a checkpoint writes only what it
+    adds instead of rewriting every artifact (a cleaned transcript can be hundreds of KB).
+    """
+
+    def __init__(self, db_path: str | None = None):
+        """
+        Args:
+            db_path: Path to the SQLite file. Defaults to JOB_STORE_PATH or 'jobs.db'.
+        """
+        self.db_path = db_path or os.environ.get("JOB_STORE_PATH", "jobs.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    meeting_id TEXT NOT NULL,
+                    event_type TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    artifacts TEXT NOT NULL DEFAULT '{}',
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            # jobs.artifacts holds the artifacts of job stores written before job_artifacts existed.
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_artifacts (
+                    job_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (job_id, name)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_stages (
+                    job_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    completed_at TEXT NOT NULL,
+                    PRIMARY KEY (job_id, stage)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+            # Dedup index: webhook redeliveries are looked up by meeting and event type.
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (meeting_id, event_type, created_at)"
+            )
+        logging.info(f"JOB STORE: Using SQLite job store at {self.db_path}")
+
+    def find_or_create_job(self, meeting_id: str, event_type: str, ttl_seconds: int | None) -> tuple[dict, bool]:
+        """
+        Returns the most recent job for the same meeting and event type received within
+        the TTL, or records a new queued job if there is none. The lookup and insert
+        happen under one lock so concurrent redeliveries cannot both create a job.
+
+        Args:
+            ttl_seconds: How far back to look for an existing job; None looks at every job ever recorded.
+
+        Returns:
+            A tuple of (job, created).
+        """
+        query = "SELECT * FROM jobs WHERE meeting_id = ? AND event_type = ?"
+        params = [meeting_id, event_type]
+        if ttl_seconds is not None:
+            query += " AND created_at >= ?"
+            params.append((datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)).isoformat())
+        with self._lock, self._conn:
+            row = self._conn.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+            if row:
+                return self._load_job(row), False
+
+            job_id = uuid.uuid4().hex
+            now = _now()
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, meeting_id, event_type, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, meeting_id, event_type, now, now),
+            )
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return self._load_job(row), True
+
+    def get_job(self, job_id: str) -> dict | None:
+        """
+        Returns a job as a dictionary, with 'artifacts' and 'result' decoded, or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return self._load_job(row) if row else None
+
+    def list_unfinished_job_ids(self) -> list[str]:
+        """
+        Returns the IDs of jobs that were queued or running when the process last stopped.
+        """
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_id FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at",
+                UNFINISHED_STATUSES,
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    def set_status(self, job_id: str, status: str, result: dict | None = None, error: str | None = None):
+        """
+        Updates a job's status, and its result or error when finishing.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                (status, json.dumps(result) if result is not None else None, error, _now(), job_id),
+            )
+
+    def requeue_failed(self, job_id: str) -> bool:
+        """
+        Moves a failed job back to queued, clearing its error. Returns True only for the one
+        caller that made the transition, so concurrent redeliveries requeue it once.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', result = NULL, error = NULL, updated_at = ? "
+                "WHERE job_id = ? AND status = 'failed'",
+                (_now(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def save_stage(self, job_id: str, stage: str | None, artifacts: dict):
+        """
+        Stores new artifacts for the job and, if given, marks a stage as completed.
+        Passing stage=None checkpoints progress inside a stage.
+        """
+        now = _now()
+        with self._lock, self._conn:
+            if stage:
+                cursor = self._conn.execute("UPDATE jobs SET stage = ?, updated_at = ? WHERE job_id = ?", (stage, now, job_id))
+            else:
+                cursor = self._conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+            if not cursor.rowcount:
+                raise KeyError(f"Unknown job ID: {job_id}")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_artifacts (job_id, name, value) VALUES (?, ?, ?)",
+                [(job_id, name, json.dumps(value)) for name, value in artifacts.items()],
+            )
+            if stage:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO job_stages (job_id, stage, completed_at) VALUES (?, ?, ?)", (job_id, stage, now)
+                )
+        if stage:
+            logging.info(f"JOB STORE: Job {job_id} completed stage '{stage}'.")
+
+    def _load_job(self, row: sqlite3.Row) -> dict:
+        """
+        Returns a job row as a dictionary with its artifacts and completed stages. Called under the lock.
+        """
+        job = dict(row)
+        artifacts = json.loads(job["artifacts"] or "{}")
+        completed = artifacts.pop("completed_stages", [])
+        for artifact in self._conn.execute("SELECT name, value FROM job_artifacts WHERE job_id = ?", (job["job_id"],)):
+            artifacts[artifact["name"]] = json.loads(artifact["value"])
+        for stage_row in self._conn.execute(
+            "SELECT stage FROM job_stages WHERE job_id = ? ORDER BY completed_at, rowid", (job["job_id"],)
+        ):
+            if stage_row["stage"] not in completed:
+                completed.append(stage_row["stage"])
+        if completed:
+            artifacts["completed_stages"] = completed
+        job["artifacts"] = artifacts
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
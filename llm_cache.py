@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def make_key(model_name: str, prompt_version: str, generation_config: dict | None, input_text: str) -> str:
+    """
+    Returns the content address of one LLM call: a SHA-256 over the model, the prompt
+    template version, the generation config and the input text.
+    """
+    digest = hashlib.sha256()
+    header = json.dumps([model_name, prompt_version, generation_config or {}], sort_keys=True)
+    digest.update(header.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(input_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    A two-tier cache of LLM response texts: an in-process LRU in front of a SQLite file
+    evicted by total size (least recently used first). Hit and miss counters are kept per tier.
+    """
+
+    def __init__(self, db_path: str | None = None, memory_entries: int | None = None, max_disk_bytes: int | None = None):
+        """
+        Args:
+            db_path: SQLite file for the disk tier. Defaults to LLM_CACHE_PATH or 'llm_cache.db'.
+            memory_entries: LRU capacity. Defaults to LLM_CACHE_MEMORY_ENTRIES or 256.
+            max_disk_bytes: Disk tier size limit. Defaults to LLM_CACHE_MAX_BYTES or 256 MB.
+        """
+        self.db_path = db_path or os.environ.get("LLM_CACHE_PATH", "llm_cache.db")
+        self.memory_entries = memory_entries or int(os.environ.get("LLM_CACHE_MEMORY_ENTRIES", 256))
+        self.max_disk_bytes = max_disk_bytes or int(os.environ.get("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)")
+            self._disk_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        logging.info(f"LLM CACHE: Using cache at {self.db_path} ({self._disk_bytes} bytes on disk).")
+
+    def get(self, key: str) -> str | None:
+        """
+        Returns the cached response text for a key, or None on a miss.
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return value
+
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._counters["disk_hits"] += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """
+        Stores a response text in both tiers, evicting old disk entries past the size limit.
+        """
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._remember(key, value)
+            with self._conn:
+                previous = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time()),
+                )
+            self._disk_bytes += size - (previous[0] if previous else 0)
+            self._counters["stores"] += 1
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss/store/eviction counters and the current tier sizes.
+        """
+        with self._lock:
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = lookups - self._counters["misses"]
+            return dict(
+                self._counters,
+                hit_rate=hits / lookups if lookups else 0.0,
+                memory_entries=len(self._memory),
+                disk_bytes=self._disk_bytes,
+            )
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        # Trim to 90% of the limit so eviction does not run on every store.
+        target = int(self.max_disk_bytes * 0.9)
+        with self._conn:
+            for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access").fetchall():
+                if self._disk_bytes <= target:
+                    break
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                self._counters["evictions"] += 1
@@ -0,0 +1,173 @@
+import os
+import re
+import logging
+import threading
+from dotenv import load_dotenv
+
+import ai_processor
+import token_budget
+from name_index import KeywordMatcher, normalize_name
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Separators between the client and the engagement in a project name: "Acme - Website Rebuild".
+_PROJECT_NAME_SEPARATOR = re.compile(r"\s+[-–—:|/]\s+")
+
+# Names shorter than this (after normalization) match too many ordinary words to be trusted.
+MIN_CLIENT_NAME_CHARS = 3
+
+
+def _env_list(name: str) -> list[str]:
+    return [item.strip() for item in os.environ.get(name, "").split(",") if item.strip()]
+
+
+class MeetingClassifier:
+    """
+    Pass 0 with a fast path: classifies a meeting from its participants' email domains and
+    a keyword scan of its title and opening lines against every known client name, and
+    only asks the LLM (ai_processor.classify_meeting) when those rules are not conclusive.
+
+    Client names come from the Asana projects that follow the client naming convention (the
+    full name and the client part of names like "Acme - Website Rebuild") and the optional
+    KNOWN_CLIENTS list. They are
+    compiled into one Aho-Corasick automaton, rebuilt whenever the project index is refreshed,
+    so a scan costs microseconds however many projects the workspace has.
+    """
+
+    def __init__(self, project_index=None, internal_domains: list[str] | None = None, known_clients: list[str] | None = None):
+        """
+        Args:
+            project_index: Optional ProjectIndex supplying client names and their project GIDs.
+            internal_domains: Email domains of our own staff. Defaults to INTERNAL_EMAIL_DOMAINS.
+            known_clients: Extra client names to recognise. Defaults to KNOWN_CLIENTS.
+        """
+        self.project_index = project_index
+        domains = internal_domains if internal_domains is not None else _env_list("INTERNAL_EMAIL_DOMAINS")
+        self.internal_domains = {domain.lower().lstrip("@") for domain in domains}
+        self.known_clients = known_clients if known_clients is not None else _env_list("KNOWN_CLIENTS")
+        if not self.internal_domains:
+            logging.warning("MEETING CLASSIFIER: INTERNAL_EMAIL_DOMAINS is not set. Meetings with participants "
+                            "cannot be classified by the fast path and fall back to the LLM classifier.")
+        self._matcher = None
+        self._matcher_source = None
+        self._lock = threading.Lock()
+
+    def classify(self, title: str, participants: list[str] | None, transcript: str) -> dict:
+        """
+        Returns {'meeting_type': ..., 'client_name': ...} like ai_processor.classify_meeting,
+        plus 'project_gid' when the fast path matched a single project.
+        """
+        classification = self.classify_locally(title, participants, transcript)
+        if classification is not None:
+            return classification
+        logging.info("MEETING CLASSIFIER: Heuristics inconclusive. Falling back to the LLM classifier.")
+        return ai_processor.classify_meeting(transcript)
+
+    async def classify_async(self, title: str, participants: list[str] | None, transcript: str) -> dict:
+        """
+        The asyncio counterpart of classify(); only the LLM fallback awaits.
+        """
+        classification = self.classify_locally(title, participants, transcript)
+        if classification is not None:
+            return classification
+        logging.info("MEETING CLASSIFIER: Heuristics inconclusive. Falling back to the LLM classifier.")
+        return await ai_processor.classify_meeting_async(transcript)
+
+    def classify_locally(self, title: str, participants: list[str] | None, transcript: str) -> dict | None:
+        """
+        Applies the rules only, returning a classification or None when the meeting is ambiguous:
+
+        - Every participant is on an internal domain: an internal meeting.
+        - External participants, and exactly one client named in their domains, the title or
+          the opening lines: an external meeting with that client.
+        - No participant list, and exactly one client named in the title: an external meeting.
+
+        Participants only count as external when INTERNAL_EMAIL_DOMAINS is configured; without
+        it, a meeting with participants is always left to the LLM, since an internal meeting
+        that mentions a client could not be told apart from a meeting with that client.
+        """
+        domains = {email.rsplit("@", 1)[1].lower() for email in participants or [] if "@" in email}
+        if domains and not self.internal_domains:
+            return None
+        external_domains = {domain for domain in domains if not self._is_internal(domain)}
+
+        if domains and not external_domains:
+            return self._result("internal", "N/A", None, "all participants are internal")
+
+        matcher = self._get_matcher()
+        if matcher is None:
+            return None
+
+        clients = {}
+        for domain in external_domains:
+            # "mail.acme-corp.com" is scanned as "mail acme corp com".
+            self._collect(clients, matcher.find_all(domain))
+        self._collect(clients, matcher.find_all(title or ""))
+        if external_domains and not clients:
+            opening = token_budget.truncate_to_tokens(transcript or "", ai_processor.CLASSIFY_INPUT_TOKENS)
+            self._collect(clients, matcher.find_all(opening))
+
+        if len(clients) != 1:
+            return None
+        (client_name, full_name_gids, client_gids), = clients.values()
+        # A full project name pins the project; a bare client name only if it has one project.
+        project_gids = full_name_gids or client_gids
+        project_gid = next(iter(project_gids)) if len(project_gids) == 1 else None
+        return self._result("external", client_name, project_gid, "matched a known client")
+
+    def _is_internal(self, domain: str) -> bool:
+        return any(domain == internal or domain.endswith("." + internal) for internal in self.internal_domains)
+
+    @staticmethod
+    def _collect(clients: dict, matches: list):
+        for _, (client_name, project_gid, full_name) in matches:
+            _, full_name_gids, client_gids = clients.setdefault(normalize_name(client_name), (client_name, set(), set()))
+            if project_gid:
+                (full_name_gids if full_name else client_gids).add(project_gid)
+
+    @staticmethod
+    def _result(meeting_type: str, client_name: str, project_gid: str | None, reason: str) -> dict:
+        logging.info(f"MEETING CLASSIFIER: Fast path classified meeting as {meeting_type} "
+                     f"(client: {client_name}) because it {reason}.")
+        classification = {"meeting_type": meeting_type, "client_name": client_name}
+        if project_gid:
+            classification["project_gid"] = project_gid
+        return classification
+
+    def _get_matcher(self) -> KeywordMatcher | None:
+        """
+        Returns the client name automaton, rebuilding it if the project index has changed.
+        """
+        source = self.project_index.get_index() if self.project_index else None
+        with self._lock:
+            if self._matcher is None or source is not self._matcher_source:
+                entries = list(self._client_entries())
+                self._matcher = KeywordMatcher(entries) if entries else None
+                self._matcher_source = source
+                logging.info(f"MEETING CLASSIFIER: Indexed {len(entries)} client name(s).")
+            return self._matcher
+
+    def _client_entries(self):
+        """
+        Yields (name, (client_name, project_gid, is_full_project_name)) for every name the
+        automaton should match. A client part shared by several projects ("Acme - SEO", "Acme - Website") is emitted
+        once per project, so it still identifies the client but not a single project. Projects
+        without a client separator ("Marketing", "Website") are internal or generic, so they
+        are left out; list such clients in KNOWN_CLIENTS instead.
+        """
+        for client in self.known_clients:
+            if len(normalize_name(client)) >= MIN_CLIENT_NAME_CHARS:
+                yield client, (client, None, False)
+        for project_name, gid in self.project_index.project_names() if self.project_index else []:
+            parts = _PROJECT_NAME_SEPARATOR.split(project_name, 1)
+            if len(parts) < 2:
+                continue
+            client_part = parts[0].strip()
+            if len(normalize_name(client_part)) < MIN_CLIENT_NAME_CHARS:
+                continue
+            yield client_part, (client_part, gid, False)
+            yield project_name, (client_part, gid, True)
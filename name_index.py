@@ -0,0 +1,317 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict, deque
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a name for lookups: case-folded, punctuation dropped, whitespace collapsed.
+    e.g. "  Acme, Inc. " -> "acme inc"
+    """
+    return _NON_WORD.sub(" ", (name or "").casefold()).strip()
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    An immutable in-memory index from normalized names to values (e.g. Asana GIDs).
+    Supports exact, prefix and trigram-based fuzzy lookups, all without scanning every name.
+    """
+    __slots__ = ("_exact", "_sorted_keys", "_keys", "_trigram_postings", "_trigram_counts")
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Iterable of (name, value) pairs. When two names normalize to the
+                same key, the first one wins.
+        """
+        self._exact = {}
+        for name, value in entries:
+            key = normalize_name(name)
+            if key and key not in self._exact:
+                self._exact[key] = value
+
+        self._sorted_keys = sorted(self._exact)
+        self._keys = list(self._exact)
+        self._trigram_postings = defaultdict(list)
+        self._trigram_counts = []
+        for key_id, key in enumerate(self._keys):
+            grams = _trigrams(key)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._trigram_postings[gram].append(key_id)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def exact(self, name: str):
+        """
+        Returns the value for a name after normalization, or None.
+        """
+        return self._exact.get(normalize_name(name))
+
+    def prefix(self, name: str, limit: int = 10) -> list[tuple[str, object]]:
+        """
+        Returns up to `limit` (key, value) pairs whose normalized key starts with the normalized name.
+        """
+        key = normalize_name(name)
+        if not key: return []
+        matches = []
+        for i in range(bisect_left(self._sorted_keys, key), len(self._sorted_keys)):
+            candidate = self._sorted_keys[i]
+            if not candidate.startswith(key) or len(matches) >= limit:
+                break
+            matches.append((candidate, self._exact[candidate]))
+        return matches
+
+    def fuzzy(self, name: str, threshold: float = 0.6, limit: int = 5) -> list[tuple[float, str, object]]:
+        """
+        Returns up to `limit` (score, key, value) matches ranked by trigram Dice similarity,
+        keeping only those scoring at least `threshold` (0..1).
+        """
+        key = normalize_name(name)
+        if not key: return []
+        grams = _trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for key_id in self._trigram_postings.get(gram, ()):
+                shared[key_id] += 1
+
+        scored = []
+        for key_id, count in shared.items():
+            score = 2 * count / (len(grams) + self._trigram_counts[key_id])
+            if score >= threshold:
+                candidate = self._keys[key_id]
+                scored.append((score, candidate, self._exact[candidate]))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored[:limit]
+
+    def best_match(self, name: str, fuzzy_threshold: float = 0.75, prefix_limit: int = 10, min_prefix_chars: int = 0):
+        """
+        Returns the value for the best match: an exact match, else the value of the prefix
+        matches when they all share one value (several keys of one person, say), else the top
+        fuzzy match scoring at least `fuzzy_threshold`. Returns None otherwise.
+
+        With `min_prefix_chars`, a prefix match is only taken when the name's last word is a
+        whole word of the key, an initial after whole words ("sarah l"), or at least that many
+        characters and half the word it abbreviates, so "sar" or "jo" never pick someone out.
+        """
+        value = self.exact(name)
+        if value is not None:
+            return value
+        # One more than the limit is fetched, so a prefix shared by too many keys is never taken as unique.
+        prefix_matches = self.prefix(name, limit=prefix_limit + 1)
+        prefix_values = {match_value for _, match_value in prefix_matches}
+        if len(prefix_values) == 1 and len(prefix_matches) <= prefix_limit and (
+            not min_prefix_chars
+            or any(_is_confident_prefix(normalize_name(name), key, min_prefix_chars) for key, _ in prefix_matches)
+        ):
+            return prefix_matches[0][1]
+        fuzzy_matches = self.fuzzy(name, threshold=fuzzy_threshold, limit=1)
+        return fuzzy_matches[0][2] if fuzzy_matches else None
+
+
+def _is_confident_prefix(key: str, candidate: str, min_chars: int) -> bool:
+    """
+    Whether `key`, a prefix of `candidate`, ends in a whole word, an initial after whole
+    words, or a partial word of at least `min_chars` characters covering half the word.
+    """
+    words = key.split(" ")
+    partial, completed = words[-1], candidate.split(" ")[len(words) - 1]
+    if partial == completed:
+        return True
+    if len(partial) == 1 and len(words) > 1:
+        return True
+    return len(partial) >= min_chars and len(partial) * 2 >= len(completed)
+
+
+class KeywordMatcher:
+    """
+    An Aho-Corasick automaton over normalized names. find_all() reports every name that
+    occurs as whole words in a text in one pass over the text, however many names there are.
+    """
+    __slots__ = ("_goto", "_fail", "_outputs")
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Iterable of (name, value) pairs.
+        """
+        self._goto = [{}]
+        self._outputs = [[]]
+        for name, value in entries:
+            key = normalize_name(name)
+            if not key:
+                continue
+            node = 0
+            # Padding with spaces makes a match start and end on word boundaries.
+            for char in f" {key} ":
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._outputs.append([])
+                node = child
+            self._outputs[node].append((key, value))
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find_all(self, text: str) -> list[tuple[str, object]]:
+        """
+        Returns (normalized name, value) for every occurrence of an indexed name in the text.
+        """
+        found = []
+        node = 0
+        for char in f" {normalize_name(text)} ":
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if self._outputs[node]:
+                found.extend(self._outputs[node])
+        return found
+
+
+class CachedNameIndex:
+    """
+    Base class for a NameIndex built from records crawled from an API.
+    The records are crawled once, served from memory, and re-crawled in the background
+    once older than the TTL. They can optionally be persisted to a JSON file so a cold
+    start does not need to crawl again. Subclasses implement _crawl and _index_entries.
+    """
+    LOG_PREFIX = "NAME INDEX"
+    # After a failed first crawl, lookups return None for this long instead of re-crawling.
+    FAILED_CRAWL_BACKOFF_SECONDS = 60
+
+    def __init__(self, ttl_seconds: int, cache_path: str | None = None):
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = cache_path
+        self._index = None
+        self._records = []
+        self._built_at = 0.0
+        self._failed_at = None
+        self._lock = threading.Lock()
+        self._refreshing = threading.Event()
+
+    def _crawl(self) -> list:
+        """
+        Returns the full list of JSON-serializable records. Raises on failure.
+        """
+        raise NotImplementedError
+
+    def _index_entries(self, records: list):
+        """
+        Yields the (name, value) pairs to index for the given records.
+        """
+        raise NotImplementedError
+
+    def _cache_scope(self) -> str | None:
+        """
+        Identifies what the records belong to (e.g. a workspace GID); a persisted
+        cache from a different scope is ignored.
+        """
+        return None
+
+    def get_index(self) -> NameIndex | None:
+        """
+        Returns the current index, loading it from disk or crawling on first use.
+        A stale index is returned as-is while a background refresh replaces it.
+        """
+        if self._index is None:
+            if self._failed_at and time.time() - self._failed_at < self.FAILED_CRAWL_BACKOFF_SECONDS:
+                return None
+            with self._lock:
+                if self._index is None and not self._load_from_disk() and not self.refresh():
+                    self._failed_at = time.time()
+        if self._index is not None and time.time() - self._built_at > self.ttl_seconds:
+            self._refresh_in_background()
+        return self._index
+
+    def records(self) -> list:
+        """
+        Returns the crawled records backing the current index.
+        """
+        self.get_index()
+        return list(self._records)
+
+    def refresh(self) -> bool:
+        """
+        Crawls all records and atomically swaps in a new index.
+        Returns True on success; on failure the previous index is kept.
+        """
+        started = time.time()
+        try:
+            records = self._crawl()
+        except Exception as e:
+            logging.error(f"{self.LOG_PREFIX} ERROR: Refresh failed: {e}")
+            return False
+
+        self._swap(records, time.time())
+        logging.info(f"{self.LOG_PREFIX}: Indexed {len(records)} record(s) in {time.time() - started:.2f}s.")
+        self._save_to_disk()
+        return True
+
+    def _swap(self, records: list, built_at: float):
+        index = NameIndex(self._index_entries(records))
+        self._records = records
+        self._index = index
+        self._built_at = built_at
+
+    def _refresh_in_background(self):
+        if self._refreshing.is_set(): return
+        self._refreshing.set()
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing.clear()
+
+        threading.Thread(target=run, name=f"{self.__class__.__name__}-refresh", daemon=True).start()
+
+    def _load_from_disk(self) -> bool:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("scope") != self._cache_scope():
+                return False
+            self._swap(cached["records"], cached["built_at"])
+            logging.info(f"{self.LOG_PREFIX}: Loaded {len(self._records)} record(s) from {self.cache_path}.")
+            return True
+        except Exception as e:
+            logging.warning(f"{self.LOG_PREFIX}: Ignoring unreadable cache file {self.cache_path}: {e}")
+            return False
+
+    def _save_to_disk(self):
+        if not self.cache_path: return
+        try:
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"scope": self._cache_scope(), "built_at": self._built_at, "records": self._records}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logging.warning(f"{self.LOG_PREFIX}: Failed to persist index to {self.cache_path}: {e}")
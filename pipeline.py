@@ -0,0 +1,540 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import ai_processor
+import token_budget
+import transcript_cleaner
+from transcript_model import Transcript
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+# Which Pass 1 cleaner to use: 'local' (deterministic, no LLM call) or 'llm' (Gemini editor pass).
+TRANSCRIPT_CLEANER = os.environ.get("TRANSCRIPT_CLEANER", "local").lower()
+
+# 'separate' runs cleaning (Pass 1) and extraction (Pass 2) as two calls; 'fused' does both
+# in one Gemini call on the raw transcript; 'auto' lets token_budget.plan_passes pick per meeting.
+AI_PIPELINE_MODE = os.environ.get("AI_PIPELINE_MODE", "auto").lower()
+
+# With LLM cleaning in one call, stream it and extract each completed segment of cleaned
+# turns while the rest is still being generated, instead of running Pass 2 after Pass 1.
+STREAM_CLEANING = os.environ.get("AI_STREAM_CLEANING", "true").lower() not in ("0", "false", "no")
+
+
+class PipelineError(Exception):
+    """
+    Raised when a meeting cannot be carried through the workflow.
+    The message is what gets recorded as the job's error.
+    """
+
+
+def run_meeting_pipeline(meeting_id: str, fireflies_client, asana_client, default_project_gid: str,
+                         artifacts: dict | None = None, save_stage=None, router=None) -> dict:
+    """
+    Runs the full Fireflies -> AI -> Asana workflow for a single meeting.
+    Asana task creation runs concurrently with the AI passes, so its latency is off
+    the critical path. Stages already recorded in `artifacts` are skipped, so a resumed
+    job never re-runs finished Gemini passes or re-creates its Asana task.
+
+    Args:
+        meeting_id: The unique ID of the meeting from Fireflies.
+        fireflies_client: An initialized FirefliesClient.
+        asana_client: An initialized AsanaClient.
+        default_project_gid: The Asana project used when no routing applies.
+        artifacts: Intermediate results saved by a previous attempt, if any.
+        save_stage: Optional callable `save_stage(stage, **artifacts)` used to checkpoint
+            each completed stage (stage=None checkpoints progress within a stage).
+        router: Optional ProjectRouter choosing the client's project; without one every
+            meeting goes to default_project_gid.
+
+    Returns:
+        A dictionary describing the result, e.g. {'asana_task_gid': '...'}.
+
+    Raises:
+        PipelineError: If the transcript or the Asana task could not be produced.
+    """
+    job = _MeetingJob(meeting_id, fireflies_client, asana_client, default_project_gid, artifacts, save_stage, router)
+    job.log_start()
+    run_stage_graph(job.stage_graph(_run_steps), job.completed_stages)
+    return _pipeline_result(meeting_id, job.artifacts)
+
+
+async def run_meeting_pipeline_async(meeting_id: str, fireflies_client, asana_client, default_project_gid: str,
+                                     artifacts: dict | None = None, save_stage=None, router=None) -> dict:
+    """
+    The asyncio counterpart of run_meeting_pipeline, with the same stages, checkpoints and result.
+    Network calls are awaited instead of blocking a thread, so one event loop can carry many
+    meetings at once.
+
+    Args:
+        fireflies_client: An initialized AsyncFirefliesClient.
+        asana_client: An initialized AsyncAsanaClient.
+        (The other arguments are as for run_meeting_pipeline.)
+    """
+    job = _MeetingJob(meeting_id, fireflies_client, asana_client, default_project_gid, artifacts, save_stage, router)
+    job.log_start(" (async)")
+    await run_stage_graph_async(job.stage_graph(_run_steps_async), job.completed_stages)
+    return _pipeline_result(meeting_id, job.artifacts)
+
+
+class _MeetingJob:
+    """
+    One meeting's artifacts, checkpoints and stages, shared by both runtimes. Each stage is a
+    generator that yields the Fireflies, Gemini and Asana calls it needs (see _call) and is
+    sent back their results; _run_steps makes those calls on the stage's thread and
+    _run_steps_async awaits their `_async` counterparts, so only that I/O differs.
+    """
+
+    def __init__(self, meeting_id: str, fireflies_client, asana_client, default_project_gid: str,
+                 artifacts: dict | None, save_stage, router):
+        self.meeting_id = meeting_id
+        self.fireflies_client = fireflies_client
+        self.asana_client = asana_client
+        self.default_project_gid = default_project_gid
+        self.save_stage = save_stage
+        self.router = router
+        self.artifacts = dict(artifacts or {})
+        self.completed_stages = set(self.artifacts.get('completed_stages', []))
+        # Pass 2 results produced while streaming Pass 1; not checkpointed until extract_stage.
+        self.streamed = {}
+        # The raw transcript rendered whole, once, for the stages that send all of it (see _raw_text).
+        self.rendered = {}
+        if 'transcript' in self.artifacts:
+            self.artifacts['transcript'] = Transcript.load(self.artifacts['transcript'])
+
+    def checkpoint(self, stage: str | None, **new_artifacts):
+        self.artifacts.update(new_artifacts)
+        if stage:
+            self.completed_stages.add(stage)
+        if self.save_stage:
+            self.save_stage(stage, **_serializable(new_artifacts))
+
+    def log_start(self, runtime_label: str = ""):
+        if self.completed_stages:
+            logging.info(f"PIPELINE: Resuming meeting ID: {self.meeting_id} after stages: {sorted(self.completed_stages)}")
+        else:
+            logging.info(f"PIPELINE: Processing Fireflies meeting ID: {self.meeting_id}{runtime_label}")
+
+    def stage_graph(self, run_steps) -> dict:
+        """
+        Returns the stage graph with each stage run by `run_steps` (_run_steps or _run_steps_async).
+        """
+        stages = (self.fetch_stage, self.create_task_stage, self.clean_stage, self.extract_stage, self.publish_stage)
+        return _build_stage_graph(*(lambda stage=stage: run_steps(stage()) for stage in stages))
+
+    # --- Step 1: Fetch meeting data from Fireflies (transcript and title) ---
+    def fetch_stage(self):
+        meeting_data = yield _call(self.fireflies_client, 'get_transcript_and_title', self.meeting_id)
+        if not meeting_data or not meeting_data.get('transcript'):
+            logging.error(f"Failed to fetch transcript for meeting ID: {self.meeting_id}")
+            raise PipelineError(f"Could not retrieve transcript data for meeting ID: {self.meeting_id}")
+        self.checkpoint('fetched', transcript=meeting_data.get('transcript'),
+                        title=meeting_data.get('title', 'Untitled Meeting'),
+                        participants=meeting_data.get('participants', []))
+
+    # --- Step 2 (Asana branch): Create a placeholder task in Asana for the brief ---
+    # The task's GID is checkpointed as soon as it exists and the transcript is attached in a
+    # second step, so a retry after a failed upload re-attaches instead of creating a duplicate task.
+    def create_task_stage(self):
+        transcript = self.artifacts['transcript']
+        meeting_title = self.artifacts.get('title', 'Untitled Meeting')
+
+        if 'asana_task_gid' not in self.artifacts:
+            # Routing is off unless ASANA_ROUTING_ENABLED is set, for a predictable demo that always
+            # posts to the default project. The router is bounded by a deadline and falls back to it.
+            if self.router:
+                target_project_gid = yield _call(self.router, 'route', meeting_title, self.artifacts.get('participants'),
+                                                 _opening(transcript))
+            else:
+                target_project_gid = self.default_project_gid
+                logging.info(f"PIPELINE: Routing disabled. Using default project GID: {target_project_gid}")
+
+            new_task_gid = yield _call(self.asana_client, 'create_task', target_project_gid, f"Meeting Summary: {meeting_title}")
+            if not new_task_gid:
+                logging.error("Failed to create the initial task in Asana.")
+                raise PipelineError("Failed to create the initial Asana task.")
+            self.checkpoint(None, asana_task_gid=new_task_gid, project_gid=target_project_gid)
+        else:
+            logging.info(f"PIPELINE: Reusing Asana task {self.artifacts['asana_task_gid']} created by a previous attempt.")
+
+        # Attach the raw transcript
+        attached = yield _call(self.asana_client, 'attach_transcript', self.artifacts['asana_task_gid'],
+                               _raw_text(transcript, self.rendered))
+        if not attached:
+            raise PipelineError(f"Failed to attach the transcript to Asana task {self.artifacts['asana_task_gid']}.")
+        self.checkpoint('task_created')
+
+    # --- Step 3 (AI branch): AI Processing Pipeline ---
+    # Pass 1: Clean Transcript
+    # The local cleaner is the default; with TRANSCRIPT_CLEANER=llm, transcripts too long for
+    # one call are split on speaker turns and cleaned chunk-parallel (map-reduce), and the
+    # rest are streamed with extraction overlapped (AI_STREAM_CLEANING). A fused plan leaves
+    # cleaning to the extraction call.
+    def clean_stage(self):
+        transcript = self.artifacts['transcript']
+        plan = _plan_passes(transcript)
+        if plan.fused:
+            logging.info("PIPELINE: Cleaning is fused into extraction; skipping Pass 1.")
+            self.checkpoint('cleaned')
+            return
+        if TRANSCRIPT_CLEANER != 'llm':
+            cleaned_transcript = transcript_cleaner.clean_transcript(transcript)
+        elif plan.clean_chunk_chars:
+            cleaned_transcript = yield _call(ai_processor, 'clean_transcript_chunked', transcript, plan.clean_chunk_chars)
+        elif segment_chars := _stream_segment_chars(plan, transcript):
+            cleaned_transcript, self.streamed['structured_data'] = yield _call(
+                ai_processor, 'clean_and_extract_streaming', _raw_text(transcript, self.rendered), segment_chars
+            )
+        else:
+            cleaned_transcript = yield _call(ai_processor, 'clean_transcript', _raw_text(transcript, self.rendered))
+        self.checkpoint('cleaned', cleaned_transcript=cleaned_transcript)
+
+    # Pass 2: Extract Structured Data
+    # A failed extraction (as opposed to a meeting with nothing to extract) fails the job
+    # instead of posting a misleading "no data" brief; a retry resumes from the cleaned transcript.
+    # With a fused plan this stage cleans and extracts in one call on the raw transcript.
+    def extract_stage(self):
+        plan = _plan_passes(self.artifacts['transcript'])
+        fused = plan.fused or 'cleaned_transcript' not in self.artifacts
+        # Chunked extraction splits the raw Transcript itself; only a single call needs it rendered whole.
+        if not fused:
+            source_transcript = self.artifacts['cleaned_transcript']
+        elif plan.extract_chunk_chars:
+            source_transcript = self.artifacts['transcript']
+        else:
+            source_transcript = _raw_text(self.artifacts['transcript'], self.rendered)
+        if 'structured_data' in self.streamed:
+            structured_data = self.streamed['structured_data']
+        elif plan.extract_chunk_chars:
+            structured_data = yield _call(ai_processor, 'extract_structured_data_chunked', source_transcript,
+                                          fused=fused, max_chars=plan.extract_chunk_chars)
+        else:
+            structured_data = yield _call(ai_processor, 'extract_structured_data', source_transcript, fused=fused)
+        if isinstance(structured_data, dict) and structured_data.get('error'):
+            raise PipelineError(f"Structured data extraction failed: {structured_data['error']}")
+        self.checkpoint('extracted', structured_data=structured_data)
+
+    # --- Steps 4 & 5 (join): Post the brief as a comment and create sub-tasks ---
+    # Both go out together through Asana's batch API. 'commented' and the indexes of created
+    # sub-tasks are checkpointed once the batches return so a resumed job skips them.
+    def publish_stage(self):
+        write_brief = 'commented' not in self.completed_stages
+        project_brief_content, action_items_to_create = _prepare_brief(self.artifacts['structured_data'], write_brief=write_brief)
+        outcome = yield from _publish_steps(
+            self.asana_client, self.artifacts['asana_task_gid'],
+            # project_brief_content will now be Markdown from ai_processor
+            comment_html=project_brief_content if write_brief else None,
+            action_items=action_items_to_create,
+            created_indexes=self.artifacts.get('subtasks_created', []),
+            on_commented=lambda: self.checkpoint('commented'),
+            on_created=lambda created: self.checkpoint(None, subtasks_created=created),
+        )
+        self.checkpoint('subtasks_done', comment_error=outcome['comment_error'], subtask_failures=outcome['subtask_failures'])
+
+
+def _build_stage_graph(fetch_stage, create_task_stage, clean_stage, extract_stage, publish_stage) -> dict:
+    # The fetch fans out to the Asana branch and the AI branch, which join before publishing.
+    return {
+        'fetched': ((), fetch_stage),
+        'task_created': (('fetched',), create_task_stage),
+        'cleaned': (('fetched',), clean_stage),
+        'extracted': (('cleaned',), extract_stage),
+        'subtasks_done': (('task_created', 'extracted'), publish_stage),
+    }
+
+
+def _call(target, method: str, *args, **kwargs) -> tuple:
+    # A call a stage yields: target.method(...) on a thread, or target.method_async(...) on the event loop.
+    return target, method, args, kwargs, False
+
+
+def _blocking_call(target, method: str, *args, **kwargs) -> tuple:
+    # A blocking call with no async counterpart; the event loop runs it on a worker thread.
+    return target, method, args, kwargs, True
+
+
+def _run_steps(steps):
+    """
+    Runs a stage generator on the calling thread, making each call it yields and sending
+    back the result. Returns the generator's return value.
+    """
+    result = None
+    while True:
+        try:
+            target, method, args, kwargs, _ = steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result = getattr(target, method)(*args, **kwargs)
+
+
+async def _run_steps_async(steps):
+    """
+    The asyncio counterpart of _run_steps: each yielded call is made through the target's
+    `_async` method, or on a worker thread if it is blocking.
+    """
+    result = None
+    while True:
+        try:
+            target, method, args, kwargs, blocking = steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+        if blocking:
+            result = await asyncio.to_thread(getattr(target, method), *args, **kwargs)
+        else:
+            result = await getattr(target, f"{method}_async")(*args, **kwargs)
+
+
+def _plan_passes(transcript: Transcript) -> token_budget.PassPlan:
+    return token_budget.plan_passes(
+        transcript, AI_PIPELINE_MODE, llm_cleaning=TRANSCRIPT_CLEANER == 'llm',
+        preferred_chunk_chars=ai_processor.CHUNK_MAX_CHARS,
+    )
+
+
+def _opening(transcript: Transcript) -> str:
+    # Routing reads only the start of the meeting; twice what the classifier keeps is rendered.
+    return transcript.head(ai_processor.CLASSIFY_INPUT_TOKENS * 8)
+
+
+def _raw_text(transcript: Transcript, rendered: dict) -> str:
+    """
+    Returns the whole rendered transcript, rendering it only the first time in a job, so the
+    task attachment and a single-call pass share one string. Chunked passes never need it.
+    """
+    if 'raw' not in rendered:
+        rendered['raw'] = transcript.render()
+    return rendered['raw']
+
+
+def _serializable(new_artifacts: dict) -> dict:
+    # Transcripts are checkpointed in their compact form.
+    return {key: value.to_dict() if isinstance(value, Transcript) else value for key, value in new_artifacts.items()}
+
+
+def _stream_segment_chars(plan: token_budget.PassPlan, transcript: Transcript) -> int | None:
+    """
+    Returns the segment size for streamed cleaning, or None when streaming would not
+    overlap anything (it is disabled, or the transcript is a single segment).
+    """
+    if not STREAM_CLEANING:
+        return None
+    segment_chars = min(ai_processor.STREAM_SEGMENT_CHARS, plan.extract_chunk_chars or ai_processor.STREAM_SEGMENT_CHARS)
+    return segment_chars if len(transcript) > segment_chars else None
+
+
+def _pipeline_result(meeting_id: str, artifacts: dict) -> dict:
+    new_task_gid = artifacts['asana_task_gid']
+    subtask_failures = artifacts.get('subtask_failures', [])
+    if subtask_failures:
+        logging.warning(f"PIPELINE: {len(subtask_failures)} sub-task(s) could not be created for meeting ID: {meeting_id}")
+    logging.info(f"Successfully completed V4 workflow for meeting ID: {meeting_id}. New Asana Task GID: {new_task_gid}")
+    return {
+        "asana_task_gid": new_task_gid,
+        "comment_error": artifacts.get('comment_error'),
+        "subtasks_created": len(artifacts.get('subtasks_created', [])),
+        "subtask_failures": subtask_failures,
+    }
+
+
+def publish_to_asana(asana_client, parent_task_gid: str, comment_html: str | None, action_items: list,
+                     created_indexes=(), on_commented=None, on_created=None, max_workers: int | None = None) -> dict:
+    """
+    Posts the brief comment and creates one sub-task per action item, merged into as few
+    Asana /batch requests as possible. Batches are sent on a bounded worker pool.
+
+    Args:
+        asana_client: An initialized AsanaClient.
+        parent_task_gid: The meeting summary task the comment and sub-tasks belong to.
+        comment_html: The brief to post, or None if it was already posted.
+        action_items: Action item dicts from Pass 2 ('task', 'owner', 'due_date').
+        created_indexes: Indexes of items already created by a previous attempt; they are skipped.
+        on_commented: Optional callable invoked once the comment has been posted.
+        on_created: Optional callable receiving the updated list of created indexes after each batch.
+        max_workers: Concurrency cap on batch requests in flight. Defaults to ASANA_SUBTASK_CONCURRENCY
+            or 4, which keeps a single meeting well under Asana's per-token request rate limit.
+
+    Returns:
+        {'comment_error': str | None, 'subtask_failures': [{'index': ..., 'task': ..., 'error': ...}]}
+    """
+    return _run_steps(_publish_steps(asana_client, parent_task_gid, comment_html, action_items,
+                                     created_indexes, on_commented, on_created, max_workers))
+
+
+async def publish_to_asana_async(asana_client, parent_task_gid: str, comment_html: str | None, action_items: list,
+                                 created_indexes=(), on_commented=None, on_created=None, max_workers: int | None = None) -> dict:
+    """
+    The asyncio counterpart of publish_to_asana, for an AsyncAsanaClient.
+    """
+    return await _run_steps_async(_publish_steps(asana_client, parent_task_gid, comment_html, action_items,
+                                                 created_indexes, on_commented, on_created, max_workers))
+
+
+def _publish_steps(asana_client, parent_task_gid: str, comment_html: str | None, action_items: list,
+                   created_indexes=(), on_commented=None, on_created=None, max_workers: int | None = None):
+    """
+    The steps of publish_to_asana as a stage generator (see _run_steps).
+    """
+    max_workers = max_workers or int(os.environ.get("ASANA_SUBTASK_CONCURRENCY", 4))
+    if action_items:
+        # Owner resolution may have to crawl the user directory; keep that off the event loop.
+        yield _blocking_call(asana_client.user_directory, 'get_index')
+    batch, comment_result, subtask_results, failures = _build_publish_batch(
+        asana_client, parent_task_gid, comment_html, action_items, created_indexes
+    )
+    if len(batch):
+        logging.info(f"ASANA CLIENT: Publishing {len(batch)} action(s) via batch API...")
+        yield _call(batch, 'execute', max_workers=max_workers)
+    return _publish_outcome(comment_result, subtask_results, failures, created_indexes, on_commented, on_created)
+
+
+def _build_publish_batch(asana_client, parent_task_gid: str, comment_html: str | None, action_items: list, created_indexes):
+    """
+    Queues the comment and the sub-tasks not yet created. Returns (batch, comment_result,
+    [(index, task name, BatchResult)], failures for items that could not be queued).
+    """
+    failures = []
+
+    batch = asana_client.batch()
+    comment_result = batch.add_comment(parent_task_gid, comment_html) if comment_html is not None else None
+
+    subtask_results = []
+    for index, item in enumerate(action_items):
+        if index in created_indexes:
+            continue
+        if not isinstance(item, dict):
+            logging.warning(f"Skipping sub-task creation for non-dict item: {item}")
+            failures.append({"index": index, "task": None, "error": "Action item is not an object"})
+        elif not item.get('task'): # Only create if subtask name exists
+            logging.warning(f"Skipping sub-task creation due to missing 'task' name in item: {item}")
+            failures.append({"index": index, "task": None, "error": "Action item has no 'task' name"})
+        else:
+            result = batch.add_subtask(
+                parent_task_gid, item.get('task'), due_on=item.get('due_date'), owner_name=item.get('owner')
+            )
+            subtask_results.append((index, item.get('task'), result))
+    return batch, comment_result, subtask_results, failures
+
+
+def _publish_outcome(comment_result, subtask_results: list, failures: list, created_indexes,
+                     on_commented=None, on_created=None) -> dict:
+    created = list(created_indexes)
+    comment_error = None
+    if comment_result is not None:
+        if comment_result.ok:
+            logging.info("ASANA CLIENT: Successfully posted comment.")
+            if on_commented:
+                on_commented()
+        else:
+            comment_error = comment_result.error
+            logging.error(f"ASANA CLIENT ERROR: Failed to post comment: {comment_error}")
+
+    for index, subtask_name, result in subtask_results:
+        if result.ok:
+            logging.info(f"ASANA CLIENT: Created sub-task: {subtask_name}")
+            created.append(index)
+        else:
+            logging.error(f"ASANA CLIENT ERROR: Sub-task '{subtask_name}' failed: {result.error}")
+            failures.append({"index": index, "task": subtask_name, "error": result.error})
+    if subtask_results and on_created:
+        on_created(sorted(created))
+
+    return {"comment_error": comment_error, "subtask_failures": sorted(failures, key=lambda failure: failure["index"])}
+
+
+def run_stage_graph(stage_graph: dict, completed_stages: set, max_workers: int = 2):
+    """
+    Runs a dependency graph of pipeline stages, starting each stage as soon as all of its
+    dependencies are complete so independent branches overlap.
+
+    Args:
+        stage_graph: Maps stage name -> (dependency names, zero-argument callable).
+        completed_stages: Stages already done; they are skipped. Updated as stages finish.
+        max_workers: How many stages may run at the same time.
+
+    Raises:
+        The first exception raised by any stage. Stages not yet started are abandoned.
+    """
+    done = set(completed_stages)
+    pending = {name for name in stage_graph if name not in done}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline-stage") as executor:
+        while pending or running:
+            ready = [name for name in pending if all(dep in done for dep in stage_graph[name][0])]
+            for name in ready:
+                pending.discard(name)
+                running[executor.submit(stage_graph[name][1])] = name
+
+            if not running:
+                raise PipelineError(f"Pipeline stages have unsatisfiable dependencies: {sorted(pending)}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                future.result()  # Re-raise the stage's failure, if any
+                done.add(name)
+                completed_stages.add(name)
+
+
+async def run_stage_graph_async(stage_graph: dict, completed_stages: set):
+    """
+    The asyncio counterpart of run_stage_graph: stages are coroutine functions, and every
+    stage whose dependencies are complete runs concurrently on the event loop.
+
+    Raises:
+        The first exception raised by any stage. Stages still running are cancelled.
+    """
+    done = set(completed_stages)
+    pending = {name for name in stage_graph if name not in done}
+    running = {}
+
+    try:
+        while pending or running:
+            ready = [name for name in pending if all(dep in done for dep in stage_graph[name][0])]
+            for name in ready:
+                pending.discard(name)
+                running[asyncio.ensure_future(stage_graph[name][1]())] = name
+
+            if not running:
+                raise PipelineError(f"Pipeline stages have unsatisfiable dependencies: {sorted(pending)}")
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                name = running.pop(task)
+                task.result()  # Re-raise the stage's failure, if any
+                done.add(name)
+                completed_stages.add(name)
+    finally:
+        for task in running:
+            task.cancel()
+
+
+def _prepare_brief(structured_data, write_brief: bool = True) -> tuple[str, list]:
+    """
+    Turns Pass 2 output into the brief to post and the list of action items to create.
+    """
+    # --- MODIFICATION: Graceful handling for empty or malformed structured data ---
+    project_brief_content = ""
+    action_items_to_create = []
+
+    if not structured_data or not isinstance(structured_data, dict) or structured_data.get("empty_data", False):
+        if write_brief:
+            logging.info("AI PROCESSOR: Detected empty or invalid structured data from Pass 2. Generating concise 'no data' brief.")
+            # Call write_project_brief with the "empty_data" flag to get the generic message
+            project_brief_content = ai_processor.write_project_brief({"empty_data": True})
+        # No action items to create if data is empty
+    else:
+        # Pass 3: Write Project Brief (only if data is meaningful)
+        if write_brief:
+            project_brief_content = ai_processor.write_project_brief(structured_data)
+
+        # Prepare action items for sub-task creation
+        action_items_to_create = structured_data.get('action_items', [])
+        if not isinstance(action_items_to_create, list):
+            logging.warning("AI PROCESSOR: 'action_items' was not a list, skipping sub-task creation.")
+            action_items_to_create = [] # Ensure it's an empty list if malformed
+
+    return project_brief_content, action_items_to_create
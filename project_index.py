@@ -0,0 +1,74 @@
+import os
+import logging
+from dotenv import load_dotenv
+
+from name_index import CachedNameIndex
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class ProjectIndex(CachedNameIndex):
+    """
+    A cached index of every project in the Asana workspace, keyed by normalized name.
+    The project list is crawled once (following pagination), served from memory, and
+    re-crawled in the background once it is older than the TTL. It can optionally be
+    persisted to disk so a cold start does not need to crawl the workspace again.
+    """
+    LOG_PREFIX = "PROJECT INDEX"
+
+    def __init__(self, asana_client, ttl_seconds: int | None = None, cache_path: str | None = None):
+        """
+        Args:
+            asana_client: The AsanaClient used to crawl projects.
+            ttl_seconds: How long an index stays fresh. Defaults to PROJECT_INDEX_TTL_SECONDS or 900.
+            cache_path: Optional JSON file to persist the index. Defaults to PROJECT_INDEX_CACHE_PATH.
+        """
+        super().__init__(
+            ttl_seconds or int(os.environ.get("PROJECT_INDEX_TTL_SECONDS", 900)),
+            cache_path or os.environ.get("PROJECT_INDEX_CACHE_PATH"),
+        )
+        self.asana_client = asana_client
+
+    def find(self, project_name: str, fuzzy: bool = True) -> str | None:
+        """
+        Returns the GID of the project best matching the name (exact, unique prefix,
+        then fuzzy if enabled), or None.
+        """
+        index = self.get_index()
+        if not index: return None
+        if not fuzzy:
+            return index.exact(project_name)
+        return index.best_match(project_name)
+
+    def find_prefix(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Returns the GIDs of up to `limit` projects whose name starts with the prefix.
+        """
+        index = self.get_index()
+        return [gid for _, gid in index.prefix(prefix, limit=limit)] if index else []
+
+    def project_names(self) -> list[tuple[str, str]]:
+        """
+        Returns every indexed project as a (name, gid) pair.
+        """
+        return [(name, gid) for name, gid in self.records()]
+
+    def _crawl(self) -> list:
+        return [
+            [project.get('name', ''), project['gid']]
+            for project in self.asana_client.iter_pages(
+                "/projects",
+                {"workspace": self.asana_client.workspace_gid, "archived": "false", "opt_fields": "name"},
+            )
+        ]
+
+    def _index_entries(self, records: list):
+        for name, gid in records:
+            yield name, gid
+
+    def _cache_scope(self) -> str | None:
+        return self.asana_client.workspace_gid
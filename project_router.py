@@ -0,0 +1,155 @@
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dotenv import load_dotenv
+
+from name_index import normalize_name
+from meeting_classifier import MeetingClassifier
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+ROUTING_ENABLED = os.environ.get("ASANA_ROUTING_ENABLED", "false").lower() in ("1", "true", "yes")
+# The longest routing may take before a meeting is sent to the default project.
+ROUTING_TIMEOUT_SECONDS = float(os.environ.get("ASANA_ROUTING_TIMEOUT_MS", 50)) / 1000
+# Ask Gemini (Pass 0) about meetings the heuristics cannot classify. This costs a model call
+# per ambiguous meeting, so ROUTING_TIMEOUT_SECONDS should then be raised to a few seconds.
+ROUTING_LLM_FALLBACK = os.environ.get("ASANA_ROUTING_LLM_FALLBACK", "false").lower() in ("1", "true", "yes")
+
+
+class ProjectRouter:
+    """
+    Picks the Asana project for a meeting's summary task: the client's project for an external
+    meeting, otherwise the default project. Classification uses MeetingClassifier's fast path,
+    and client names are resolved through a client-name -> project-GID map cached in memory
+    in front of the ProjectIndex. The whole decision runs under a deadline; a meeting that
+    cannot be routed in time (e.g. while the index is still being crawled on a cold start)
+    goes to the default project, so routing never holds up the pipeline. A resolve that misses
+    the deadline keeps its worker until it finishes; while every worker is taken, meetings go
+    straight to the default project instead of queueing more resolves behind them.
+    """
+
+    def __init__(self, asana_client, default_project_gid: str, timeout_seconds: float = ROUTING_TIMEOUT_SECONDS,
+                 llm_fallback: bool = ROUTING_LLM_FALLBACK):
+        """
+        Args:
+            asana_client: The AsanaClient whose project_index supplies the projects.
+            default_project_gid: Where meetings go when no client project is found (ASANA_PROJECT_GID).
+            timeout_seconds: The routing deadline. Defaults to ASANA_ROUTING_TIMEOUT_MS.
+            llm_fallback: Classify ambiguous meetings with Gemini. Defaults to ASANA_ROUTING_LLM_FALLBACK.
+        """
+        self.project_index = asana_client.project_index
+        self.default_project_gid = default_project_gid
+        self.timeout_seconds = timeout_seconds
+        self.llm_fallback = llm_fallback
+        self.classifier = MeetingClassifier(self.project_index)
+        self._client_projects = {}  # normalized client name -> project GID or None
+        self._client_projects_source = None
+        self._lock = threading.Lock()
+        self._max_pending = int(os.environ.get("ASANA_ROUTING_WORKERS", 4))
+        self._pending = 0  # Resolves submitted and not yet finished, including abandoned ones
+        self._executor = ThreadPoolExecutor(max_workers=self._max_pending, thread_name_prefix="project-router")
+
+    def warm(self):
+        """
+        Starts loading the project index and client names in the background, so the first
+        meetings after a cold start are routed instead of hitting the deadline.
+        """
+        self._submit(self.classifier.classify_locally, "", None, "")
+
+    def route(self, title: str, participants: list[str] | None, transcript: str) -> str:
+        """
+        Returns the project GID for the meeting, or the default project GID if no client
+        project was found within the deadline.
+        """
+        future = self._submit(self._resolve, title, participants, transcript)
+        if future is None:
+            return self.default_project_gid
+        try:
+            project_gid = future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            logging.warning(f"PROJECT ROUTER: Routing took longer than {self.timeout_seconds * 1000:.0f} ms. Using default project.")
+            return self.default_project_gid
+        except Exception as e:
+            logging.error(f"PROJECT ROUTER ERROR: Routing failed ({e}). Using default project.")
+            return self.default_project_gid
+        return project_gid or self.default_project_gid
+
+    async def route_async(self, title: str, participants: list[str] | None, transcript: str) -> str:
+        """
+        The asyncio counterpart of route(), with the same deadline and fallback.
+        """
+        future = self._submit(self._resolve, title, participants, transcript)
+        if future is None:
+            return self.default_project_gid
+        try:
+            project_gid = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            logging.warning(f"PROJECT ROUTER: Routing took longer than {self.timeout_seconds * 1000:.0f} ms. Using default project.")
+            return self.default_project_gid
+        except Exception as e:
+            logging.error(f"PROJECT ROUTER ERROR: Routing failed ({e}). Using default project.")
+            return self.default_project_gid
+        return project_gid or self.default_project_gid
+
+    def _submit(self, fn, *args):
+        """
+        Starts `fn` on a router worker, or returns None without starting it if every worker
+        is still busy (typically with resolves abandoned while the project index loads).
+        """
+        with self._lock:
+            if self._pending >= self._max_pending:
+                logging.warning("PROJECT ROUTER: All routing workers are busy. Using default project.")
+                return None
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._resolve_done)
+        return future
+
+    def _resolve_done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _resolve(self, title: str, participants: list[str] | None, transcript: str) -> str | None:
+        if self.llm_fallback:
+            classification = self.classifier.classify(title, participants, transcript)
+        else:
+            classification = self.classifier.classify_locally(title, participants, transcript) or {}
+        meeting_type = classification.get('meeting_type', 'internal')
+        client_name = classification.get('client_name', 'N/A')
+        if meeting_type != 'external' or not client_name or client_name == 'N/A':
+            logging.info("PROJECT ROUTER: No client identified. Using default project.")
+            return None
+        if classification.get('project_gid'):
+            return classification['project_gid']
+
+        project_gid = self._find_client_project(client_name)
+        if project_gid:
+            logging.info(f"PROJECT ROUTER: Routing meeting for client '{client_name}' to project GID: {project_gid}")
+        else:
+            logging.warning(f"PROJECT ROUTER: Client project for '{client_name}' not found. Using default project.")
+        return project_gid
+
+    def _find_client_project(self, client_name: str) -> str | None:
+        """
+        Looks a client up in the cached map, falling back to the project index on a miss.
+        The map is cleared whenever the project index is refreshed.
+        """
+        source = self.project_index.get_index()
+        key = normalize_name(client_name)
+        with self._lock:
+            if source is not self._client_projects_source:
+                self._client_projects = {}
+                self._client_projects_source = source
+            if key in self._client_projects:
+                return self._client_projects[key]
+        project_gid = self.project_index.find(client_name)
+        with self._lock:
+            if source is self._client_projects_source:
+                self._client_projects[key] = project_gid
+        return project_gid
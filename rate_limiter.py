@@ -0,0 +1,196 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+
+class Grant:
+    """
+    A permit returned by RateLimiter.acquire(); pass it back to release() when the call ends.
+    """
+    __slots__ = ("estimated_tokens", "granted_at")
+
+    def __init__(self, estimated_tokens: int, granted_at: float):
+        self.estimated_tokens = estimated_tokens
+        self.granted_at = granted_at
+
+
+class RateLimiter:
+    """
+    Meters calls to one upstream API against a requests-per-minute and a tokens-per-minute
+    quota (two token buckets refilled continuously) and caps how many calls are in flight.
+    Waiting callers, sync or async, are served strictly in arrival order, so a large request
+    cannot be starved by a stream of small ones.
+
+    Each bucket holds only `burst_seconds` of refill (RATE_LIMIT_BURST_SECONDS, default 5),
+    so any rolling minute sees at most the quota plus that burst rather than twice the quota.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float, max_concurrent: int,
+                 burst_seconds: float | None = None):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrent = max_concurrent
+        burst_seconds = burst_seconds or float(os.environ.get("RATE_LIMIT_BURST_SECONDS", 5))
+        # At least one request's worth, so a low quota still admits a call.
+        self.request_capacity = max(1.0, requests_per_minute * burst_seconds / 60)
+        self.token_capacity = max(1.0, tokens_per_minute * burst_seconds / 60)
+        self._request_budget = self.request_capacity
+        self._token_budget = self.token_capacity
+        self._refilled_at = time.monotonic()
+        self._in_flight = 0
+        self._waiting = deque()
+        self._async_waiters = {}  # ticket -> (event loop, future) of an async caller parked in the queue
+        self._usage = deque()  # (timestamp, requests, tokens) charged over the last minute
+        self._total_wait_seconds = 0.0
+        self._total_grants = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, estimated_tokens: int) -> Grant:
+        """
+        Blocks until the call may start, then returns its Grant.
+        """
+        ticket = object()
+        enqueued_at = time.monotonic()
+        with self._condition:
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    delay = self._try_grant(ticket, estimated_tokens)
+                    if delay == 0:
+                        return self._grant(estimated_tokens, enqueued_at)
+                    self._condition.wait(timeout=delay)  # None: until _notify
+            except BaseException:
+                self._abandon(ticket)
+                raise
+
+    async def acquire_async(self, estimated_tokens: int) -> Grant:
+        """
+        The asyncio counterpart of acquire(); waits without blocking the event loop. A caller
+        parks on a future that is resolved when it reaches the head of the queue or capacity
+        is released, and otherwise sleeps only until its bucket has refilled.
+        """
+        ticket = object()
+        enqueued_at = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            self._waiting.append(ticket)
+        try:
+            while True:
+                with self._condition:
+                    delay = self._try_grant(ticket, estimated_tokens)
+                    if delay == 0:
+                        return self._grant(estimated_tokens, enqueued_at)
+                    woken = loop.create_future()
+                    self._async_waiters[ticket] = (loop, woken)
+                try:
+                    await asyncio.wait_for(woken, timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._condition:
+                        self._async_waiters.pop(ticket, None)
+        except BaseException:
+            with self._condition:
+                self._abandon(ticket)
+            raise
+
+    def release(self, grant: Grant, actual_tokens: int | None = None):
+        """
+        Ends a call. If the actual token usage is known, the difference from the estimate
+        is charged to (or refunded to) the token bucket.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if actual_tokens is not None:
+                self._refill()
+                difference = actual_tokens - grant.estimated_tokens
+                self._token_budget = min(self.token_capacity, self._token_budget - difference)
+                self._usage.append((time.monotonic(), 0, difference))
+            self._notify()
+
+    def stats(self) -> dict:
+        """
+        Returns the current utilisation of both quotas over the last minute, the number of
+        calls in flight and waiting, and the average time callers waited for a permit.
+        """
+        with self._condition:
+            self._trim_usage(time.monotonic())
+            requests_last_minute = sum(requests for _, requests, _ in self._usage)
+            tokens_last_minute = max(0, sum(tokens for _, _, tokens in self._usage))
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "requests_last_minute": requests_last_minute,
+                "tokens_last_minute": tokens_last_minute,
+                "request_utilisation": requests_last_minute / self.requests_per_minute,
+                "token_utilisation": tokens_last_minute / self.tokens_per_minute,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiting),
+                "average_wait_seconds": self._total_wait_seconds / self._total_grants if self._total_grants else 0.0,
+            }
+
+    def _try_grant(self, ticket, estimated_tokens: int) -> float | None:
+        """
+        Returns 0 if `ticket` may start now, otherwise roughly how long to wait before trying
+        again, or None to wait until _notify (for its turn or for a call to finish).
+        """
+        if self._waiting[0] is not ticket:
+            return None
+        if self._in_flight >= self.max_concurrent:
+            return None
+        self._refill()
+        # A single call larger than the bucket waits for a full bucket, not forever, and its
+        # excess is repaid before the next call starts.
+        tokens_needed = min(estimated_tokens, self.token_capacity)
+        request_shortfall = 1 - self._request_budget
+        token_shortfall = tokens_needed - self._token_budget
+        if request_shortfall <= 0 and token_shortfall <= 0:
+            return 0
+        return max(request_shortfall / self.requests_per_minute, token_shortfall / self.tokens_per_minute) * 60
+
+    def _grant(self, estimated_tokens: int, enqueued_at: float) -> Grant:
+        now = time.monotonic()
+        self._waiting.popleft()
+        self._request_budget -= 1
+        self._token_budget -= estimated_tokens
+        self._in_flight += 1
+        self._usage.append((now, 1, estimated_tokens))
+        self._trim_usage(now)
+        self._total_wait_seconds += now - enqueued_at
+        self._total_grants += 1
+        self._notify()
+        return Grant(estimated_tokens, now)
+
+    def _abandon(self, ticket):
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            self._notify()
+
+    def _notify(self):
+        """
+        Wakes the waiting sync callers and, if it is async, the caller now at the head of the
+        queue; only the head can be granted, so the rest of the async callers stay parked.
+        """
+        self._condition.notify_all()
+        if self._waiting and self._waiting[0] in self._async_waiters:
+            loop, woken = self._async_waiters[self._waiting[0]]
+            loop.call_soon_threadsafe(_wake, woken)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed_minutes = (now - self._refilled_at) / 60
+        self._refilled_at = now
+        self._request_budget = min(self.request_capacity, self._request_budget + elapsed_minutes * self.requests_per_minute)
+        self._token_budget = min(self.token_capacity, self._token_budget + elapsed_minutes * self.tokens_per_minute)
+
+    def _trim_usage(self, now: float):
+        while self._usage and now - self._usage[0][0] > 60:
+            self._usage.popleft()
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
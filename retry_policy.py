@@ -0,0 +1,330 @@
+import os
+import time
+import asyncio
+import random
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from dotenv import load_dotenv
+
+import requests
+
+# Optional exception types from the other client libraries.
+try:
+    import httpx
+except ImportError:
+    httpx = None
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:
+    google_exceptions = None
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# HTTP statuses worth retrying. Only 429 and 503 mean the request was not processed,
+# so those are the only statuses retried for non-idempotent calls.
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+UNPROCESSED_STATUSES = {429, 503}
+
+# Network errors where the request may or may not have reached the server, including a
+# connection dropped while a streamed body was being read.
+_TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                     requests.exceptions.ChunkedEncodingError)
+# Network errors where the request certainly never reached the server.
+_CONNECT_ERRORS = (requests.exceptions.ConnectTimeout,)
+if httpx:
+    _TRANSIENT_ERRORS += (httpx.TransportError,)
+    _CONNECT_ERRORS += (httpx.ConnectError, httpx.ConnectTimeout)
+if google_exceptions:
+    _TRANSIENT_ERRORS += (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream API whose circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and rejects calls for
+    `reset_seconds`. After that one trial call is let through (half-open): success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent calls (plus a small floor), so a burst of failures
+    produces at most `ratio` extra load on the upstream API instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float, min_retries_per_window: int, window_seconds: float = 10.0):
+        self.ratio = ratio
+        self.min_retries_per_window = min_retries_per_window
+        self.window_seconds = window_seconds
+        self._calls = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self._calls.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            for events in (self._calls, self._retries):
+                while events and now - events[0] > self.window_seconds:
+                    events.popleft()
+            allowed = max(self.min_retries_per_window, int(len(self._calls) * self.ratio))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryPolicy:
+    """
+    Retries one upstream endpoint's transient failures with jittered exponential backoff,
+    honouring Retry-After, within that endpoint's retry budget and circuit breaker.
+    """
+
+    def __init__(self, name: str, max_attempts: int, base_delay: float, max_delay: float,
+                 budget: RetryBudget, breaker: CircuitBreaker):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.breaker = breaker
+
+    def call(self, fn, idempotent: bool = True):
+        """
+        Calls `fn()` until it succeeds, fails permanently or retries run out.
+
+        `fn` may return an HTTP response (requests or httpx); a retryable status code is
+        retried and, once retries run out, the last response is returned for the caller
+        to handle. Exceptions are retried if transient and re-raised otherwise.
+        Non-idempotent calls are only retried when the request was certainly not processed.
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit breaker is open.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self._start_attempt()
+            try:
+                result = fn()
+            except Exception as e:
+                time.sleep(self._delay_after_error(attempt, e, idempotent))
+                continue
+            delay = self._delay_after_result(attempt, result, idempotent)
+            if delay is None:
+                return result
+            _discard(result)
+            time.sleep(delay)
+
+    async def call_async(self, fn, idempotent: bool = True):
+        """
+        The asyncio counterpart of call(): `fn()` returns an awaitable, and backoff
+        waits with asyncio.sleep so the event loop keeps serving other work.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self._start_attempt()
+            try:
+                result = await fn()
+            except Exception as e:
+                await asyncio.sleep(self._delay_after_error(attempt, e, idempotent))
+                continue
+            delay = self._delay_after_result(attempt, result, idempotent)
+            if delay is None:
+                return result
+            await _discard_async(result)
+            await asyncio.sleep(delay)
+
+    def _start_attempt(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for '{self.name}' is open; not calling upstream.")
+        self.budget.record_call()
+
+    def _delay_after_error(self, attempt: int, error: Exception, idempotent: bool) -> float:
+        """
+        Returns how long to wait before retrying after `fn` raised, or re-raises the error.
+        """
+        if not isinstance(error, _TRANSIENT_ERRORS):
+            # The upstream answered; the request itself was rejected.
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        if not self._is_retryable_error(error, idempotent) or not self._should_retry(attempt):
+            raise error
+        delay = self._backoff(attempt, _retry_after_from_error(error))
+        logging.warning(f"RETRY: '{self.name}' attempt {attempt} failed ({error}). Retrying in {delay:.2f}s.")
+        return delay
+
+    def _delay_after_result(self, attempt: int, result, idempotent: bool) -> float | None:
+        """
+        Returns how long to wait before retrying a retryable HTTP status, or None to return the result.
+        """
+        status = getattr(result, "status_code", None)
+        retryable = status in (RETRYABLE_STATUSES if idempotent else UNPROCESSED_STATUSES)
+        if not retryable:
+            if status is not None and status >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return None
+
+        self.breaker.record_failure()
+        if not self._should_retry(attempt):
+            return None
+        delay = self._backoff(attempt, _retry_after_seconds(getattr(result, "headers", None)))
+        logging.warning(f"RETRY: '{self.name}' attempt {attempt} got HTTP {status}. Retrying in {delay:.2f}s.")
+        return delay
+
+    def _should_retry(self, attempt: int) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        if not self.budget.try_spend():
+            logging.warning(f"RETRY: Retry budget for '{self.name}' exhausted. Not retrying.")
+            return False
+        return True
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        # Full jitter: a random delay up to the exponential cap spreads out synchronized retries.
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    @staticmethod
+    def _is_retryable_error(error: Exception, idempotent: bool) -> bool:
+        return idempotent or isinstance(error, _CONNECT_ERRORS)
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def for_endpoint(name: str) -> RetryPolicy:
+    """
+    Returns the shared RetryPolicy for an endpoint (e.g. 'asana POST /tasks', 'gemini generate'),
+    creating it on first use. Every endpoint gets its own budget and circuit breaker; the
+    settings come from RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS,
+    RETRY_BUDGET_RATIO, CIRCUIT_FAILURE_THRESHOLD and CIRCUIT_RESET_SECONDS.
+    """
+    with _policies_lock:
+        policy = _policies.get(name)
+        if policy is None:
+            policy = RetryPolicy(
+                name,
+                max_attempts=int(os.environ.get("RETRY_MAX_ATTEMPTS", 4)),
+                base_delay=float(os.environ.get("RETRY_BASE_DELAY_SECONDS", 0.5)),
+                max_delay=float(os.environ.get("RETRY_MAX_DELAY_SECONDS", 30)),
+                budget=RetryBudget(ratio=float(os.environ.get("RETRY_BUDGET_RATIO", 0.2)), min_retries_per_window=3),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5)),
+                    reset_seconds=float(os.environ.get("CIRCUIT_RESET_SECONDS", 30)),
+                ),
+            )
+            _policies[name] = policy
+        return policy
+
+
+def _retry_after_seconds(headers) -> float | None:
+    """
+    Parses a Retry-After header given either as seconds or as an HTTP date.
+    """
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after_from_error(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    return _retry_after_seconds(getattr(response, "headers", None))
+
+
+def _discard(response):
+    """
+    Closes a response that is being retried. A streamed body left unread would otherwise
+    keep holding its pooled connection, and with a blocking pool enough of them stall
+    every later request.
+    """
+    close = getattr(response, "close", None)
+    if close:
+        close()
+
+
+async def _discard_async(response):
+    """
+    The asyncio counterpart of _discard(), for httpx.AsyncClient responses.
+    """
+    aclose = getattr(response, "aclose", None)
+    if aclose:
+        await aclose()
+    else:
+        _discard(response)
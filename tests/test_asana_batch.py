@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from asana_client import MAX_BATCH_ACTIONS, AsanaBatch
+
+
+class _FakeUserDirectory:
+    def resolve(self, owner_name):
+        return {"Ann": "u1"}.get(owner_name)
+
+
+class _FakeAsanaClient:
+    """
+    Answers each action with its own path, failing the actions whose path ends in "/fail".
+    Later chunks answer first, so results only line up if they are mapped by position.
+    """
+
+    def __init__(self):
+        self.user_directory = _FakeUserDirectory()
+        self.chunks = []
+        self._lock = threading.Lock()
+
+    def _respond(self, actions):
+        with self._lock:
+            self.chunks.append(actions)
+        return [
+            {"status_code": 400, "body": {"errors": [{"message": "Bad parent"}]}} if action["relative_path"].endswith("/fail")
+            else {"status_code": 201, "body": {"data": {"path": action["relative_path"], **action.get("data", {})}}}
+            for action in actions
+        ]
+
+    def execute_batch(self, actions):
+        time.sleep(0.01 * (3 - len(self.chunks)))
+        return self._respond(actions)
+
+    async def execute_batch_async(self, actions):
+        await asyncio.sleep(0.01 * (3 - len(self.chunks)))
+        return self._respond(actions)
+
+
+def _execute(batch, use_async, max_workers):
+    if use_async:
+        return asyncio.run(batch.execute_async(max_workers=max_workers))
+    return batch.execute(max_workers=max_workers)
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_actions_are_chunked_and_results_map_back_to_their_actions(use_async, max_workers):
+    client = _FakeAsanaClient()
+    batch = AsanaBatch(client)
+    results = [batch.add("put", f"/tasks/{i}", {"completed": True}) for i in range(2 * MAX_BATCH_ACTIONS + 3)]
+
+    assert _execute(batch, use_async, max_workers) == results
+    assert sorted(len(chunk) for chunk in client.chunks) == [3, MAX_BATCH_ACTIONS, MAX_BATCH_ACTIONS]
+    for i, result in enumerate(results):
+        assert result.ok and result.status_code == 201
+        assert result.data == {"path": f"/tasks/{i}", "completed": True}
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_a_failed_action_only_fails_its_own_result(use_async):
+    batch = AsanaBatch(_FakeAsanaClient())
+    comment = batch.add_comment("t1", "<strong>Brief</strong>")
+    failed = batch.add("post", "/tasks/fail")
+    subtask = batch.add_subtask("t1", "Send the budget", due_on="2026-01-09", owner_name="Ann")
+
+    _execute(batch, use_async, max_workers=1)
+
+    assert comment.ok and comment.data == {"path": "/tasks/t1/stories", "html_text": "<body><strong>Brief</strong></body>"}
+    assert not failed.ok and failed.error == "HTTP 400: Bad parent" and failed.data is None
+    assert subtask.ok and subtask.data == {
+        "path": "/tasks", "name": "Send the budget", "parent": "t1", "due_on": "2026-01-09", "assignee": "u1",
+    }
+
+
+def test_results_are_failed_until_the_batch_runs():
+    batch = AsanaBatch(_FakeAsanaClient())
+    result = batch.add("put", "/tasks/1")
+
+    assert len(batch) == 1 and not result.ok
+    assert batch.execute() == [result] and result.ok
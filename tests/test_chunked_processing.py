@@ -0,0 +1,76 @@
+import pytest
+
+import ai_processor
+
+
+def _turns(count: int) -> list[str]:
+    return [f"Speaker {i % 3}: line number {i} of the meeting" for i in range(count)]
+
+
+@pytest.mark.parametrize("max_chars", [60, 200, 1000])
+def test_chunks_break_between_turns_and_cover_the_transcript(max_chars):
+    turns = _turns(40)
+    chunks = ai_processor.split_transcript("\n".join(turns), max_chars)
+
+    assert all(len(chunk) <= max_chars for chunk in chunks)
+    assert [turn for chunk in chunks for turn in chunk.split("\n")] == turns
+
+
+def test_a_turn_longer_than_the_chunk_size_is_its_own_chunk():
+    long_turn = "Ann: " + "word " * 50
+    chunks = ai_processor.split_transcript(f"Bo: hi\n{long_turn}\nCy: bye", 40)
+
+    assert chunks == ["Bo: hi", long_turn, "Cy: bye"]
+
+
+def test_short_transcript_is_a_single_chunk():
+    assert ai_processor.split_transcript("Ann: hi\nBo: hello", 1000, overlap_turns=3) == ["Ann: hi\nBo: hello"]
+
+
+def test_each_chunk_repeats_the_end_of_the_previous_one():
+    turns = _turns(30)
+    chunks = ai_processor.split_transcript("\n".join(turns), 400, overlap_turns=2)
+
+    assert len(chunks) > 1
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split("\n")[:2] == previous.split("\n")[-2:]
+
+
+def test_overlap_is_capped_so_chunks_still_advance():
+    turns = _turns(30)
+    chunks = ai_processor.split_transcript("\n".join(turns), 200, overlap_turns=50)
+
+    for previous, chunk in zip(chunks, chunks[1:]):
+        repeated = [turn for turn in chunk.split("\n") if turn in previous.split("\n")]
+        assert sum(len(turn) + 1 for turn in repeated) <= 200 // 4
+        assert chunk.split("\n")[-1] not in previous.split("\n")
+    assert chunks[-1].split("\n")[-1] == turns[-1]
+
+
+def test_merge_takes_the_most_common_known_client_and_dedupes_items():
+    merged = ai_processor.merge_structured_data([
+        {"client_name": "Acme", "key_decisions": ["Ship on Friday."], "action_items": [
+            {"task": "Send the budget", "owner": "N/A", "due_date": "N/A"}], "unanswered_questions": []},
+        {"client_name": "Unknown", "key_decisions": ["Ship on Friday"], "action_items": [
+            {"task": "Send the budget.", "owner": "Ann", "due_date": "2026-01-09"}], "unanswered_questions": ["Who hosts?"]},
+        {"client_name": "Acme", "key_decisions": ["Hire a designer"], "action_items": [], "unanswered_questions": []},
+    ])
+
+    assert merged["client_name"] == "Acme"
+    assert merged["key_decisions"] == ["Ship on Friday.", "Hire a designer"]
+    assert merged["action_items"] == [{"task": "Send the budget", "owner": "Ann", "due_date": "2026-01-09"}]
+    assert merged["unanswered_questions"] == ["Who hosts?"]
+    assert merged["empty_data"] is False
+
+
+def test_merge_of_empty_chunks_is_flagged_empty():
+    merged = ai_processor.merge_structured_data([{"client_name": "N/A"}, {"client_name": "Unknown", "action_items": []}])
+
+    assert merged["client_name"] == "Unknown"
+    assert merged["empty_data"] is True
+
+
+def test_merge_carries_a_failed_chunk_error():
+    merged = ai_processor.merge_structured_data([{"client_name": "Acme"}, {"error": "timed out"}])
+
+    assert merged == {"empty_data": True, "error": "1 of 2 chunk(s) failed: timed out"}
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+from fireflies_batcher import CoalescingFirefliesClient
+
+
+class _FakeClient:
+    def __init__(self, bulk_fails: bool = False, bad_ids=()):
+        self.bulk_fails = bulk_fails
+        self.bad_ids = set(bad_ids)
+        self.single_fetches = []
+
+    def _result(self, meeting_id):
+        if meeting_id in self.bad_ids:
+            raise RuntimeError(f"cannot fetch {meeting_id}")
+        return {"title": meeting_id}
+
+    def get_transcripts_bulk(self, meeting_ids):
+        if self.bulk_fails:
+            raise RuntimeError("HTTP 502")
+        # Like the real client, a meeting that fails inside the query comes back as None.
+        return {meeting_id: None if meeting_id in self.bad_ids else self._result(meeting_id) for meeting_id in meeting_ids}
+
+    def get_transcript_and_title(self, meeting_id):
+        self.single_fetches.append(meeting_id)
+        return self._result(meeting_id)
+
+    async def get_transcripts_bulk_async(self, meeting_ids):
+        return self.get_transcripts_bulk(meeting_ids)
+
+    async def get_transcript_and_title_async(self, meeting_id):
+        return self.get_transcript_and_title(meeting_id)
+
+
+def _fetch_concurrently(client, meeting_ids):
+    results = {}
+
+    def fetch(meeting_id):
+        try:
+            results[meeting_id] = client.get_transcript_and_title(meeting_id)
+        except Exception as e:
+            results[meeting_id] = e
+
+    threads = [threading.Thread(target=fetch, args=(meeting_id,)) for meeting_id in meeting_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_failed_bulk_fetch_falls_back_to_single_fetches():
+    inner = _FakeClient(bulk_fails=True)
+    results = _fetch_concurrently(CoalescingFirefliesClient(inner, window_seconds=0.05, max_batch=3), ["a", "b", "c"])
+    assert results == {"a": {"title": "a"}, "b": {"title": "b"}, "c": {"title": "c"}}
+    assert sorted(inner.single_fetches) == ["a", "b", "c"]
+
+
+def test_one_bad_meeting_does_not_fail_the_rest_of_its_batch():
+    inner = _FakeClient(bad_ids={"b"})
+    results = _fetch_concurrently(CoalescingFirefliesClient(inner, window_seconds=0.05, max_batch=3), ["a", "b", "c"])
+    assert results["a"] == {"title": "a"} and results["c"] == {"title": "c"}
+    assert isinstance(results["b"], RuntimeError)
+    assert inner.single_fetches == ["b"]
+
+
+def test_one_bad_meeting_does_not_fail_the_rest_of_its_batch_async():
+    inner = _FakeClient(bad_ids={"b"})
+    client = CoalescingFirefliesClient(inner, window_seconds=0.05, max_batch=3)
+
+    async def fetch_all():
+        return await asyncio.gather(*(client.get_transcript_and_title_async(meeting_id) for meeting_id in "abc"),
+                                    return_exceptions=True)
+
+    a, b, c = asyncio.run(fetch_all())
+    assert a == {"title": "a"} and c == {"title": "c"}
+    assert isinstance(b, RuntimeError)
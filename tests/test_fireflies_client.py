@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fireflies_client
+import retry_policy
+from rate_limiter import RateLimiter
+from retry_policy import CircuitBreaker, RetryBudget, RetryPolicy
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, body: dict):
+        self._content = json.dumps(body).encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self._content)
+
+    def iter_content(self, size):
+        for start in range(0, len(self._content), 7):
+            yield self._content[start:start + 7]
+
+
+@pytest.fixture(params=[False, True], ids=["buffered", "streamed"])
+def stream_json(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(fireflies_client, "STREAM_JSON", request.param)
+    return request.param
+
+
+def test_parses_aliased_transcripts(stream_json):
+    body = {"data": {
+        "t0": {"title": "Kickoff", "organizer_email": "a@x.com", "participants": ["b@y.com"],
+               "sentences": [{"speaker_name": "Ann", "text": "Hello"}, {"speaker_name": "Bo", "text": "Hi"}]},
+        "t1": None,
+    }}
+    results = fireflies_client._parse_transcript_response(_FakeResponse(body), {"t0": "m0", "t1": "m1"})
+
+    assert results["m1"] is None
+    assert results["m0"]["title"] == "Kickoff"
+    assert results["m0"]["participants"] == ["b@y.com", "a@x.com"]
+    assert results["m0"]["transcript"].render() == "Ann: Hello\nBo: Hi"
+
+
+def test_graphql_errors_are_reported_for_the_affected_meetings(stream_json, caplog):
+    body = {"data": None, "errors": [{"message": "Invalid API key", "extensions": {"code": "UNAUTHENTICATED"}}]}
+    with caplog.at_level(logging.ERROR):
+        results = fireflies_client._parse_transcript_response(_FakeResponse(body), {"transcript": "m0"})
+
+    assert results == {"m0": None}
+    assert "Could not fetch meeting ID m0: Invalid API key" in caplog.text
+
+
+def test_graphql_errors_with_a_path_only_apply_to_that_alias(stream_json, caplog):
+    body = {"data": {"t0": None, "t1": {"title": "Ok", "sentences": [{"speaker_name": "Ann", "text": "Hi"}]}},
+            "errors": [{"message": "Transcript not found", "path": ["t0"]}]}
+    with caplog.at_level(logging.ERROR):
+        results = fireflies_client._parse_transcript_response(_FakeResponse(body), {"t0": "m0", "t1": "m1"})
+
+    assert results["m0"] is None
+    assert results["m1"]["title"] == "Ok"
+    assert "meeting ID m0: Transcript not found" in caplog.text
+    assert "meeting ID m1" not in caplog.text
+
+
+class _DroppingHandler(BaseHTTPRequestHandler):
+    """
+    Cuts the first response off half way through its body, then answers normally.
+    """
+    protocol_version = "HTTP/1.1"
+    requests_seen = 0
+    body = json.dumps({"data": {"transcript": {
+        "title": "Long meeting", "sentences": [{"speaker_name": "Ann", "text": "word " * 50}] * 200,
+    }}}).encode("utf-8")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).requests_seen += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        if self.requests_seen == 1:
+            self.wfile.write(self.body[:len(self.body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def dropping_server(monkeypatch):
+    _DroppingHandler.requests_seen = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DroppingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("FIREFLIES_API_KEY", "test-key")
+    monkeypatch.delenv("FIREFLIES_HTTP2", raising=False)
+    monkeypatch.setattr(fireflies_client.FirefliesClient, "API_URL", f"http://127.0.0.1:{server.server_address[1]}/graphql")
+    policy = RetryPolicy("test", max_attempts=3, base_delay=0.01, max_delay=0.01,
+                         budget=RetryBudget(ratio=1.0, min_retries_per_window=10),
+                         breaker=CircuitBreaker(failure_threshold=100, reset_seconds=1))
+    monkeypatch.setattr(retry_policy, "for_endpoint", lambda name: policy)
+    monkeypatch.setattr(fireflies_client, "fireflies_limiter", RateLimiter("test", 10**6, 10**6, max_concurrent=100))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_a_body_cut_off_mid_read_is_retried(stream_json, dropping_server):
+    result = fireflies_client.FirefliesClient(worker_count=1).get_transcript_and_title("m1")
+
+    assert _DroppingHandler.requests_seen == 2
+    assert result["title"] == "Long meeting" and result["transcript"].sentence_count == 200
+
+
+def test_a_body_cut_off_mid_read_is_retried_async(stream_json, dropping_server):
+    pytest.importorskip("httpx")
+
+    async def fetch():
+        client = fireflies_client.AsyncFirefliesClient(worker_count=1)
+        try:
+            return await client.get_transcript_and_title_async("m1")
+        finally:
+            await client.aclose()
+
+    result = asyncio.run(fetch())
+    assert _DroppingHandler.requests_seen == 2
+    assert result["title"] == "Long meeting"
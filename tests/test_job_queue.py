@@ -0,0 +1,79 @@
+import threading
+import time
+
+from job_queue import AsyncJobQueue, JobQueue
+from job_store import JobStore
+
+
+def test_concurrent_redeliveries_requeue_a_failed_job_once(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_queue = JobQueue(lambda job, save_stage: {}, store, num_workers=1)  # Not started: jobs stay queued.
+    job, _ = job_queue.submit_once("m1", "meeting.completed")
+    job_queue._queue.get_nowait()
+    store.set_status(job["job_id"], "failed", error="boom")
+
+    barrier = threading.Barrier(8)
+    duplicates = []
+
+    def redeliver():
+        barrier.wait()
+        duplicates.append(job_queue.submit_once("m1", "meeting.completed")[1])
+
+    threads = [threading.Thread(target=redeliver) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(duplicates) == [False] + [True] * 7
+    assert job_queue._queue.qsize() == 1
+    assert store.get_job(job["job_id"])["status"] == "queued" and store.get_job(job["job_id"])["error"] is None
+
+
+def test_only_failed_jobs_are_requeued(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.find_or_create_job("m1", "meeting.completed", ttl_seconds=None)
+
+    assert not store.requeue_failed(job["job_id"])
+    store.set_status(job["job_id"], "failed", error="boom")
+    assert store.requeue_failed(job["job_id"])
+    assert not store.requeue_failed(job["job_id"])
+
+
+class _ThreadRecordingStore(JobStore):
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.threads = set()
+
+    def get_job(self, job_id):
+        self.threads.add(threading.current_thread().name)
+        return super().get_job(job_id)
+
+    def set_status(self, *args, **kwargs):
+        self.threads.add(threading.current_thread().name)
+        super().set_status(*args, **kwargs)
+
+    def save_stage(self, *args, **kwargs):
+        self.threads.add(threading.current_thread().name)
+        super().save_stage(*args, **kwargs)
+
+
+def test_async_queue_keeps_store_calls_off_the_event_loop(tmp_path):
+    store = _ThreadRecordingStore(str(tmp_path / "jobs.db"))
+
+    async def handler(job, save_stage):
+        save_stage("fetched", transcript="Ann: Hi")
+        save_stage(None, subtasks_created=[0])
+        return {"asana_task_gid": "t1"}
+
+    job_queue = AsyncJobQueue(handler, store, max_concurrent=2)
+    job_queue.start(resume_unfinished=False)
+    job, _ = job_queue.submit_once("m1", "meeting.completed")
+    deadline = time.monotonic() + 5
+    while not job_queue.idle() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    finished = store.get_job(job["job_id"])
+    assert finished["status"] == "succeeded" and finished["result"] == {"asana_task_gid": "t1"}
+    assert finished["artifacts"]["subtasks_created"] == [0]
+    assert "job-event-loop" not in store.threads
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+from job_store import JobStore
+
+
+def _age_jobs(store: JobStore, days: int):
+    old = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    with store._conn:
+        store._conn.execute("UPDATE jobs SET created_at = ?", (old,))
+
+
+def test_dedup_ttl_expires_old_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first, created = store.find_or_create_job("m1", "meeting.completed", ttl_seconds=3600)
+    assert created
+    _age_jobs(store, days=30)
+
+    second, created = store.find_or_create_job("m1", "meeting.completed", ttl_seconds=3600)
+    assert created and second["job_id"] != first["job_id"]
+
+
+def test_no_ttl_matches_every_earlier_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first, _ = store.find_or_create_job("m1", "meeting.completed", ttl_seconds=3600)
+    _age_jobs(store, days=365)
+
+    again, created = store.find_or_create_job("m1", "meeting.completed", ttl_seconds=None)
+    assert not created and again["job_id"] == first["job_id"]
+
+
+def test_checkpoints_are_stored_per_artifact_and_stage(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.find_or_create_job("m1", "meeting.completed", ttl_seconds=None)
+    store.save_stage(job["job_id"], "fetched", {"transcript": {"text": "x" * 1000}, "title": "Kickoff"})
+    store.save_stage(job["job_id"], None, {"subtasks_created": [0]})
+    store.save_stage(job["job_id"], None, {"subtasks_created": [0, 1]})
+    store.save_stage(job["job_id"], "cleaned", {})
+
+    saved = store.get_job(job["job_id"])
+    assert saved["stage"] == "cleaned"
+    assert saved["artifacts"] == {"transcript": {"text": "x" * 1000}, "title": "Kickoff",
+                                  "subtasks_created": [0, 1], "completed_stages": ["fetched", "cleaned"]}
+    rows = store._conn.execute("SELECT COUNT(*) FROM job_artifacts").fetchone()[0]
+    assert rows == 3
+
+
+def test_artifacts_of_older_job_stores_are_still_read(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.find_or_create_job("m1", "meeting.completed", ttl_seconds=None)
+    with store._conn:
+        store._conn.execute("UPDATE jobs SET artifacts = ? WHERE job_id = ?",
+                            ('{"title": "Old", "completed_stages": ["fetched"]}', job["job_id"]))
+    store.save_stage(job["job_id"], "cleaned", {"cleaned_transcript": "Ann: Hi"})
+
+    artifacts = store.get_job(job["job_id"])["artifacts"]
+    assert artifacts == {"title": "Old", "cleaned_transcript": "Ann: Hi", "completed_stages": ["fetched", "cleaned"]}
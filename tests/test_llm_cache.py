@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_ai_processor_does_not_open_the_cache(tmp_path):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, LLM_CACHE_ENABLED="true")
+    env.pop("LLM_CACHE_PATH", None)
+    subprocess.run([sys.executable, "-c", "import ai_processor"], cwd=tmp_path, env=env, check=True)
+    assert not (tmp_path / "llm_cache.db").exists()
+
+
+def test_cache_is_opened_on_first_use(tmp_path, monkeypatch):
+    import ai_processor
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "true")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(ai_processor, "_response_cache", None)
+    monkeypatch.setattr(ai_processor, "_response_cache_opened", False)
+
+    cache = ai_processor.get_response_cache()
+    assert cache is not None and ai_processor.get_response_cache() is cache
+    assert (tmp_path / "llm_cache.db").exists()
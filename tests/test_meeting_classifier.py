@@ -0,0 +1,47 @@
+from meeting_classifier import MeetingClassifier
+
+
+def _classifier(internal_domains):
+    return MeetingClassifier(internal_domains=internal_domains, known_clients=["Acme"])
+
+
+def test_meeting_with_participants_is_inconclusive_without_internal_domains():
+    classifier = _classifier([])
+    assert classifier.classify_locally("Stand-up: Acme follow-ups", ["ann@ourco.com", "bo@ourco.com"], "") is None
+
+
+def test_internal_participants_make_an_internal_meeting():
+    classifier = _classifier(["ourco.com"])
+    result = classifier.classify_locally("Stand-up: Acme follow-ups", ["ann@ourco.com", "bo@ourco.com"], "")
+    assert result == {"meeting_type": "internal", "client_name": "N/A"}
+
+
+def test_external_participants_and_a_named_client_make_an_external_meeting():
+    classifier = _classifier(["ourco.com"])
+    result = classifier.classify_locally("Weekly sync", ["ann@ourco.com", "cy@acme.com"], "")
+    assert result == {"meeting_type": "external", "client_name": "Acme"}
+
+
+class _FakeProjectIndex:
+    def __init__(self, projects):
+        self.projects = projects
+
+    def get_index(self):
+        return self.projects
+
+    def project_names(self):
+        return list(self.projects.items())
+
+
+def _indexed_classifier():
+    index = _FakeProjectIndex({"Marketing": "p1", "Website": "p2", "Acme - Website Rebuild": "p3"})
+    return MeetingClassifier(project_index=index, internal_domains=["ourco.com"], known_clients=[])
+
+
+def test_projects_without_a_client_separator_are_not_clients():
+    assert _indexed_classifier().classify_locally("Marketing sync", [], "") is None
+
+
+def test_a_client_named_project_identifies_the_client_and_project():
+    result = _indexed_classifier().classify_locally("Acme kickoff", [], "")
+    assert result == {"meeting_type": "external", "client_name": "Acme", "project_gid": "p3"}
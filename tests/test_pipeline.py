@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+import ai_processor
+import pipeline
+from transcript_model import Transcript
+
+TRANSCRIPT = Transcript.from_sentences([
+    {"speaker_name": "Ann", "text": "Bo owns the release notes"},
+    {"speaker_name": "Bo", "text": "Got it"},
+])
+
+
+class _Result:
+    def __init__(self, ok=True, error=None):
+        self.ok, self.error = ok, error
+
+
+class _FakeBatch:
+    def __init__(self, client):
+        self.client, self.actions = client, []
+
+    def __len__(self):
+        return len(self.actions)
+
+    def add_comment(self, task_gid, text):
+        self.actions.append(("comment", text))
+        return _Result()
+
+    def add_subtask(self, parent_gid, name, due_on=None, owner_name=None):
+        self.actions.append(("subtask", name))
+        return _Result(ok=name != "Broken", error="rejected")
+
+    def execute(self, max_workers=1):
+        self.client.executed.extend(self.actions)
+
+    async def execute_async(self, max_workers=1):
+        self.execute(max_workers)
+
+
+class _FakeUserDirectory:
+    def get_index(self):
+        return None
+
+
+class _FakeClients:
+    """
+    Stands in for the Fireflies and Asana clients of both runtimes.
+    """
+
+    def __init__(self, attach_failures=0):
+        self.calls, self.executed = [], []
+        self.attach_failures = attach_failures
+        self.user_directory = _FakeUserDirectory()
+
+    def get_transcript_and_title(self, meeting_id):
+        self.calls.append("fetch")
+        return {"transcript": TRANSCRIPT, "title": "Kickoff", "participants": []}
+
+    async def get_transcript_and_title_async(self, meeting_id):
+        return self.get_transcript_and_title(meeting_id)
+
+    def create_task(self, project_gid, task_name):
+        self.calls.append(("create", project_gid, task_name))
+        return "task-1"
+
+    async def create_task_async(self, project_gid, task_name):
+        return self.create_task(project_gid, task_name)
+
+    def attach_transcript(self, task_gid, transcript_content):
+        self.calls.append(("attach", task_gid, transcript_content))
+        if self.attach_failures:
+            self.attach_failures -= 1
+            return False
+        return True
+
+    async def attach_transcript_async(self, task_gid, transcript_content):
+        return self.attach_transcript(task_gid, transcript_content)
+
+    def batch(self):
+        return _FakeBatch(self)
+
+
+@pytest.fixture(autouse=True)
+def fake_ai(monkeypatch):
+    structured = {"client_name": "Acme", "action_items": [{"task": "Write notes"}, {"task": "Broken"}]}
+
+    async def extract_async(text, fused=False):
+        return structured
+
+    monkeypatch.setattr(pipeline, "TRANSCRIPT_CLEANER", "local")
+    monkeypatch.setattr(pipeline, "AI_PIPELINE_MODE", "separate")
+    monkeypatch.setattr(ai_processor, "extract_structured_data", lambda text, fused=False: structured)
+    monkeypatch.setattr(ai_processor, "extract_structured_data_async", extract_async)
+    monkeypatch.setattr(ai_processor, "write_project_brief", lambda data: "brief")
+
+
+def _run(runtime, clients, artifacts=None, store=None):
+    saved = []
+
+    def save_stage(stage, **artifacts):
+        saved.append(stage)
+        if store is not None:
+            store.update(artifacts)
+            if stage:
+                store.setdefault("completed_stages", []).append(stage)
+
+    if runtime == "async":
+        result = asyncio.run(pipeline.run_meeting_pipeline_async("m1", clients, clients, "p1", artifacts, save_stage))
+    else:
+        result = pipeline.run_meeting_pipeline("m1", clients, clients, "p1", artifacts, save_stage)
+    return result, saved
+
+
+@pytest.mark.parametrize("runtime", ["threads", "async"])
+def test_both_runtimes_run_the_same_stages(runtime):
+    clients = _FakeClients()
+    result, saved = _run(runtime, clients)
+
+    assert result == {"asana_task_gid": "task-1", "comment_error": None, "subtasks_created": 1,
+                      "subtask_failures": [{"index": 1, "task": "Broken", "error": "rejected"}]}
+    assert clients.calls[1:] == [("create", "p1", "Meeting Summary: Kickoff"), ("attach", "task-1", TRANSCRIPT.render())]
+    assert clients.executed == [("comment", "brief"), ("subtask", "Write notes"), ("subtask", "Broken")]
+    assert set(saved) == {"fetched", "task_created", "cleaned", "extracted", "commented", None, "subtasks_done"}
+    assert saved[0] == "fetched" and saved[-1] == "subtasks_done"
+
+
+@pytest.mark.parametrize("runtime", ["threads", "async"])
+def test_both_runtimes_resume_after_completed_stages(runtime):
+    clients = _FakeClients()
+    artifacts = {
+        "completed_stages": ["fetched", "task_created", "cleaned", "extracted", "commented"],
+        "transcript": TRANSCRIPT.to_dict(), "asana_task_gid": "task-1", "subtasks_created": [0],
+        "structured_data": {"client_name": "Acme", "action_items": [{"task": "Write notes"}, {"task": "Later"}]},
+    }
+    result, saved = _run(runtime, clients, artifacts)
+
+    assert clients.calls == []
+    assert clients.executed == [("subtask", "Later")]
+    assert result["subtasks_created"] == 2
+    assert saved == [None, "subtasks_done"]
+
+
+@pytest.mark.parametrize("runtime", ["threads", "async"])
+def test_a_failed_attachment_is_retried_on_the_same_task(runtime):
+    clients = _FakeClients(attach_failures=1)
+    store = {}
+    with pytest.raises(pipeline.PipelineError, match="attach the transcript"):
+        _run(runtime, clients, store=store)
+    assert store["asana_task_gid"] == "task-1"
+
+    clients.calls.clear()
+    result, _ = _run(runtime, clients, artifacts=store)
+
+    assert result["asana_task_gid"] == "task-1"
+    assert [call[0] for call in clients.calls] == ["attach"]
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from project_router import ProjectRouter
+
+
+class _FakeAsanaClient:
+    project_index = None
+
+
+@pytest.fixture
+def stuck_router(monkeypatch):
+    monkeypatch.setenv("ASANA_ROUTING_WORKERS", "2")
+    router = ProjectRouter(_FakeAsanaClient(), "default", timeout_seconds=0.01)
+    release = threading.Event()
+    calls = []
+
+    def resolve(title, participants, transcript):
+        calls.append(title)
+        release.wait(5)  # A cold project index that is still being crawled
+        return "client-project"
+
+    monkeypatch.setattr(router, "_resolve", resolve)
+    yield router, release, calls
+    release.set()
+
+
+def test_abandoned_resolves_do_not_pile_up_behind_a_cold_index(stuck_router):
+    router, release, calls = stuck_router
+
+    routed = [router.route(f"Meeting {i}", None, "") for i in range(10)]
+
+    assert routed == ["default"] * 10
+    assert len(calls) == 2  # One per worker; the rest were never queued.
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while router._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    router.timeout_seconds = 1
+    assert router.route("After warm-up", None, "") == "client-project"
+
+
+def test_async_routing_shares_the_bound(stuck_router):
+    router, release, calls = stuck_router
+
+    async def route_all():
+        return await asyncio.gather(*(router.route_async(f"Meeting {i}", None, "") for i in range(10)))
+
+    assert asyncio.run(route_all()) == ["default"] * 10
+    assert len(calls) == 2
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter
+
+
+class _FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeTime()
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    return fake
+
+
+def _take(limiter, clock, tokens=0):
+    """
+    Takes a permit as the only waiter, advancing the fake clock through any wait.
+    Returns the seconds waited.
+    """
+    ticket = object()
+    waited = 0.0
+    with limiter._condition:
+        limiter._waiting.append(ticket)
+        while (delay := limiter._try_grant(ticket, tokens)) != 0:
+            assert delay is not None
+            clock.now += max(delay, 1e-6)  # Rounding can leave a sliver of a wait.
+            waited += delay
+        grant = limiter._grant(tokens, clock.now)
+    limiter.release(grant)
+    return waited
+
+
+def test_burst_is_capped_at_a_few_seconds_of_quota(clock):
+    limiter = RateLimiter("test", requests_per_minute=600, tokens_per_minute=10**9, max_concurrent=100, burst_seconds=5)
+
+    assert sum(_take(limiter, clock) for _ in range(50)) == 0
+    assert _take(limiter, clock) == pytest.approx(0.1)
+
+
+def test_a_rolling_minute_stays_near_the_quota(clock):
+    limiter = RateLimiter("test", requests_per_minute=600, tokens_per_minute=10**9, max_concurrent=100, burst_seconds=5)
+    started_at = clock.now
+    granted = 0
+    while clock.now - started_at < 60:
+        _take(limiter, clock)
+        granted += 1
+
+    assert granted <= 600 + 50
+
+
+def test_a_call_larger_than_the_bucket_waits_for_a_full_bucket_then_repays(clock):
+    limiter = RateLimiter("test", requests_per_minute=10**6, tokens_per_minute=60000, max_concurrent=100, burst_seconds=5)
+
+    assert _take(limiter, clock, tokens=10000) == 0  # Bucket holds 5000; the excess is owed.
+    assert _take(limiter, clock, tokens=1) == pytest.approx(5.001)
+
+
+def test_release_refunds_unused_tokens_up_to_the_bucket(clock):
+    limiter = RateLimiter("test", requests_per_minute=10**6, tokens_per_minute=60000, max_concurrent=100, burst_seconds=5)
+    grant = limiter.acquire(4000)
+    limiter.release(grant, actual_tokens=100)
+
+    assert limiter._token_budget == pytest.approx(4900)
+    limiter.release(limiter.acquire(0), actual_tokens=-10**6)
+    assert limiter._token_budget == limiter.token_capacity
+
+
+def test_async_waiters_are_parked_until_capacity_is_released():
+    limiter = RateLimiter("test", requests_per_minute=10**6, tokens_per_minute=10**9, max_concurrent=1)
+    checks = []
+    try_grant = limiter._try_grant
+
+    def counting_try_grant(ticket, tokens):
+        checks.append(ticket)
+        return try_grant(ticket, tokens)
+
+    limiter._try_grant = counting_try_grant
+
+    async def scenario():
+        first = await limiter.acquire_async(0)
+        waiters = [asyncio.ensure_future(limiter.acquire_async(0)) for _ in range(3)]
+        await asyncio.sleep(0.2)
+        parked_checks = len(checks)
+        assert not any(waiter.done() for waiter in waiters)
+
+        limiter.release(first)
+        for waiter in waiters:
+            limiter.release(await asyncio.wait_for(waiter, timeout=1))
+        return parked_checks
+
+    # One check each when they queue; no polling while they are parked.
+    assert asyncio.run(scenario()) == 4
+    assert limiter.stats()["waiting"] == 0 and limiter.stats()["in_flight"] == 0
+
+
+def test_a_cancelled_async_waiter_leaves_the_queue():
+    limiter = RateLimiter("test", requests_per_minute=10**6, tokens_per_minute=10**9, max_concurrent=1)
+
+    async def scenario():
+        first = await limiter.acquire_async(0)
+        cancelled = asyncio.ensure_future(limiter.acquire_async(0))
+        behind = asyncio.ensure_future(limiter.acquire_async(0))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.sleep(0.01)
+        limiter.release(first)
+        limiter.release(await asyncio.wait_for(behind, timeout=1))
+
+    asyncio.run(scenario())
+    assert limiter.stats()["waiting"] == 0
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_session import build_session
+from retry_policy import CircuitBreaker, RetryBudget, RetryPolicy
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """
+    Answers every other request with a 503, so each fetch needs one retry.
+    """
+    protocol_version = "HTTP/1.1"
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        status = 503 if self.requests_seen % 2 else 200
+        body = b'{"data": {}}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_url():
+    _FlakyHandler.requests_seen = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def _policy():
+    return RetryPolicy("test", max_attempts=3, base_delay=0.01, max_delay=0.01,
+                       budget=RetryBudget(ratio=1.0, min_retries_per_window=10),
+                       breaker=CircuitBreaker(failure_threshold=100, reset_seconds=1))
+
+
+def test_retried_streamed_responses_release_their_pooled_connection(flaky_url):
+    session = build_session(pool_size=1, timeout=(2, 2))
+    policy = _policy()
+    statuses = []
+
+    def fetch_twice():
+        for _ in range(2):
+            response = policy.call(lambda: session.get(flaky_url, stream=True))
+            statuses.append(response.status_code)
+            response.close()
+
+    # With a blocking pool of one, a leaked 503 response would hang the retry forever.
+    worker = threading.Thread(target=fetch_twice, daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive(), "retry blocked waiting for a pooled connection"
+    assert statuses == [200, 200]
+
+
+def test_retried_async_streamed_responses_release_their_pooled_connection(flaky_url):
+    httpx = pytest.importorskip("httpx")
+    policy = _policy()
+
+    async def fetch_twice():
+        limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+        async with httpx.AsyncClient(limits=limits, timeout=2) as client:
+            statuses = []
+            for _ in range(2):
+                response = await policy.call_async(
+                    lambda: client.send(client.build_request("GET", flaky_url), stream=True)
+                )
+                statuses.append(response.status_code)
+                await response.aclose()
+            return statuses
+
+    assert asyncio.run(asyncio.wait_for(fetch_twice(), timeout=10)) == [200, 200]
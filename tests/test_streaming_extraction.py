@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+import ai_processor
+
+RAW = "\n".join([
+    "Ann: um so the plan",
+    "Ann: is to ship friday",
+    "Bo: okay",
+    "Ann: Bo owns the release notes",
+    "Bo: got it",
+    "Cy: I'll book the demo",
+])
+# The cleaned form of the first three raw speaker runs, streamed before the failure.
+CLEANED_BEFORE_FAILURE = ["Ann: The plan is to ship Friday.", "Bo: Okay.", "Ann: Bo owns the release notes."]
+
+
+@pytest.fixture
+def extracted(monkeypatch):
+    segments = []
+
+    def extract(segment, fused=False):
+        segments.append(segment)
+        return {"client_name": "Acme", "key_decisions": [], "unanswered_questions": [],
+                "action_items": [{"task": line} for line in segment.split("\n")]}
+
+    async def extract_async(segment, fused=False):
+        return extract(segment, fused)
+
+    def stream(raw_text):
+        for turn in CLEANED_BEFORE_FAILURE:
+            yield turn + "\n"
+        raise RuntimeError("stream reset")
+
+    async def stream_async(raw_text):
+        for piece in stream(raw_text):
+            yield piece
+
+    monkeypatch.setattr(ai_processor, "extract_structured_data", extract)
+    monkeypatch.setattr(ai_processor, "extract_structured_data_async", extract_async)
+    monkeypatch.setattr(ai_processor, "clean_transcript_stream", stream)
+    monkeypatch.setattr(ai_processor, "clean_transcript_stream_async", stream_async)
+    monkeypatch.setattr(ai_processor, "CHUNK_OVERLAP_TURNS", 0)
+    return segments
+
+
+def _tasks(data):
+    return [item["task"] for item in data["action_items"]]
+
+
+def test_failed_stream_keeps_extracted_segments_and_extracts_only_the_rest(extracted):
+    # Each cleaned turn closes a segment of its own, so the first two are extracted before the failure.
+    cleaned, data = ai_processor.clean_and_extract_streaming(RAW, max_chars=40)
+
+    assert cleaned == RAW
+    assert extracted[:2] == CLEANED_BEFORE_FAILURE[:2]
+    # The rest resumes on the raw lines after Bo's first run; no raw line already covered is re-sent.
+    assert all("ship friday" not in segment for segment in extracted[2:])
+    assert "Cy: I'll book the demo" in _tasks(data)
+    assert "Ann: Bo owns the release notes" in _tasks(data)
+
+
+def test_failed_async_stream_keeps_extracted_segments_and_extracts_only_the_rest(extracted):
+    cleaned, data = asyncio.run(ai_processor.clean_and_extract_streaming_async(RAW, max_chars=40))
+
+    assert cleaned == RAW
+    assert extracted[:2] == CLEANED_BEFORE_FAILURE[:2]
+    assert all("ship friday" not in segment for segment in extracted[2:])
+    assert "Cy: I'll book the demo" in _tasks(data)
+
+
+def test_raw_remainder_gives_up_when_speakers_do_not_line_up():
+    assert ai_processor._raw_remainder(RAW, ["Bo: Okay."]) is None
+    assert ai_processor._raw_remainder(RAW, ["Ann: The plan is to ship Friday."]) == "\n".join(RAW.split("\n")[2:])
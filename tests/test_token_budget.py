@@ -0,0 +1,68 @@
+import pytest
+
+import ai_processor
+import token_budget
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(token_budget, "INPUT_TOKEN_LIMIT", 100000)
+    monkeypatch.setattr(token_budget, "OUTPUT_TOKEN_LIMIT", 1000)
+
+
+def _transcript(turns: int) -> str:
+    return "\n".join(f"Speaker {i % 3}: we should ship the release on friday" for i in range(turns))
+
+
+def test_a_short_transcript_is_one_call_per_pass(limits):
+    plan = token_budget.plan_passes(_transcript(10), "auto", llm_cleaning=True, preferred_chunk_chars=100000)
+
+    assert (plan.fused, plan.clean_chunk_chars, plan.extract_chunk_chars) == (False, None, None)
+    assert plan.transcript_tokens == token_budget.estimate_tokens(_transcript(10))
+
+
+def test_auto_fuses_when_llm_cleaning_would_need_chunks(limits):
+    transcript = _transcript(100)  # Over the 800-token cleaning budget, under extraction's 8000.
+    plan = token_budget.plan_passes(transcript, "auto", llm_cleaning=True, preferred_chunk_chars=100000)
+
+    assert (plan.fused, plan.clean_chunk_chars, plan.extract_chunk_chars) == (True, None, None)
+
+
+def test_auto_does_not_fuse_without_llm_cleaning(limits):
+    plan = token_budget.plan_passes(_transcript(100), "auto", llm_cleaning=False, preferred_chunk_chars=100000)
+
+    assert (plan.fused, plan.clean_chunk_chars, plan.extract_chunk_chars) == (False, None, None)
+
+
+@pytest.mark.parametrize("mode, fused", [("separate", False), ("fused", True)])
+def test_explicit_modes_are_honoured(limits, mode, fused):
+    plan = token_budget.plan_passes(_transcript(100), mode, llm_cleaning=True, preferred_chunk_chars=100000)
+
+    assert plan.fused is fused
+    assert (plan.clean_chunk_chars is not None) is not fused
+
+
+def test_cleaning_chunks_fit_the_output_limit(limits):
+    transcript = _transcript(300)
+    plan = token_budget.plan_passes(transcript, "separate", llm_cleaning=True, preferred_chunk_chars=100000)
+    chunks = ai_processor.split_transcript(transcript, plan.clean_chunk_chars)
+
+    assert len(chunks) > 1
+    assert all(token_budget.estimate_tokens(chunk) <= token_budget.OUTPUT_TOKEN_LIMIT for chunk in chunks)
+
+
+def test_extraction_chunks_fit_the_context_window(monkeypatch, limits):
+    monkeypatch.setattr(token_budget, "INPUT_TOKEN_LIMIT", 2000)
+    transcript = _transcript(300)
+    plan = token_budget.plan_passes(transcript, "auto", llm_cleaning=False, preferred_chunk_chars=100000)
+    chunks = ai_processor.split_transcript(transcript, plan.extract_chunk_chars)
+
+    assert len(chunks) > 1
+    budget = token_budget.INPUT_TOKEN_LIMIT - token_budget.PROMPT_OVERHEAD_TOKENS
+    assert all(token_budget.estimate_tokens(chunk) <= budget for chunk in chunks)
+
+
+def test_a_smaller_preferred_chunk_size_is_kept(limits):
+    plan = token_budget.plan_passes(_transcript(300), "separate", llm_cleaning=True, preferred_chunk_chars=500)
+
+    assert plan.clean_chunk_chars == plan.extract_chunk_chars == 500
@@ -0,0 +1,35 @@
+import pytest
+
+from transcript_cleaner import clean_transcript, clean_utterance
+from transcript_model import Transcript
+
+
+@pytest.mark.parametrize("raw, cleaned", [
+    ("Uh-huh, sounds good.", "Uh-huh, sounds good."),
+    ("Mm-hmm.", "Mm-hmm."),
+    ("um, hello", "hello"),
+    ("So, um, I think, uh, we should ship it.", "So, I think, we should ship it."),
+    ("Hmm.", ""),
+    ("the the plan is th- the plan is fine", "the plan is the plan is fine"),
+    ("You know, the budget is fine, like, overall.", "the budget is fine overall."),
+    ("you know the answer", "you know the answer"),
+    ("e.g. this one", "e.g. this one"),
+    ("We ship Friday. then we rest", "We ship Friday. then we rest"),
+])
+def test_clean_utterance(raw, cleaned):
+    assert clean_utterance(raw) == cleaned
+
+
+@pytest.mark.parametrize("raw, cleaned", [
+    ("Ann: um hello\nAnn: there there", "Ann: Hello there"),
+    ("Ann: e.g. this\nBo: Uh-huh.", "Ann: E.g. this\nBo: Uh-huh."),
+    ("Ann: Hi\nBo: um\nAnn: again", "Ann: Hi again"),
+    ("Ann: Hi\nno speaker here", "Ann: Hi no speaker here"),
+])
+def test_clean_transcript_merges_turns_and_capitalises_only_their_start(raw, cleaned):
+    assert clean_transcript(raw) == cleaned
+
+
+def test_clean_transcript_accepts_a_transcript():
+    transcript = Transcript.from_text("Ann: um hello\nAnn: there there\nBo: Mm-hmm.")
+    assert clean_transcript(transcript) == "Ann: Hello there\nBo: Mm-hmm."
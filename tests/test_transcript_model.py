@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+import ai_processor
+from transcript_model import Transcript
+
+
+def _transcript(count: int, seed: int = 7) -> Transcript:
+    rng = random.Random(seed)
+    words = ["ship", "the", "release", "friday", "okay", "demo", "notes", "café", "budget"]
+    return Transcript.from_sentences(
+        {"speaker_name": rng.choice(["Ann", "Bo Li", "Cy"]), "text": " ".join(rng.choices(words, k=rng.randint(1, 40)))}
+        for _ in range(count)
+    )
+
+
+@pytest.mark.parametrize("max_chars, overlap_turns", [(120, 0), (300, 3), (300, 50), (20, 2), (100000, 3)])
+def test_chunks_match_splitting_the_rendered_text(max_chars, overlap_turns):
+    transcript = _transcript(200)
+    expected = ai_processor.split_transcript(transcript.render(), max_chars, overlap_turns)
+
+    assert ai_processor.split_transcript(transcript, max_chars, overlap_turns) == expected
+
+
+def test_chunk_ranges_cover_every_sentence_in_order():
+    transcript = _transcript(50)
+    ranges = list(transcript.chunk_ranges(200))
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == transcript.sentence_count
+    assert all(stop == next_start for (_, stop), (next_start, _) in zip(ranges, ranges[1:]))
+    assert list(Transcript.from_sentences([]).chunk_ranges(200)) == []
@@ -0,0 +1,61 @@
+import pytest
+
+from name_index import NameIndex
+from user_directory import UserDirectory
+
+
+class _FakeAsanaClient:
+    workspace_gid = "w1"
+
+    def __init__(self, users):
+        self.users = users
+
+    def iter_pages(self, path, params):
+        return iter(self.users)
+
+
+@pytest.fixture
+def directory(monkeypatch):
+    monkeypatch.delenv("ASANA_USER_ALIASES", raising=False)
+    monkeypatch.delenv("USER_DIRECTORY_CACHE_PATH", raising=False)
+    return UserDirectory(_FakeAsanaClient([
+        {"gid": "1", "name": "Sarah Lee", "email": "sarah@x.com"},
+        {"gid": "2", "name": "John Smith", "email": "john.smith@x.com"},
+        {"gid": "3", "name": "John Park", "email": "jpark@x.com"},
+    ]))
+
+
+def test_first_name_matching_the_email_local_part_resolves(directory):
+    assert directory.resolve("Sarah") == "1"
+    assert directory.resolve("sarah") == "1"
+
+
+def test_first_name_shared_by_two_users_stays_unassigned(directory):
+    assert directory.resolve("John") is None
+    assert directory.resolve("John S") == "2"
+
+
+def test_any_prefix_of_one_value_is_accepted_without_a_minimum():
+    index = NameIndex([("sarah lee", "1"), ("sarah x com", "1"), ("sam", "2")])
+    assert index.best_match("sar") == "1"
+    assert NameIndex([("sarah lee", "1"), ("sara jones", "2")]).best_match("sar") is None
+
+
+@pytest.mark.parametrize("owner, gid", [
+    ("sar", None),
+    ("Jo", None),
+    ("Mark", None),  # Only 4 of "markowitz"'s 9 letters.
+    ("Sara", "1"),
+    ("Sarah L.", "1"),
+    ("Markow", "4"),
+    ("Dana Markowitz", "4"),
+])
+def test_owner_prefixes_must_be_whole_words_initials_or_long_enough(monkeypatch, owner, gid):
+    monkeypatch.delenv("ASANA_USER_ALIASES", raising=False)
+    monkeypatch.delenv("USER_DIRECTORY_CACHE_PATH", raising=False)
+    directory = UserDirectory(_FakeAsanaClient([
+        {"gid": "1", "name": "Sarah Lee", "email": "sarah@x.com"},
+        {"gid": "4", "name": "Dana Markowitz", "email": "dm@x.com"},
+        {"gid": "5", "name": "Joanna Li", "email": "jli@x.com"},
+    ]))
+    assert directory.resolve(owner) == gid
@@ -0,0 +1,54 @@
+import pytest
+
+import app as webhook_app
+from job_store import JobStore
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setenv("ASANA_PROJECT_GID", "default")
+    monkeypatch.setenv("PIPELINE_RUNTIME", "threads")
+    monkeypatch.delenv("FIREFLIES_WEBHOOK_SECRET", raising=False)
+    monkeypatch.setattr(webhook_app, "create_pipeline_handler", lambda *args, **kwargs: lambda job, save_stage: {})
+    store = JobStore(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(webhook_app, "JobStore", lambda: store)
+    # Workers are not started, so accepted meetings stay queued.
+    return webhook_app.create_app(start_workers=False).test_client(), store
+
+
+def _deliver(client, meeting_id="m1", **payload):
+    return client.post("/webhook/fireflies", json={"id": meeting_id, "event_type": "meeting.completed", **payload})
+
+
+def test_a_new_meeting_is_queued_and_acknowledged_with_202(service):
+    client, store = service
+    response = _deliver(client)
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["status"] == "accepted"
+    assert store.get_job(body["job_id"])["status"] == "queued"
+    assert client.get(f"/jobs/{body['job_id']}").get_json()["status"] == "queued"
+
+
+def test_a_redelivered_meeting_returns_the_existing_job_with_200(service):
+    client, store = service
+    job_id = _deliver(client).get_json()["job_id"]
+    store.save_stage(job_id, None, {"asana_task_gid": "t1"})
+
+    response = _deliver(client)
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "status": "duplicate", "message": "Meeting already received (job is queued)", "job_id": job_id, "asana_task_gid": "t1",
+    }
+    assert _deliver(client, "m2").status_code == 202
+
+
+def test_invalid_payloads_are_rejected_without_a_job(service):
+    client, store = service
+
+    assert client.post("/webhook/fireflies", data="not json").status_code == 400
+    assert client.post("/webhook/fireflies", json={"event_type": "meeting.completed"}).status_code == 400
+    assert _deliver(client, event_type="meeting.started").get_json()["status"] == "skipped"
+    assert _deliver(client).status_code == 202  # The skipped event did not record the meeting.
@@ -0,0 +1,137 @@
+import os
+import math
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# The model's context window and maximum response length, in tokens.
+INPUT_TOKEN_LIMIT = int(os.environ.get("GEMINI_INPUT_TOKEN_LIMIT", 1048576))
+OUTPUT_TOKEN_LIMIT = int(os.environ.get("GEMINI_OUTPUT_TOKEN_LIMIT", 8192))
+
+# Tokens taken by the instructions and examples around the transcript in the largest prompt.
+PROMPT_OVERHEAD_TOKENS = 1000
+# Estimates are approximate, so plans only fill this fraction of a limit.
+SAFETY_MARGIN = 0.8
+# Extraction output (JSON) per transcript token; generous, since dense meetings produce many items.
+EXTRACTION_OUTPUT_RATIO = 0.1
+
+
+class PromptTooLargeError(ValueError):
+    """
+    Raised instead of sending a prompt that would not fit in the model's context window.
+    """
+
+
+class ResponseTruncatedError(Exception):
+    """
+    Raised when the model stopped at its output token limit, so the response is incomplete.
+    """
+
+
+def check_not_truncated(response):
+    """
+    Raises ResponseTruncatedError if a Gemini response was cut off at the output limit.
+    """
+    for candidate in getattr(response, "candidates", None) or []:
+        finish_reason = getattr(candidate, "finish_reason", None)
+        if getattr(finish_reason, "name", finish_reason) in ("MAX_TOKENS", 2):
+            raise ResponseTruncatedError(f"Response was cut off at the {OUTPUT_TOKEN_LIMIT}-token output limit.")
+
+
+def estimate_tokens(text) -> int:
+    """
+    Estimates the token count of a text without a tokenizer: the larger of four characters
+    per token and four tokens per three words, which holds for English prose and transcripts.
+    Runs in microseconds even for hour-long transcripts. Also accepts a transcript_model.Transcript,
+    which computes the same estimate without rendering its text.
+    """
+    if not text:
+        return 0
+    if not isinstance(text, str):
+        return text.estimate_tokens()
+    return estimate_tokens_from_counts(len(text), text.count(" ") + text.count("\n") + 1)
+
+
+def estimate_tokens_from_counts(chars: int, words: int) -> int:
+    return max(math.ceil(chars / 4), math.ceil(words * 4 / 3))
+
+
+def check_prompt_fits(prompt: str):
+    """
+    Raises PromptTooLargeError if the prompt would exceed the model's context window.
+    """
+    prompt_tokens = estimate_tokens(prompt)
+    if prompt_tokens > INPUT_TOKEN_LIMIT:
+        raise PromptTooLargeError(f"Prompt of ~{prompt_tokens} tokens exceeds the model's {INPUT_TOKEN_LIMIT}-token context window.")
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Returns the start of `text` within roughly `max_tokens`, cut at a line break where possible.
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    head = text[:int(len(text) * max_tokens / tokens)]
+    line_break = head.rfind("\n")
+    return head[:line_break] if line_break > len(head) // 2 else head
+
+
+class PassPlan:
+    """
+    How one meeting's cleaning and extraction passes will be sent to the model.
+
+    Attributes:
+        fused: Clean and extract in a single call on the raw transcript.
+        clean_chunk_chars: Chunk size for LLM cleaning, or None for a single call (or no LLM cleaning).
+        extract_chunk_chars: Chunk size for extraction, or None for a single call.
+        transcript_tokens: The estimated size of the transcript.
+    """
+    __slots__ = ("fused", "clean_chunk_chars", "extract_chunk_chars", "transcript_tokens")
+
+    def __init__(self, fused: bool, clean_chunk_chars: int | None, extract_chunk_chars: int | None, transcript_tokens: int):
+        self.fused = fused
+        self.clean_chunk_chars = clean_chunk_chars
+        self.extract_chunk_chars = extract_chunk_chars
+        self.transcript_tokens = transcript_tokens
+
+    def __repr__(self) -> str:
+        return (f"PassPlan(fused={self.fused}, clean_chunk_chars={self.clean_chunk_chars}, "
+                f"extract_chunk_chars={self.extract_chunk_chars}, transcript_tokens={self.transcript_tokens})")
+
+
+def plan_passes(transcript: str, mode: str, llm_cleaning: bool, preferred_chunk_chars: int) -> PassPlan:
+    """
+    Picks single-call, chunked or fused processing for one transcript so that no request
+    exceeds the model's context window and no response is cut off at the output limit.
+
+    Args:
+        transcript: The raw transcript (a string or a transcript_model.Transcript).
+        mode: 'separate', 'fused', or 'auto' (fused only when LLM cleaning would have to be chunked).
+        llm_cleaning: Whether Pass 1 is an LLM call (cleaning output is as long as its input).
+        preferred_chunk_chars: Chunk size preferred for latency; lowered if the limits require it.
+    """
+    transcript_tokens = estimate_tokens(transcript)
+    chars_per_token = len(transcript) / transcript_tokens if transcript_tokens else 4
+    context_budget = INPUT_TOKEN_LIMIT - PROMPT_OVERHEAD_TOKENS
+
+    # A cleaning response is as long as its input, so the output limit bounds each call.
+    clean_max_tokens = SAFETY_MARGIN * min(context_budget, OUTPUT_TOKEN_LIMIT)
+    extract_max_tokens = SAFETY_MARGIN * min(context_budget, OUTPUT_TOKEN_LIMIT / EXTRACTION_OUTPUT_RATIO)
+    clean_chunk_chars = min(preferred_chunk_chars, int(clean_max_tokens * chars_per_token))
+    extract_chunk_chars = min(preferred_chunk_chars, int(extract_max_tokens * chars_per_token))
+
+    fused = mode == "fused" or (mode == "auto" and llm_cleaning and len(transcript) > clean_chunk_chars)
+    plan = PassPlan(
+        fused=fused,
+        clean_chunk_chars=clean_chunk_chars if llm_cleaning and not fused and len(transcript) > clean_chunk_chars else None,
+        extract_chunk_chars=extract_chunk_chars if len(transcript) > extract_chunk_chars else None,
+        transcript_tokens=transcript_tokens,
+    )
+    logging.info(f"TOKEN BUDGET: Planned AI passes: {plan}")
+    return plan
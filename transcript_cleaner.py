@@ -0,0 +1,91 @@
+import re
+import logging
+
+from transcript_model import Transcript
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# "Speaker Name: what they said", as produced by FirefliesClient.
+_SPEAKER_LINE = re.compile(r"^([^:\n]{1,80}):\s?(.*)$")
+
+# Hesitation sounds that never carry meaning on their own ("um", "uhh", "hmm", ...). Not when
+# joined by a hyphen, so backchannels such as "uh-huh" and "mm-hmm" are kept whole.
+_FILLER_SOUNDS = re.compile(r"(?<![\w-])(?:u+m+|u+h+|e+r+m*|h+m+|m{2,}|a+h+)(?![\w-]),?", re.IGNORECASE)
+
+# Filler phrases, only when set off by commas or at the start of a sentence, since
+# "you know the answer" or "I like it" must be kept.
+_FILLER_PHRASES = "you know|i mean|like|so yeah|kind of|sort of"
+_INLINE_FILLER_PHRASE = re.compile(rf",\s*(?:{_FILLER_PHRASES})\s*,", re.IGNORECASE)
+_LEADING_FILLER_PHRASE = re.compile(rf"(^|[.!?]\s+)(?:{_FILLER_PHRASES})\s*,\s*", re.IGNORECASE)
+
+# A false start cut off by a dash and then restarted: "th- the", "I- I think".
+_STUTTER = re.compile(r"\b([A-Za-z']{1,12})-\s+(?=\1)", re.IGNORECASE)
+
+# The same word said several times in a row: "the the", "I, I, I think".
+_REPEATED_WORD = re.compile(r"\b([A-Za-z']+)(?:[\s,]+\1\b)+", re.IGNORECASE)
+
+# Punctuation and spacing left behind by the removals above.
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([,.;:!?])")
+_REPEATED_PUNCTUATION = re.compile(r"([,;])(?:\s*[,;])+|,\s*([.!?])")
+_LEADING_PUNCTUATION = re.compile(r"^[\s,.;:]+")
+_WHITESPACE = re.compile(r"\s{2,}")
+
+
+def clean_transcript(raw_text: str) -> str:
+    """
+    Cleans a raw transcript without calling the LLM: removes filler words and stutters,
+    collapses repeated words and merges consecutive lines from the same speaker.
+    Unlike the LLM editor pass it does not correct typos, but it runs in milliseconds
+    even on hour-long meetings. Accepts "Speaker: text" lines or a transcript_model.Transcript.
+    """
+    logging.info("TRANSCRIPT CLEANER: Cleaning transcript locally...")
+    turns = []  # [speaker, [utterances]]
+    for speaker, text in _speaker_lines(raw_text):
+        text = clean_utterance(text)
+        if not text:
+            continue
+        if turns and (speaker is None or speaker == turns[-1][0]):
+            turns[-1][1].append(text)
+        else:
+            turns.append([speaker, [text]])
+
+    # Only the start of each merged turn is capitalised; "e.g. this" or a turn continued
+    # across lines keeps the speaker's own casing.
+    lines = []
+    for speaker, texts in turns:
+        text = ' '.join(texts)
+        text = text[0].upper() + text[1:]
+        lines.append(f"{speaker}: {text}" if speaker else text)
+    logging.info(f"TRANSCRIPT CLEANER: Cleaned {len(raw_text)} chars into {len(lines)} speaker turn(s).")
+    return "\n".join(lines)
+
+
+def _speaker_lines(raw_text):
+    """
+    Yields (speaker or None, text) for each transcript line.
+    """
+    if isinstance(raw_text, Transcript):
+        yield from raw_text.sentences()
+        return
+    for line in raw_text.splitlines():
+        match = _SPEAKER_LINE.match(line)
+        yield (match.group(1).strip(), match.group(2)) if match else (None, line)
+
+
+def clean_utterance(text: str) -> str:
+    """
+    Cleans a single utterance (one transcript line without its speaker label).
+    """
+    text = _FILLER_SOUNDS.sub("", text)
+    text = _INLINE_FILLER_PHRASE.sub(" ", text)
+    text = _LEADING_FILLER_PHRASE.sub(r"\1", text)
+    text = _STUTTER.sub("", text)
+    text = _REPEATED_WORD.sub(r"\1", text)
+    text = _SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+    text = _REPEATED_PUNCTUATION.sub(lambda m: m.group(1) or m.group(2), text)
+    text = _LEADING_PUNCTUATION.sub("", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    if not any(c.isalnum() for c in text):
+        return ""
+    return text
@@ -0,0 +1,221 @@
+import re
+import sys
+import base64
+from array import array
+
+import token_budget
+
+# "Speaker Name: what they said", as rendered by Transcript (and by older checkpoints).
+_SPEAKER_LINE = re.compile(r"^([^:\n]{1,80}):\s?(.*)$")
+
+
+class Transcript:
+    """
+    A meeting transcript stored compactly: each speaker name is interned once in a table,
+    all sentence text lives in one contiguous UTF-8 buffer with an array of end offsets,
+    and each sentence refers to its speaker by index. The "Speaker: text" form the prompts
+    use is rendered on demand, whole or in slices, so a meeting in flight holds this one
+    compact copy instead of a list of lines plus the string joined from them. Text stays one
+    byte per ASCII character even when a single emoji or non-Latin name would widen a Python
+    string to two or four bytes per character.
+
+    len() is the length of the rendered text, as it would be for the string.
+    """
+    __slots__ = ("speakers", "_speaker_ids", "_buffer", "_ends", "_char_length")
+
+    def __init__(self, speakers: list[str], speaker_ids: array, buffer: bytes, ends: array, char_length: int | None = None):
+        self.speakers = speakers
+        self._speaker_ids = speaker_ids
+        self._buffer = buffer
+        self._ends = ends
+        if char_length is None:
+            text_chars = len(buffer.decode("utf-8"))
+            char_length = text_chars + sum(len(speakers[i]) + 2 for i in speaker_ids) + max(len(ends) - 1, 0)
+        self._char_length = char_length
+
+    @classmethod
+    def from_sentences(cls, sentences) -> "Transcript":
+        """
+        Builds a transcript from Fireflies sentences ({'speaker_name': ..., 'text': ...}).
+        """
+        builder = TranscriptBuilder()
+        for sentence in sentences:
+            builder.add(sentence.get('speaker_name', 'Unknown'), sentence.get('text', ''))
+        return builder.build()
+
+    @classmethod
+    def from_text(cls, text: str) -> "Transcript":
+        """
+        Parses a transcript rendered as "Speaker: text" lines.
+        """
+        sentences = []
+        for line in text.split("\n"):
+            match = _SPEAKER_LINE.match(line)
+            sentences.append({'speaker_name': match.group(1), 'text': match.group(2)} if match
+                             else {'speaker_name': 'Unknown', 'text': line})
+        return cls.from_sentences(sentences)
+
+    @classmethod
+    def load(cls, value) -> "Transcript":
+        """
+        Returns a Transcript for a checkpointed value: a Transcript, its to_dict() form,
+        or the rendered string stored by older checkpoints.
+        """
+        if isinstance(value, Transcript):
+            return value
+        if isinstance(value, dict):
+            return cls.from_dict(value)
+        return cls.from_text(value or "")
+
+    def to_dict(self) -> dict:
+        """
+        Returns a JSON-serializable form for checkpoints. The offset arrays are stored as
+        base64 so a loaded checkpoint does not hold a Python int per sentence.
+        """
+        return {
+            "speakers": self.speakers,
+            "speaker_ids": _pack(self._speaker_ids),
+            "text": self._buffer.decode("utf-8"),
+            "ends": _pack(self._ends),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Transcript":
+        return cls(
+            [sys.intern(name) for name in data["speakers"]],
+            _unpack("H", data["speaker_ids"]),
+            data["text"].encode("utf-8"),
+            _unpack("I", data["ends"]),
+        )
+
+    def __len__(self) -> int:
+        return self._char_length
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self._ends)
+
+    def sentence(self, index: int) -> tuple[str, str]:
+        """
+        Returns (speaker, text) for one sentence.
+        """
+        start = self._ends[index - 1] if index else 0
+        return self.speakers[self._speaker_ids[index]], self._buffer[start:self._ends[index]].decode("utf-8")
+
+    def sentences(self, start: int = 0, stop: int | None = None):
+        """
+        Yields (speaker, text) for the sentences in [start, stop).
+        """
+        for index in range(start, self.sentence_count if stop is None else min(stop, self.sentence_count)):
+            yield self.sentence(index)
+
+    def render(self, start: int = 0, stop: int | None = None) -> str:
+        """
+        Returns sentences [start, stop) as "Speaker: text" lines.
+        """
+        return "\n".join(f"{speaker}: {text}" for speaker, text in self.sentences(start, stop))
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def head(self, max_chars: int) -> str:
+        """
+        Returns the opening "Speaker: text" lines, at most `max_chars` long, without rendering the rest.
+        """
+        lines, length = [], 0
+        for speaker, text in self.sentences():
+            line = f"{speaker}: {text}"
+            if length + len(line) > max_chars:
+                if not lines:
+                    lines.append(line[:max_chars])
+                break
+            lines.append(line)
+            length += len(line) + 1
+        return "\n".join(lines)
+
+    def line_length(self, index: int) -> int:
+        """
+        Returns the length of one rendered "Speaker: text" line.
+        """
+        speaker, text = self.sentence(index)
+        return len(speaker) + 2 + len(text)
+
+    def chunk_ranges(self, max_chars: int, overlap_turns: int = 0):
+        """
+        Yields the (start, stop) sentence ranges of ai_processor.split_transcript's chunks of
+        the rendered text, without rendering it: at most `max_chars` per chunk (a longer
+        sentence is its own chunk), each after the first starting with up to `overlap_turns`
+        sentences of the previous one, kept to a quarter of the chunk.
+        """
+        start, length = 0, 0
+        for index in range(self.sentence_count):
+            line_length = self.line_length(index)
+            if index > start and length + line_length + 1 > max_chars:
+                yield start, index
+                start = max(start, index - overlap_turns) if overlap_turns else index
+                length = sum(self.line_length(i) + 1 for i in range(start, index))
+                while start < index and length > max_chars // 4:
+                    length -= self.line_length(start) + 1
+                    start += 1
+            length += line_length + 1
+        if self.sentence_count > start:
+            yield start, self.sentence_count
+
+    def estimate_tokens(self) -> int:
+        """
+        token_budget.estimate_tokens of the rendered text, computed without rendering it.
+        """
+        if not self._char_length:
+            return 0
+        speaker_spaces = [name.count(" ") + 1 for name in self.speakers]  # plus the one after ':'
+        spaces = self._buffer.count(b" ") + sum(speaker_spaces[i] for i in self._speaker_ids)
+        newlines = self._buffer.count(b"\n") + self.sentence_count - 1
+        return token_budget.estimate_tokens_from_counts(self._char_length, spaces + newlines + 1)
+
+
+class TranscriptBuilder:
+    """
+    Accumulates sentences one at a time into a Transcript, so a parser can hand over each
+    sentence as soon as it is read instead of collecting them all first.
+    """
+    __slots__ = ("_speakers", "_speaker_index", "_speaker_ids", "_buffer", "_ends", "_char_length")
+
+    def __init__(self):
+        self._speakers, self._speaker_index = [], {}
+        self._speaker_ids, self._ends = array("H"), array("I")
+        self._buffer = bytearray()
+        self._char_length = 0
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def add(self, speaker_name, text):
+        name = str(speaker_name)
+        text = text or ''
+        speaker_id = self._speaker_index.get(name)
+        if speaker_id is None:
+            speaker_id = self._speaker_index[name] = len(self._speakers)
+            self._speakers.append(sys.intern(name))
+        self._speaker_ids.append(speaker_id)
+        self._buffer += text.encode("utf-8")
+        self._ends.append(len(self._buffer))
+        self._char_length += len(name) + 2 + len(text) + 1
+
+    def build(self) -> Transcript:
+        return Transcript(self._speakers, self._speaker_ids, bytes(self._buffer), self._ends, max(self._char_length - 1, 0))
+
+
+def _pack(values: array) -> str:
+    # Little-endian, so a checkpoint reads back the same on any machine.
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _unpack(typecode: str, packed: str) -> array:
+    values = array(typecode)
+    values.frombytes(base64.b64decode(packed))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
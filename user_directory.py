@@ -0,0 +1,126 @@
+import os
+import re
+import json
+import logging
+from collections import defaultdict
+from dotenv import load_dotenv
+
+from name_index import CachedNameIndex, normalize_name
+
+# Load environment variables
+load_dotenv()
+
+# Configure basic logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Owner values the AI uses when nobody was assigned.
+_UNASSIGNED = {"", "n a", "na", "none", "unknown", "tbd", "unassigned", "team", "everyone", "all"}
+
+# A partial owner name matches a user's name only if it has at least this many characters
+# (and covers half the word): assigning an action item to the wrong person is worse than none.
+_MIN_OWNER_PREFIX_CHARS = 4
+
+# Separators between several owners in one free-text value, e.g. "Sarah and John".
+_OWNER_SEPARATORS = re.compile(r"\s*(?:,|&|/|\band\b|\bor\b)\s*", re.IGNORECASE)
+
+
+class UserDirectory(CachedNameIndex):
+    """
+    A cached index of the Asana workspace's users for mapping the free-text action item
+    owners produced by the AI onto assignee GIDs. Each user is indexed under their full
+    name, email, email local part, and their first or last name when that is unique in
+    the workspace. Extra aliases can be configured with ASANA_USER_ALIASES.
+    Users are loaded once and refreshed in the background, so lookups never call the API.
+    """
+    LOG_PREFIX = "USER DIRECTORY"
+
+    def __init__(self, asana_client, ttl_seconds: int | None = None, cache_path: str | None = None):
+        """
+        Args:
+            asana_client: The AsanaClient used to list workspace users.
+            ttl_seconds: How long the directory stays fresh. Defaults to USER_DIRECTORY_TTL_SECONDS or 3600.
+            cache_path: Optional JSON file to persist users. Defaults to USER_DIRECTORY_CACHE_PATH.
+        """
+        super().__init__(
+            ttl_seconds or int(os.environ.get("USER_DIRECTORY_TTL_SECONDS", 3600)),
+            cache_path or os.environ.get("USER_DIRECTORY_CACHE_PATH"),
+        )
+        self.asana_client = asana_client
+        self.aliases = _load_aliases()
+
+    def resolve(self, owner_name: str | None) -> str | None:
+        """
+        Maps a free-text owner (e.g. "Sarah", "sarah.lee@acme.com", "Sarah L.") to a user GID.
+        When several owners are named, the first one that resolves is used.
+        Returns None if the owner is empty, unassigned or not confidently matched.
+        """
+        if not owner_name or normalize_name(owner_name) in _UNASSIGNED:
+            return None
+        index = self.get_index()
+        if not index: return None
+
+        for candidate in [owner_name, *_OWNER_SEPARATORS.split(owner_name)]:
+            if normalize_name(candidate) in _UNASSIGNED:
+                continue
+            user_gid = index.best_match(candidate, fuzzy_threshold=0.8, min_prefix_chars=_MIN_OWNER_PREFIX_CHARS)
+            if user_gid:
+                logging.debug(f"USER DIRECTORY: Resolved owner '{owner_name}' to user {user_gid}")
+                return user_gid
+
+        logging.info(f"USER DIRECTORY: No Asana user matches owner '{owner_name}'. Leaving sub-task unassigned.")
+        return None
+
+    def _crawl(self) -> list:
+        return [
+            [user['gid'], user.get('name') or '', user.get('email') or '']
+            for user in self.asana_client.iter_pages(
+                "/users", {"workspace": self.asana_client.workspace_gid, "opt_fields": "name,email"}
+            )
+        ]
+
+    def _index_entries(self, records: list):
+        # Full names and emails first so they win over aliases when keys collide.
+        for gid, name, email in records:
+            if name: yield name, gid
+            if email: yield email, gid
+
+        by_email = {email.casefold(): gid for gid, _, email in records if email}
+        by_name = {normalize_name(name): gid for gid, name, _ in records if name}
+        for alias, target in self.aliases.items():
+            gid = by_email.get(target.casefold()) or by_name.get(normalize_name(target)) or target
+            yield alias, gid
+
+        # Partial names are only indexed when exactly one user has them. A user's first name
+        # and email local part often coincide ("Sarah Lee", sarah@...), so users are counted once per partial.
+        owners = defaultdict(set)
+        for gid, name, email in records:
+            tokens = normalize_name(name).split()
+            if tokens:
+                owners[tokens[0]].add(gid)
+                if len(tokens) > 1:
+                    owners[tokens[-1]].add(gid)
+            if email:
+                owners[normalize_name(email.split("@")[0])].add(gid)
+        for partial, gids in owners.items():
+            if partial and len(gids) == 1:
+                yield partial, next(iter(gids))
+
+    def _cache_scope(self) -> str | None:
+        return self.asana_client.workspace_gid
+
+
+def _load_aliases() -> dict:
+    """
+    Reads ASANA_USER_ALIASES, a JSON object mapping an alias to a user's email, name or GID,
+    e.g. {"DC": "dan.carley@example.com"}.
+    """
+    raw = os.environ.get("ASANA_USER_ALIASES")
+    if not raw: return {}
+    try:
+        aliases = json.loads(raw)
+        if not isinstance(aliases, dict):
+            raise ValueError("expected a JSON object")
+        return {str(alias): str(target) for alias, target in aliases.items()}
+    except Exception as e:
+        logging.error(f"USER DIRECTORY ERROR: Ignoring invalid ASANA_USER_ALIASES: {e}")
+        return {}